@@ -1,3 +1,5 @@
+import multiprocessing
+import threading
 import flet as ft
 
 from src.Interface.telaEmpresa import TelaEmpresa
@@ -54,4 +56,22 @@ def main(page: ft.Page):
     page.on_route_change = route_change
     page.go("/empresa")
 
-ft.app(target=main, assets_dir="assets")
\ No newline at end of file
+if __name__ == "__main__":
+    # Necessário para o parsing em processos (spawn no Windows e executável congelado)
+    multiprocessing.freeze_support()
+    # Coluna de geração, colunas DECIMAL e índices compostos criados/conferidos em segundo plano para não atrasar a abertura da tela
+    from src.Config.Database.esquemaIndices import inicializarIndices
+    from src.Config.Database.esquemaNumerico import inicializarColunasNumericas
+    from src.Services.Sped.Leitor.periodoVersaoService import inicializarVersionamento
+    from src.Config.Database.bancoLocal import inicializarBancoLocal
+
+    # Banco local (BANCO_LOCAL): as tabelas precisam existir antes da tela de empresas
+    inicializarBancoLocal()
+
+    def prepararBanco():
+        inicializarVersionamento()
+        inicializarColunasNumericas()
+        inicializarIndices()
+
+    threading.Thread(target=prepararBanco, name="indices", daemon=True).start()
+    ft.app(target=main, assets_dir="assets")
\ No newline at end of file
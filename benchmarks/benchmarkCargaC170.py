@@ -0,0 +1,86 @@
+"""Benchmark de carga de C170: INSERT em lote (to_sql multi) x LOAD DATA LOCAL INFILE.
+
+Gera registros C170 sintéticos (mesmas colunas do RegistroC170Service) e
+os grava em uma tabela descartável `c170_benchmark` (CREATE TABLE ... LIKE
+c170), em flushes do mesmo tamanho usado pelo LeitorService. O servidor
+precisa de local_infile=ON para o segundo caso.
+
+Uso:
+    python -m benchmarks.benchmarkCargaC170 [quantidade] [tamanho_flush] [url_mysql]
+"""
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+from src.Config.Database.db import DATABASE_URL
+from src.Services.Sped.Salvar.cargaEmMassa import CargaEmMassa
+from src.Services.Sped.Salvar.loteRegistros import LoteRegistros
+from src.Services.Sped.Salvar.registroC170Service import COLUNAS_C170
+
+TABELA = "c170_benchmark"
+
+def gerarRegistros(quantidade: int) -> list[tuple]:
+    registros = []
+    for i in range(quantidade):
+        num_doc = str(i // 5 + 1).zfill(9)
+        # qtd, vl_item, vl_desc e aliq_icms já como saem de regrasC170 (DECIMAL com ponto)
+        registros.append({
+            "periodo": "01/2025", "reg": "C170", "num_item": str(i % 5 + 1),
+            "cod_item": str(1000 + i % 3000), "descr_compl": f"PRODUTO {i % 3000}", "qtd": "1.00000",
+            "unid": "UN", "vl_item": "10.00", "vl_desc": "0.00", "ind_mov": "0", "cst_icms": "000",
+            "cfop": "5102", "cod_nat": None, "vl_bc_icms": "10,00", "aliq_icms": "18.00", "vl_icms": "1,80",
+            "vl_bc_icms_st": "0", "aliq_st": "0", "vl_icms_st": "0", "ind_apur": "0", "cst_ipi": "53",
+            "cod_enq": "999", "vl_bc_ipi": "0", "aliq_ipi": "0", "vl_ipi": "0", "cst_pis": "01",
+            "vl_bc_pis": "10,00", "aliq_pis": "1,65", "quant_bc_pis": None, "aliq_pis_reais": None,
+            "vl_pis": "0,17", "cst_cofins": "01", "vl_bc_cofins": "10,00", "aliq_cofins": "7,60",
+            "quant_bc_cofins": None, "aliq_cofins_reais": None, "vl_cofins": "0,76", "cod_cta": None,
+            "vl_abat_nt": None, "id_c100": i // 5 + 1, "filial": "0001", "ind_oper": "1",
+            "cod_part": "P001", "num_doc": num_doc, "chv_nfe": "3" * 44, "empresa_id": 0, "is_active": True,
+            "geracao": 0, "id": i + 1,
+        })
+    return [tuple(registro[coluna] for coluna in COLUNAS_C170) for registro in registros]
+
+def medir(nome: str, gravar, registros: list[tuple], tamanho_flush: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(0, len(registros), tamanho_flush):
+        lote = LoteRegistros(COLUNAS_C170)
+        lote.extend(registros[i:i + tamanho_flush])
+        gravar(lote)
+    tempo = time.perf_counter() - inicio
+    print(f"{nome:>12} {tempo:>10.2f} {len(registros) / tempo:>12,.0f}")
+    return tempo
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tamanho_flush = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    url = sys.argv[3] if len(sys.argv) > 3 else DATABASE_URL
+
+    engine = create_engine(url, connect_args={"local_infile": True})
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABELA}"))
+        conn.execute(text(f"CREATE TABLE {TABELA} LIKE c170"))
+
+    print(f"Gerando {quantidade:,} registros C170 (flush de {tamanho_flush:,})")
+    registros = gerarRegistros(quantidade)
+    print(f"{'caminho':>12} {'tempo (s)':>10} {'linhas/s':>12}")
+
+    try:
+        tempo_insert = medir(
+            "to_sql", lambda lote: lote.dataframe().to_sql(
+                TABELA, engine, if_exists='append', index=False, method='multi', chunksize=5000
+            ), registros, tamanho_flush
+        )
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE TABLE {TABELA}"))
+
+        tempo_load = medir(
+            "load_data", lambda lote: CargaEmMassa.carregarTsv(engine, TABELA, lote), registros, tamanho_flush
+        )
+        print(f"Speedup LOAD DATA: {tempo_insert / tempo_load:.2f}x")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABELA}"))
+
+if __name__ == "__main__":
+    main()
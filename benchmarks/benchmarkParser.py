@@ -0,0 +1,53 @@
+"""Benchmark de escalabilidade do parsing de SPED em processos.
+
+Executa apenas a etapa de parsing (sem banco de dados) com 1, 2, 4 e 8
+processos sobre o mesmo arquivo e imprime tempo, MB/s e speedup.
+
+Uso:
+    python -m benchmarks.benchmarkParser caminho/do/sped.txt [tamanho_faixa_mb]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.Services.Sped.Leitor.leituraMmap import abrirMapeamento, dividirFaixas, prefixosRegistros, processarFaixa
+
+REGISTROS = ("0000", "0150", "0200", "C100", "C170")
+PROCESSOS = (1, 2, 4, 8)
+
+def medir(caminho: str, faixas: list, prefixos: tuple, num_processos: int) -> tuple[float, int]:
+    inicio = time.perf_counter()
+    total_registros = 0
+    with ProcessPoolExecutor(max_workers=num_processos) as executor:
+        futures = [executor.submit(processarFaixa, caminho, a, b, prefixos) for a, b in faixas]
+        for future in futures:
+            _, quantidade, _, _ = future.result()
+            total_registros += quantidade
+    return time.perf_counter() - inicio, total_registros
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    caminho = sys.argv[1]
+    tamanho_faixa = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else 2 * 1024 * 1024
+    tamanho_arquivo = os.path.getsize(caminho)
+
+    with open(caminho, "rb") as arquivo:
+        faixas = dividirFaixas(abrirMapeamento(arquivo), tamanho_faixa)
+
+    prefixos = prefixosRegistros(REGISTROS)
+    print(f"Arquivo: {caminho} ({tamanho_arquivo / 1e6:.1f} MB, {len(faixas)} faixas)")
+    print(f"{'processos':>10} {'tempo (s)':>10} {'MB/s':>8} {'registros':>12} {'speedup':>8}")
+
+    base = None
+    for num_processos in PROCESSOS:
+        tempo, registros = medir(caminho, faixas, prefixos, num_processos)
+        base = base or tempo
+        print(f"{num_processos:>10} {tempo:>10.2f} {tamanho_arquivo / tempo / 1e6:>8.1f} "
+              f"{registros:>12,} {base / tempo:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
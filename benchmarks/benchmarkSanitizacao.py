@@ -0,0 +1,124 @@
+"""Conferência diferencial e benchmark da sanitização por coluna.
+
+1. Conferência: um corpus adversarial por campo (casos de borda como None,
+   vazio, vírgula decimal, unidades com número, CST com ponto, dígitos
+   unicode, textos longos e inteiros, misturados a valores aleatórios de alta
+   cardinalidade) passa por sanitizarColunas e por sanitizarCampo, valor a
+   valor; tipo e valor precisam ser idênticos.
+2. Benchmark: colunas com a distribuição de um SPED real (poucos CST, CFOP e
+   unidades distintos; valores e descrições variados), medidas nos dois
+   caminhos. O corpus adversarial também é cronometrado, como pior caso.
+
+Termina com código 1 se houver qualquer divergência.
+
+Uso:
+    python -m benchmarks.benchmarkSanitizacao [linhas_por_campo] [semente]
+"""
+import random
+import string
+import sys
+import time
+
+from src.Utils.sanitizacao import REGRAS_CAMPOS, sanitizarCampo
+from src.Utils.sanitizacaoColunas import sanitizarColunas
+
+CASOS_BORDA = [
+    None, "", " ", "0", "00", "000", "1", "12", "012", "5,5", "12,50", "1.2", "1.2.3", "1,2,3", " 5 ",
+    "UN", "un", "KG", "KG10", "kg5x", "CX12UN", "PCT", "UNID", "123", "12,5", "12.5", ",5", "5,",
+    "A1", "1A", "ÇX", "²", "1²", "٣", "5102", "5.102", "51020", "51", "X5102", "-10", "+1", "abc",
+    "\n", "1\n", "ç" * 300, "a" * 256, "b" * 61, "c" * 12, 7, 12, 0,
+]
+
+def valorAleatorio(rnd: random.Random):
+    tipo = rnd.random()
+    if tipo < 0.15:
+        return rnd.choice(CASOS_BORDA)
+    if tipo < 0.45:
+        return str(rnd.randint(0, 99999))
+    if tipo < 0.65:
+        return f"{rnd.randint(0, 9999)},{rnd.randint(0, 99):02d}"
+    if tipo < 0.8:
+        return rnd.choice(["UN", "KG", "CX", "PC", "LT", "M2"]) + (str(rnd.randint(0, 99)) if rnd.random() < 0.3 else "")
+    tamanho = rnd.randint(0, 300)
+    return "".join(rnd.choice(string.ascii_letters + string.digits + " ,.-ÇçÃã²") for _ in range(tamanho))
+
+def corpusRealista(rnd: random.Random, linhas: int) -> dict:
+    """Colunas com cardinalidade típica de C170/0200"""
+    cfops = [str(c) for c in (5102, 5405, 1102, 2102, 6102, 5949, 1403, 5910, 1556, 2556)] + \
+            [str(c) for c in range(5100, 5160)]
+    valores = [f"{rnd.randint(0, 5000)},{rnd.randint(0, 99):02d}" for _ in range(5000)] + ["0", "0,00"] * 2000
+    descricoes = ["".join(rnd.choice(string.ascii_uppercase + " ") for _ in range(rnd.randint(10, 80)))
+                  for _ in range(20000)]
+    colunas = {
+        "cst_icms": ["000", "00", "10", "060", "20", "40", "41", "90", "500", None, "0"],
+        "cfop": cfops,
+        "unid": ["UN", "KG", "CX12", "PC", "UND", "LT", "12,5", "M2", "CX", "FD10", None],
+        "unid_inv": ["UN", "KG", "CX", "PC", "LT"],
+        "ind_mov": ["0", "1", None],
+        "cod_mod": ["55", "65", "1", None],
+        "cod_item": [str(rnd.randint(1, 99999)) for _ in range(20000)],
+        "descr_item": descricoes,
+        "descr_compl": descricoes + [None] * 5000,
+        "cod_nat": [None, "", "VENDA", "COMPRA MERCADORIA"],
+        "cod_cta": [None, "1.1.01", "3.01.002"],
+    }
+    corpus = {campo: [rnd.choice(opcoes) for _ in range(linhas)] for campo, opcoes in colunas.items()}
+    for campo in REGRAS_CAMPOS:
+        if campo not in corpus and campo not in ("cod_part", "nome", "reg"):
+            corpus[campo] = [rnd.choice(valores) for _ in range(linhas)]
+    return corpus
+
+def iguais(a, b) -> bool:
+    if type(a) is not type(b):
+        return False
+    return a == b or (a != a and b != b)
+
+def medir(nome: str, corpus: dict):
+    total = sum(len(valores) for valores in corpus.values())
+    inicio = time.perf_counter()
+    escalar = {campo: [sanitizarCampo(campo, valor) for valor in valores] for campo, valores in corpus.items()}
+    tempo_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    por_coluna = sanitizarColunas(corpus)
+    tempo_coluna = time.perf_counter() - inicio
+
+    print(f"{nome}: {len(corpus)} campos, {total:,} valores")
+    print(f"{'caminho':>12} {'tempo (s)':>10} {'valores/s':>14}")
+    print(f"{'escalar':>12} {tempo_escalar:>10.2f} {total / tempo_escalar:>14,.0f}")
+    print(f"{'por coluna':>12} {tempo_coluna:>10.2f} {total / tempo_coluna:>14,.0f}")
+    print(f"Speedup: {tempo_escalar / tempo_coluna:.2f}x")
+    return escalar, por_coluna
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else 2024
+    rnd = random.Random(semente)
+    print(f"Semente {semente}")
+
+    adversarial = {campo: CASOS_BORDA + [valorAleatorio(rnd) for _ in range(linhas)] for campo in REGRAS_CAMPOS}
+    realista = corpusRealista(rnd, linhas)
+
+    divergencias = 0
+    for nome, corpus in (("Corpus adversarial", adversarial), ("Corpus realista", realista)):
+        escalar, por_coluna = medir(nome, corpus)
+        for campo, esperados in escalar.items():
+            obtidos = por_coluna[campo]
+            if len(esperados) != len(obtidos):
+                divergencias += 1
+                print(f"[DIVERGÊNCIA] {campo}: tamanhos diferentes")
+            for i, (esperado, obtido) in enumerate(zip(esperados, obtidos)):
+                if not iguais(esperado, obtido):
+                    divergencias += 1
+                    if divergencias <= 20:
+                        print(f"[DIVERGÊNCIA] {campo}[{i}] entrada={corpus[campo][i]!r} "
+                              f"escalar={esperado!r} por_coluna={obtido!r}")
+        print()
+
+    if divergencias:
+        print(f"[ERRO] {divergencias:,} divergência(s) entre escalar e por coluna")
+        sys.exit(1)
+    print("[OK] Saída por coluna idêntica à escalar")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Conferência de ponta a ponta no banco local (BANCO_LOCAL, SQLite).
+
+1. Cria o esquema em um arquivo temporário com a mesma sequência do app.py
+   (inicializarBancoLocal/criarTabelas, versionamento, colunas numéricas e
+   índices).
+2. Gera um SPED pequeno (0000, 0150, 0200, C100 e C170 de entrada) e roda a
+   importação e o pós-processamento pelo SpedController, preenchendo as
+   alíquotas pendentes como o usuário faria no popup.
+3. Confere as contagens e os campos calculados de c170_clone (ramos SQLite
+   de atualizarAliquota e calculoResultado) e roda o EXPLAIN QUERY PLAN das
+   consultas quentes (esquemaIndices.explicar).
+
+Os fornecedores são cadastrados completos antes da importação, então a
+etapa de fornecedores não consulta a API de CNPJ. A exportação da planilha
+fica de fora. Termina com código 1 se alguma conferência falhar.
+
+Uso:
+    python -m benchmarks.verificarBancoLocal [notas] [itens_por_nota]
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# O banco precisa estar definido antes de importar src.Config.Database.db
+DIRETORIO = tempfile.mkdtemp(prefix="apurador_local_")
+os.environ["BANCO_LOCAL"] = os.path.join(DIRETORIO, "apurador.db")
+
+from sqlalchemy import text
+
+from src.Config.Database.bancoLocal import inicializarBancoLocal
+from src.Config.Database.db import SessionLocal, engine
+from src.Config.Database.esquemaIndices import CONSULTAS_QUENTES, EsquemaIndicesService, inicializarIndices
+from src.Config.Database.esquemaNumerico import inicializarColunasNumericas
+from src.Controllers.spedController import SpedController
+from src.Services.Sped.Leitor.periodoVersaoService import inicializarVersionamento
+from src.Services.Sped.Pos.spedPosProcessamento import PosProcessamentoService
+
+EMPRESA_ID = 1
+PERIODO = "01/2024"
+PARTICIPANTES = 20
+PRODUTOS = 40
+# Valores como digitados no popup: ST, percentual com ponto ou vírgula e isento
+ALIQUOTAS = ("ST", "12.00", "17,5", "ISENTO")
+
+def gerarSped(caminho: str, notas: int, itens: int):
+    linhas = [
+        "|0000|017|0|01012024|31012024|EMPRESA TESTE|12345678000199||CE|123|2304400|||A|1|",
+        "|0001|0|",
+    ]
+    linhas += [f"|0150|P{i}|FORNECEDOR {i}|1058|{12345678000100 + i}||123|2304400||RUA|1||CENTRO|"
+               for i in range(PARTICIPANTES)]
+    linhas += [f"|0200|{i:06d}|PRODUTO {i}|789||UN|00|{22021000 + i % 5}|||||" for i in range(PRODUTOS)]
+    for nota in range(notas):
+        linhas.append(f"|C100|0|1|P{nota % PARTICIPANTES}|55|00|1|{nota + 1}|CHAVE{nota:040d}|01012024|02012024|"
+                      f"{itens * 20},00|0|0|0|{itens * 20},00|9|0|0|0|0|0|0|0|0|0|0|0|0|")
+        for item in range(itens):
+            produto = (nota * itens + item) % PRODUTOS
+            cfop = "1102" if item % 2 == 0 else "1403"
+            linhas.append(f"|C170|{item + 1}|{produto:06d}|PRODUTO {produto}|1,00|UN|20,00|0|0|000|{cfop}|||0|0|0|0|0|0"
+                          f"||||0|0|0|50|0|0|0|0|0|50|0|0|0|0|0||0|")
+    contagem = Counter(linha.split("|")[1] for linha in linhas)
+    linhas += [f"|9900|{registro}|{quantidade}|" for registro, quantidade in contagem.items()]
+    linhas.append(f"|9999|{len(linhas) + 1}|")
+    with open(caminho, "w", encoding="latin-1") as arquivo:
+        arquivo.write("\n".join(linhas) + "\n")
+
+def cadastrarFornecedores(session):
+    """Fornecedores do CE fora do decreto, já completos: a etapa de fornecedores não tem CNPJ
+    pendente para consultar e todo C170 de entrada segue para a c170nova; um terço é do Simples"""
+    session.execute(text("""
+        INSERT INTO cadastro_fornecedores (empresa_id, cod_part, nome, cnpj, uf, cnae, decreto, simples)
+        VALUES (:empresa_id, :cod_part, :nome, :cnpj, 'CE', '4711302', '0', :simples)
+    """), [{
+        "empresa_id": EMPRESA_ID, "cod_part": f"P{i}", "nome": f"FORNECEDOR {i}",
+        "cnpj": str(12345678000100 + i), "simples": "1" if i % 3 == 0 else "0",
+    } for i in range(PARTICIPANTES)])
+    session.commit()
+
+def preencherAliquotas(session) -> int:
+    ids = session.execute(text(
+        "SELECT id FROM cadastro_tributacao WHERE empresa_id = :e AND (aliquota IS NULL OR aliquota = '') ORDER BY id"
+    ), {"e": EMPRESA_ID}).scalars().all()
+    session.execute(text("UPDATE cadastro_tributacao SET aliquota = :aliquota WHERE id = :id"),
+                    [{"id": id_, "aliquota": ALIQUOTAS[i % len(ALIQUOTAS)]} for i, id_ in enumerate(ids)])
+    session.commit()
+    return len(ids)
+
+def conferir(falhas: list, nome: str, obtido, esperado):
+    ok = obtido == esperado
+    print(f"[{'OK' if ok else 'ERRO'}] {nome}: {obtido!r}" + ("" if ok else f" (esperado {esperado!r})"))
+    if not ok:
+        falhas.append(nome)
+
+def conferirPlanos(falhas: list):
+    servico = EsquemaIndicesService(engine)
+    for consulta in CONSULTAS_QUENTES:
+        plano = servico.repository.explicar(consulta["sql"], {"empresa_id": EMPRESA_ID, "periodo": PERIODO, "geracao": 0})
+        tabelas = {linha["tabela"] for linha in plano}
+        if consulta["tabela"] not in tabelas:
+            print(f"[ERRO] {consulta['nome']}: `{consulta['tabela']}` ausente do plano {plano}")
+            falhas.append(consulta["nome"])
+    faltando = servico.verificar(EMPRESA_ID, PERIODO)
+    conferir(falhas, "consultas quentes sem índice", [c["nome"] for c in faltando], [])
+
+def main():
+    notas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    itens = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    total = notas * itens
+    falhas = []
+    print(f"Banco local em {os.environ['BANCO_LOCAL']}")
+
+    try:
+        # Mesma sequência do app.py
+        if not inicializarBancoLocal():
+            print("[ERRO] Banco local não inicializado")
+            sys.exit(1)
+        inicializarVersionamento()
+        inicializarColunasNumericas()
+        inicializarIndices()
+
+        caminho = os.path.join(DIRETORIO, "sped.txt")
+        gerarSped(caminho, notas, itens)
+        session = SessionLocal()
+        try:
+            cadastrarFornecedores(session)
+            inicio = time.time()
+            resultado = asyncio.run(SpedController(session).processarSped([caminho], EMPRESA_ID))
+            print(f"[INFO] Importação: {resultado['status']} ({time.time() - inicio:.1f}s)")
+            if resultado["status"] == "pendente_aliquota":
+                print(f"[INFO] {preencherAliquotas(session)} alíquota(s) preenchida(s)")
+                asyncio.run(PosProcessamentoService(session, EMPRESA_ID).executarPos())
+            elif resultado["status"] != "ok":
+                print(f"[ERRO] {resultado.get('mensagem')}")
+                sys.exit(1)
+
+            def contar(sql: str) -> int:
+                return session.execute(text(sql), {"e": EMPRESA_ID}).scalar()
+
+            conferir(falhas, "c100", contar("SELECT COUNT(*) FROM c100 WHERE empresa_id = :e"), notas)
+            conferir(falhas, "c170", contar("SELECT COUNT(*) FROM c170 WHERE empresa_id = :e"), total)
+            conferir(falhas, "c170_clone", contar("SELECT COUNT(*) FROM c170_clone WHERE empresa_id = :e"), total)
+            conferir(falhas, "c170_clone sem alíquota nem token", contar(
+                "SELECT COUNT(*) FROM c170_clone WHERE empresa_id = :e AND aliquota IS NULL AND aliquota_token IS NULL"
+            ), 0)
+            # Fornecedor do Simples: alíquota numérica acrescida de 3 pontos (12 -> 15, 17,5 -> 20,5)
+            conferir(falhas, "c170_clone do Simples sem acréscimo", contar("""
+                SELECT COUNT(*) FROM c170_clone c
+                JOIN cadastro_fornecedores f ON f.cod_part = c.cod_part AND f.empresa_id = c.empresa_id
+                WHERE c.empresa_id = :e AND f.simples = '1' AND c.aliquota IN (12, 17.5)
+            """), 0)
+            conferir(falhas, "c170_clone sem resultado",
+                     contar("SELECT COUNT(*) FROM c170_clone WHERE empresa_id = :e AND resultado IS NULL"), 0)
+            conferir(falhas, "períodos publicados",
+                     contar("SELECT COUNT(*) FROM periodo_versao WHERE empresa_id = :e AND geracao IS NOT NULL"), 1)
+
+            conferirPlanos(falhas)
+        finally:
+            session.close()
+    finally:
+        engine.dispose()
+        shutil.rmtree(DIRETORIO, ignore_errors=True)
+
+    if falhas:
+        print(f"[ERRO] {len(falhas)} conferência(s) falharam")
+        sys.exit(1)
+    print("[OK] Importação e pós-processamento conferidos no banco local")
+
+if __name__ == "__main__":
+    main()
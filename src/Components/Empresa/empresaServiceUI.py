@@ -1,11 +1,16 @@
-from src.Services.Empresa.empresaService import listarEmpresas
+from src.Services.Empresa.empresaService import listarEmpresasAsync
 from src.Components.notificao import notificacao
 import flet as ft
 
-def obter_dropdown_options(page: ft.Page) -> list:
+async def carregar_dropdown_options(page: ft.Page, dropdown: ft.Ref[ft.Dropdown]):
+    """Preenche o dropdown de empresas depois que a tela abre, sem travar o event loop"""
     try:
-        empresas = listarEmpresas()
-        return [ft.dropdown.Option(key=str(emp["id"]), text=emp["razao_social"]) for emp in empresas]
+        empresas = await listarEmpresasAsync()
     except Exception as erro:
         notificacao(page, "Erro ao buscar empresas", str(erro), tipo="erro")
-        return []
\ No newline at end of file
+        return
+    if dropdown.current is None:
+        return
+    dropdown.current.options = [ft.dropdown.Option(key=str(emp["id"]), text=emp["razao_social"]) for emp in empresas]
+    if dropdown.current.page:
+        dropdown.current.update()
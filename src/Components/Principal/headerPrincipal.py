@@ -1,6 +1,6 @@
 import flet as ft
 
-def headerPrincipal(on_voltar, on_gerenciar_produtos, theme, empresa_nome: str, produtos_qtd: int):
+def headerPrincipal(on_voltar, on_gerenciar_produtos, theme, empresa_nome: str, produtos_qtd: int, produtos_ref: ft.Ref[ft.Text] = None):
     return ft.Container(
         width=720,
         padding=25,
@@ -36,7 +36,7 @@ def headerPrincipal(on_voltar, on_gerenciar_produtos, theme, empresa_nome: str,
                                     controls=[
                                         ft.Row([
                                             ft.Icon(name="inventory_2", size=14, color=theme["TEXT_SECONDARY"]),
-                                            ft.Text(f"{produtos_qtd} produtos cadastrados", size=12, color=theme["TEXT_SECONDARY"])
+                                            ft.Text(f"{produtos_qtd} produtos cadastrados", ref=produtos_ref, size=12, color=theme["TEXT_SECONDARY"])
                                         ])
                                     ]
                                 )
@@ -5,6 +5,7 @@ from ...Components.notificao import notificacao
 from ...Config.Database.db import getSession
 from ...Components.Dialogs.confirmacao import confirmacao
 from src.Utils.event import EventBus
+from src.Services.Sped.Leitor.progressoSped import EVENTO_PROGRESSO_SPED, formatarProgresso
 
 def estados(refs, estado: str, page: ft.Page):
     progress = refs.get("progress")
@@ -58,6 +59,24 @@ def estados(refs, estado: str, page: ft.Page):
 
     page.update()
 
+def acompanharProgresso(refs, page: ft.Page):
+    """Atualiza barra e status a cada evento de progresso da leitura (já limitado pelo leitor)"""
+    progress = refs.get("progress")
+    status_text = refs.get("status_text")
+
+    def onProgresso(estado):
+        if progress and progress.current:
+            progress.current.value = estado["fracao"]
+        if status_text and status_text.current:
+            if estado["fracao"] >= 1:
+                status_text.current.value = "Leitura concluída. Finalizando processamento..."
+            else:
+                status_text.current.value = f"Processando arquivos SPED... {formatarProgresso(estado)}"
+        page.update()
+
+    EventBus.on(EVENTO_PROGRESSO_SPED, onProgresso)
+    return onProgresso
+
 def inserirSped(page: ft.Page, empresa_id: int, refs: dict, file_picker: ft.FilePicker):
     def on_file_result(e: ft.FilePickerResultEvent):
         if not e.files:
@@ -159,6 +178,7 @@ async def processarSped(page: ft.Page, empresa_id: int, refs: dict):
     controller = SpedController(session)
 
     estados(refs, "processando", page)
+    onProgresso = acompanharProgresso(refs, page)
     await asyncio.sleep(0.1)
     page.update()
 
@@ -180,6 +200,7 @@ async def processarSped(page: ft.Page, empresa_id: int, refs: dict):
 
     finally:
         print("[DEBUG processarSped] Encerrando processamento com session.close()")
+        EventBus.off(EVENTO_PROGRESSO_SPED, onProgresso)
         estados(refs, "finalizado", page)
         if session:
             session.close()
@@ -215,6 +236,7 @@ async def tratarSoftDelete(page, controller, empresa_id, refs, resultado):
 
             nova_sessao = getSession()
             novo_controller = SpedController(nova_sessao)
+            onProgresso = acompanharProgresso(refs, page)
             
             try:
                 print("[DEBUG tratarSoftDelete] Chamando reprocessamento com forcar=True")
@@ -228,6 +250,7 @@ async def tratarSoftDelete(page, controller, empresa_id, refs, resultado):
                 notificacao(page, "Erro", f"Erro no reprocessamento: {str(e)}", tipo="erro")
                 estados(refs, "finalizado", page)
             finally:
+                EventBus.off(EVENTO_PROGRESSO_SPED, onProgresso)
                 nova_sessao.close()
 
         page.run_task(reprocessar)
@@ -1,22 +1,15 @@
 import flet as ft
-from src.Config.Database.db import SessionLocal
+from src.Config.Database.db import SessionUI
 from src.Controllers.exportarController import ExportarController
 from src.Services.Produto.produtoService import ProdutosService
 from src.Components.notificao import notificacao
 
-def buscarProdutos(empresa_id: int, pagina=1, limite=50, filtro_nome="", categoria_fiscal=""):
+CATEGORIAS_PADRAO = ["regraGeral", "7CestaBasica", "12CestaBasica", "20RegraGeral", "28BebidaAlcoolica"]
+
+async def buscarProdutosAsync(empresa_id: int, pagina=1, limite=50, filtro_nome="", categoria_fiscal=""):
+    """Roda no event loop da página (page.run_task); as conexões assíncronas pertencem a esse loop"""
     try:
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        resultado = loop.run_until_complete(
-            ExportarController.buscarProdutos(empresa_id, pagina, limite, filtro_nome, categoria_fiscal)
-        )
-        
-        loop.close()
-        return resultado
-        
+        return await ExportarController.buscarProdutos(empresa_id, pagina, limite, filtro_nome, categoria_fiscal)
     except Exception as e:
         print(f"[ERRO] Erro ao buscar produtos: {e}")
         return {"produtos": [], "total": 0, "pagina": 1, "total_paginas": 0}
@@ -24,18 +17,24 @@ def buscarProdutos(empresa_id: int, pagina=1, limite=50, filtro_nome="", categor
 def buscarCategoriasFiscais(empresa_id: int = None):
     try:
         if not empresa_id:
-            return ["regraGeral", "7CestaBasica", "12CestaBasica", "20RegraGeral", "28BebidaAlcoolica"]
+            return CATEGORIAS_PADRAO
         
         categorias = ExportarController.buscarCategoriasFiscais(empresa_id)
         
         if not categorias:
-            return ["regraGeral", "7CestaBasica", "12CestaBasica", "20RegraGeral", "28BebidaAlcoolica"]
+            return CATEGORIAS_PADRAO
         
         return categorias
         
     except Exception as e:
         print(f"[ERRO] Erro ao buscar categorias: {e}")
-        return ["regraGeral", "7CestaBasica", "12CestaBasica", "20RegraGeral", "28BebidaAlcoolica"]
+        return CATEGORIAS_PADRAO
+
+async def buscarCategoriasFiscaisAsync(empresa_id: int = None):
+    if not empresa_id:
+        return CATEGORIAS_PADRAO
+    categorias = await ExportarController.buscarCategoriasFiscaisAsync(empresa_id)
+    return categorias or CATEGORIAS_PADRAO
 
 def adicionarProduto(page: ft.Page, theme: dict, empresa_id: int, refs: dict):
     def fechar_modal(e):
@@ -55,7 +54,7 @@ def adicionarProduto(page: ft.Page, theme: dict, empresa_id: int, refs: dict):
             "categoria_fiscal": categoria_dropdown.value if categoria_dropdown.value else ""
         }
         
-        session = SessionLocal()
+        session = SessionUI()
         try:
             service = ProdutosService(session)
             resultado = service.adicionarProduto(empresa_id, dados)
@@ -139,7 +138,7 @@ def adicionarProduto(page: ft.Page, theme: dict, empresa_id: int, refs: dict):
     page.update()
 
 def editarProduto(page: ft.Page, theme: dict, empresa_id: int, produto_id: int, refs: dict):
-    session = SessionLocal()
+    session = SessionUI()
     try:
         service = ProdutosService(session)
         resultado = service.buscarProdutoPorId(produto_id)
@@ -173,7 +172,7 @@ def editarProduto(page: ft.Page, theme: dict, empresa_id: int, produto_id: int,
             "categoria_fiscal": categoria_dropdown.value if categoria_dropdown.value else ""
         }
         
-        session = SessionLocal()
+        session = SessionUI()
         try:
             service = ProdutosService(session)
             resultado = service.editarProduto(produto_id, dados)
@@ -259,7 +258,7 @@ def editarProduto(page: ft.Page, theme: dict, empresa_id: int, produto_id: int,
 
 def excluirProduto(page: ft.Page, theme: dict, produto_id: int, produto_nome: str, refs: dict):
     def confirmar_exclusao(e):
-        session = SessionLocal()
+        session = SessionUI()
         try:
             service = ProdutosService(session)
             resultado = service.excluirProduto(produto_id)
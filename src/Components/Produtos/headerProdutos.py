@@ -1,12 +1,20 @@
 import flet as ft
-from .CrudAction import adicionarProduto, buscarCategoriasFiscais
+from .CrudAction import adicionarProduto, buscarCategoriasFiscaisAsync
 from .importarProdutosAction import importarProdutos
 from .exportarProdutosAction import exportarProdutos
 
 def headerProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int = None, empresa_nome: str = "") -> ft.Container:
-    categorias = buscarCategoriasFiscais(empresa_id)
+    # Categorias carregadas depois de montar a tela, sem bloquear a construção do header
     opcoes_categoria = [ft.dropdown.Option("", "Todas as categorias")]
-    opcoes_categoria.extend([ft.dropdown.Option(cat, cat) for cat in categorias])
+    
+    async def carregarCategorias():
+        categorias = await buscarCategoriasFiscaisAsync(empresa_id)
+        dropdown = refs["dropdown_categoria"].current
+        if dropdown is None:
+            return
+        dropdown.options = opcoes_categoria + [ft.dropdown.Option(cat, cat) for cat in categorias]
+        if dropdown.page:
+            dropdown.update()
     
     def aplicar_filtros(e):
         if "atualizar_tabela" in refs and callable(refs["atualizar_tabela"]):
@@ -41,7 +49,7 @@ def headerProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int = Non
     if "dropdown_categoria" not in refs:
         refs["dropdown_categoria"] = ft.Ref[ft.Dropdown]()
 
-    return ft.Container(
+    container = ft.Container(
         padding=20,
         bgcolor=theme["CARD"],
         border_radius=8,
@@ -131,4 +139,7 @@ def headerProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int = Non
                 )
             ]
         )
-    )
\ No newline at end of file
+    )
+
+    page.run_task(carregarCategorias)
+    return container
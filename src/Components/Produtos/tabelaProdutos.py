@@ -1,5 +1,6 @@
+import asyncio
 import flet as ft
-from .CrudAction import editarProduto, excluirProduto, buscarProdutos
+from .CrudAction import editarProduto, excluirProduto, buscarProdutosAsync
 
 PAGE_SIZE = 10
 
@@ -7,6 +8,8 @@ def cardTabelaProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int):
     refs["pagina_atual"] = 1
     refs["dados_produtos"] = {"produtos": [], "total": 0, "total_paginas": 0}
     refs["empresa_id"] = empresa_id
+    # Cada atualização recebe um número; respostas de consultas já superadas são descartadas
+    refs["consulta_tabela"] = 0
     
     refs["tabela_ref"] = ft.Ref[ft.DataTable]()
     refs["info_paginacao"] = ft.Ref[ft.Text]()
@@ -36,15 +39,17 @@ def cardTabelaProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int):
         
         return {"nome": filtro_nome, "categoria": categoria_fiscal}
 
-    def atualizarTabela():
+    async def atualizarTabelaAsync():
         try:
+            refs["consulta_tabela"] += 1
+            consulta = refs["consulta_tabela"]
             filtros = obter_filtros()
             pagina = refs["pagina_atual"]
             
             print(f"[DEBUG] Atualizando tabela - Página {pagina}, Empresa {empresa_id}")
             print(f"[DEBUG] Filtros aplicados: {filtros}")
             
-            resultado = buscarProdutos(
+            resultado = await buscarProdutosAsync(
                 empresa_id=empresa_id,
                 pagina=pagina,
                 limite=PAGE_SIZE,
@@ -52,6 +57,10 @@ def cardTabelaProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int):
                 categoria_fiscal=filtros.get("categoria", "")
             )
             
+            if consulta != refs["consulta_tabela"]:
+                print(f"[DEBUG] Resultado da consulta {consulta} descartado (tabela já atualizada por outra)")
+                return
+            
             print(f"[DEBUG] Resultado da busca: {resultado}")
             
             refs["dados_produtos"] = resultado
@@ -174,6 +183,10 @@ def cardTabelaProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int):
             import traceback
             traceback.print_exc()
 
+    def atualizarTabela():
+        # Agenda no event loop da página: a tela não trava enquanto o banco responde
+        page.run_task(atualizarTabelaAsync)
+
     def ir_para_pagina(pagina):
         refs["pagina_atual"] = pagina
         atualizarTabela()
@@ -323,11 +336,12 @@ def cardTabelaProdutos(page: ft.Page, refs: dict, theme: dict, empresa_id: int):
         )
     )
     
-    def carregar_inicial():
+    async def carregar_inicial():
+        # Espera a view ser montada, como fazia o Timer
+        await asyncio.sleep(0.1)
         print("[DEBUG] Iniciando carregamento inicial da tabela...")
-        atualizarTabela()
+        await atualizarTabelaAsync()
     
-    import threading
-    threading.Timer(0.1, carregar_inicial).start()
+    page.run_task(carregar_inicial)
     
     return container
\ No newline at end of file
@@ -0,0 +1,31 @@
+from sqlalchemy import inspect
+
+from src.Config.Database.db import Base, BANCO_LOCAL, engine as engine_principal
+from src.Models import (
+    _0000Model, _0150Model, _0200Model, c100Model, c170Model, c170novaModel, c170cloneModel,
+    empresasModel, fornecedorModel, importacaoSpedModel, periodoVersaoModel, sequenciaIdModel, tributacaoModel,
+)
+
+def criarTabelas(engine) -> list:
+    """Cria as tabelas e índices de todos os modelos que ainda não existem; devolve as criadas"""
+    existentes = set(inspect(engine).get_table_names())
+    Base.metadata.create_all(bind=engine)
+    return sorted(set(Base.metadata.tables) - existentes)
+
+def inicializarBancoLocal(engine=None) -> bool:
+    """Banco embutido (BANCO_LOCAL): o arquivo nasce vazio, então o esquema é criado antes da primeira tela.
+
+    O MySQL central continua provisionado fora do app; sem BANCO_LOCAL nada é feito.
+    """
+    if engine is None:
+        if not BANCO_LOCAL:
+            return False
+        engine = engine_principal
+    try:
+        criadas = criarTabelas(engine)
+        if criadas:
+            print(f"[INFO] Banco local: {len(criadas)} tabela(s) criada(s) em {engine.url.database}")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Falha ao preparar o banco local: {e}")
+        return False
@@ -1,8 +1,10 @@
 import os
+from threading import Lock
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from src.Config.Database.poolMedido import PoolMedido, PoolMedidoAssincrono, medirPool
 from src.Utils.path import resourcePath
 
 env_path = resourcePath('.env')
@@ -19,10 +21,117 @@ DB_PASS = os.getenv("SENHA")
 DB_NAME = os.getenv("BANCO")
 DB_PORT = os.getenv("PORT", "3306")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Banco local embutido (SQLite) para estação única/offline: caminho do arquivo .db; vazio usa o MySQL acima.
+# Também serve de banco de teste: criarEngine aceita qualquer URL sqlite:///arquivo
+BANCO_LOCAL = os.getenv("BANCO_LOCAL", "").strip()
 
-engine = create_engine(DATABASE_URL, echo=False)
+# Carga em massa via LOAD DATA LOCAL INFILE (opcional; o servidor também precisa de local_infile=ON)
+CARGA_LOCAL_INFILE = os.getenv("CARGA_LOCAL_INFILE", "0").lower() in ("1", "true", "sim")
+
+# Tabelas SPED particionadas por (empresa, período): a purga tira as gerações antigas por troca de partição.
+# Opcional; exige migrar as tabelas antes (python -m src.Services.Sped.Leitor.particaoPeriodoService --migrar)
+ARMAZENAMENTO_PARTICIONADO = os.getenv("ARMAZENAMENTO_PARTICIONADO", "0").lower() in ("1", "true", "sim")
+
+# Purga das gerações antigas dos períodos: linhas por transação e pausa (s) entre lotes
+PURGA_LOTE = int(os.getenv("PURGA_LOTE", "2000"))
+PURGA_PAUSA = float(os.getenv("PURGA_PAUSA", "0.1"))
+# Purga em segundo plano dos períodos reimportados, logo após a publicação da geração nova
+PURGA_APOS_IMPORTACAO = os.getenv("PURGA_APOS_IMPORTACAO", "0").lower() in ("1", "true", "sim")
+
+# Escritores simultâneos por flush do leitor SPED (uma conexão e transação por tabela)
+POOL_ESCRITORES = int(os.getenv("POOL_ESCRITORES", "5"))
+# Arquivos SPED lidos ao mesmo tempo numa importação (um período por arquivo)
+ARQUIVOS_SIMULTANEOS = int(os.getenv("ARQUIVOS_SIMULTANEOS", "4"))
+# Pool principal: por arquivo simultâneo, os escritores do flush + a sessão do leitor + uma de folga
+POOL_TAMANHO = int(os.getenv("POOL_TAMANHO", str(ARQUIVOS_SIMULTANEOS * (POOL_ESCRITORES + 2))))
+POOL_EXCEDENTE = int(os.getenv("POOL_EXCEDENTE", "10"))
+# Pool pequeno e separado para consultas da interface (empresas, produtos, popups)
+POOL_UI_TAMANHO = int(os.getenv("POOL_UI_TAMANHO", "2"))
+POOL_UI_EXCEDENTE = int(os.getenv("POOL_UI_EXCEDENTE", "2"))
+# Segundos de espera por uma conexão livre antes de erro
+POOL_TIMEOUT = int(os.getenv("POOL_TIMEOUT", "30"))
+# Conexões mais antigas que isso (s) são recriadas; deve ficar abaixo do wait_timeout do MySQL
+POOL_RECICLAR = int(os.getenv("POOL_RECICLAR", "1800"))
+# Testa a conexão no checkout (ping) e descarta as derrubadas pelo servidor
+POOL_PRE_PING = os.getenv("POOL_PRE_PING", "1").lower() in ("1", "true", "sim")
+
+DB_TIMEOUT_CONEXAO = int(os.getenv("DB_TIMEOUT_CONEXAO", "10"))
+# Leitura/escrita em segundos; 0 desativa (consultas do pós-processamento podem ser longas)
+DB_TIMEOUT_LEITURA = int(os.getenv("DB_TIMEOUT_LEITURA", "600"))
+DB_TIMEOUT_ESCRITA = int(os.getenv("DB_TIMEOUT_ESCRITA", "600"))
+# Compressão do protocolo para banco remoto; o PyMySQL não suporta, exige o driver mysqlclient
+DB_COMPRESSAO = os.getenv("DB_COMPRESSAO", "0").lower() in ("1", "true", "sim")
+
+def _driverMysql() -> str:
+    if not DB_COMPRESSAO:
+        return "pymysql"
+    try:
+        import MySQLdb  # noqa: F401
+        return "mysqldb"
+    except ImportError:
+        print("[WARNING] DB_COMPRESSAO ativo, mas o mysqlclient não está instalado; conectando sem compressão.")
+        return "pymysql"
+
+DB_DRIVER = "sqlite" if BANCO_LOCAL else _driverMysql()
+if BANCO_LOCAL:
+    DATABASE_URL = f"sqlite:///{os.path.abspath(os.path.expanduser(BANCO_LOCAL))}"
+else:
+    DATABASE_URL = f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+def argumentosConexao(url: str = DATABASE_URL) -> dict:
+    if url.startswith("sqlite"):
+        # Conexões do pool circulam entre threads (leitor, pós-processamento); o lock de escrita espera até POOL_TIMEOUT
+        return {"check_same_thread": False, "timeout": POOL_TIMEOUT}
+    argumentos = {"local_infile": CARGA_LOCAL_INFILE, "connect_timeout": DB_TIMEOUT_CONEXAO}
+    if DB_TIMEOUT_LEITURA:
+        argumentos["read_timeout"] = DB_TIMEOUT_LEITURA
+    if DB_TIMEOUT_ESCRITA:
+        argumentos["write_timeout"] = DB_TIMEOUT_ESCRITA
+    if DB_DRIVER == "mysqldb":
+        argumentos["compress"] = True
+    return argumentos
+
+# nome do pool -> (engine, EstatisticasPool)
+_estatisticas = {}
+
+def criarEngine(nome: str, pool_size: int, max_overflow: int, url: str = DATABASE_URL):
+    """Engine com pool medido (ver estatisticasPools), pre-ping, reciclagem e timeouts do .env"""
+    engine = create_engine(
+        url, echo=False,
+        poolclass=PoolMedido,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECICLAR,
+        pool_pre_ping=POOL_PRE_PING,
+        connect_args=argumentosConexao(url),
+    )
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _configurarSqlite)
+    _estatisticas[nome] = (engine, medirPool(engine, nome))
+    return engine
+
+def _configurarSqlite(conexao, _registro):
+    cursor = conexao.cursor()
+    # WAL: leituras da interface não bloqueiam a importação; NORMAL só sincroniza o disco nos checkpoints do WAL
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+def metodoInsercao(bind) -> str | None:
+    """`method` do DataFrame.to_sql: INSERT multi-VALUES no MySQL; executemany no SQLite, onde o multi é ~30x mais lento"""
+    return None if bind.dialect.name == "sqlite" else "multi"
+
+def estatisticasPools() -> dict:
+    """Checkouts, esperas e ocupação atual de cada pool criado por criarEngine"""
+    return {nome: estatisticas.resumo(engine.pool) for nome, (engine, estatisticas) in _estatisticas.items()}
+
+engine = criarEngine("principal", POOL_TAMANHO, POOL_EXCEDENTE)
+engine_ui = criarEngine("ui", POOL_UI_TAMANHO, POOL_UI_EXCEDENTE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionUI = sessionmaker(autocommit=False, autoflush=False, bind=engine_ui)
 
 Base = declarative_base()
 
@@ -31,4 +140,58 @@ def getSession():
         return SessionLocal()
     except Exception as e:
         print(f"[ERROR] Erro ao criar sessão do banco: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def getSessionUI():
+    """Sessão para consultas rápidas da interface, sem disputar conexões com a importação"""
+    return SessionUI()
+
+def urlAssincrona(url: str = DATABASE_URL) -> str:
+    """Mesma base com o driver asyncio: aiomysql no MySQL, aiosqlite no banco local"""
+    url = make_url(url)
+    driver = "sqlite+aiosqlite" if url.get_backend_name() == "sqlite" else "mysql+aiomysql"
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+def argumentosConexaoAssincrona(url: str = DATABASE_URL) -> dict:
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False, "timeout": POOL_TIMEOUT}
+    # O aiomysql não tem read/write_timeout; consultas da interface são curtas
+    return {"connect_timeout": DB_TIMEOUT_CONEXAO}
+
+# Engine asyncio da interface: criada no primeiro uso, dentro do event loop do Flet
+_fabrica_assincrona = None
+_fabrica_verificada = False
+_lock_assincrono = Lock()
+
+def fabricaSessaoAssincrona():
+    """async_sessionmaker do pool da interface; None quando o driver asyncio não está instalado.
+
+    As conexões ficam presas ao event loop em que foram abertas: usar só em
+    corrotinas agendadas no loop da página (page.run_task / handlers async).
+    """
+    global _fabrica_assincrona, _fabrica_verificada
+    with _lock_assincrono:
+        if _fabrica_verificada:
+            return _fabrica_assincrona
+        _fabrica_verificada = True
+        try:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+            engine_async = create_async_engine(
+                urlAssincrona(), echo=False,
+                poolclass=PoolMedidoAssincrono,
+                pool_size=POOL_UI_TAMANHO,
+                max_overflow=POOL_UI_EXCEDENTE,
+                pool_timeout=POOL_TIMEOUT,
+                pool_recycle=POOL_RECICLAR,
+                pool_pre_ping=POOL_PRE_PING,
+                connect_args=argumentosConexaoAssincrona(),
+            )
+        except ImportError as e:
+            print(f"[WARNING] Driver asyncio indisponível ({e}); consultas da interface seguem em threads.")
+            return None
+
+        if engine_async.dialect.name == "sqlite":
+            event.listen(engine_async.sync_engine, "connect", _configurarSqlite)
+        _estatisticas["ui_async"] = (engine_async.sync_engine, medirPool(engine_async.sync_engine, "ui_async"))
+        _fabrica_assincrona = async_sessionmaker(engine_async, autoflush=False, expire_on_commit=False)
+        return _fabrica_assincrona
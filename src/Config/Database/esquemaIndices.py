@@ -0,0 +1,215 @@
+import time
+from typing import Dict, List
+
+from sqlalchemy import inspect, text
+
+from src.Config.Database.db import Base, engine as engine_principal
+from src.Models import (
+    _0000Model, _0150Model, _0200Model, c100Model, c170Model, c170novaModel, c170cloneModel,
+    tributacaoModel, fornecedorModel,
+)
+
+# Tabelas SPED e de cadastro cujos índices compostos (consultas quentes) são declarados nos modelos
+# (__table_args__): create_all os cria em bancos novos e criarAusentes nos existentes
+TABELAS_INDEXADAS = (
+    "0000", "0150", "0200", "c100", "c170", "c170nova", "c170_clone",
+    "cadastro_tributacao", "cadastro_fornecedores",
+)
+
+# Linhas da geração publicada do período (mesmo filtro de periodoVersaoService.filtroVigente)
+_VIGENTE = "({a}.empresa_id, {a}.periodo, {a}.geracao) IN (SELECT empresa_id, periodo, geracao FROM periodo_versao WHERE geracao IS NOT NULL)"
+
+# Consultas quentes conferidas com EXPLAIN: tabela (ou alias) e índice que deve atendê-la
+CONSULTAS_QUENTES = [
+    *({
+        "nome": f"geração do período ({tabela})",
+        "tabela": tabela,
+        "indice": f"ix_{tabela}_empresa_periodo_geracao",
+        "sql": f"SELECT id FROM `{tabela}` WHERE empresa_id = :empresa_id AND periodo = :periodo AND geracao = :geracao",
+    } for tabela in ("0000", "0150", "0200", "c100", "c170", "c170nova", "c170_clone")),
+    {
+        "nome": "C170NovaRepository.buscarDados",
+        "tabela": "c170",
+        "indice": "ix_c170_empresa_periodo_geracao",
+        "sql": f"""
+            SELECT c170.id FROM c170 JOIN c100 ON c170.id_c100 = c100.id
+            WHERE c170.empresa_id = :empresa_id AND {_VIGENTE.format(a="c170")} AND c100.geracao = c170.geracao
+              AND c170.cfop IN ('1101', '1401', '1102', '1403', '1910', '1116')
+        """,
+    },
+    {
+        "nome": "CalculoResultadoRepository.buscarRegistros",
+        "tabela": "c170_clone",
+        "indice": "ix_c170_clone_empresa_periodo_geracao",
+        "sql": f"""
+            SELECT id, vl_item, vl_desc, aliquota, aliquota_token FROM c170_clone
+            WHERE empresa_id = :empresa_id AND {_VIGENTE.format(a="c170_clone")}
+        """,
+    },
+    {
+        "nome": "exportação c170_clone x 0150",
+        "tabela": "r",
+        "indice": "ix_0150_empresa_part",
+        "sql": f"""
+            SELECT c.id, r.nome FROM c170_clone c
+            LEFT JOIN `0150` r ON r.cod_part = c.cod_part AND r.empresa_id = c.empresa_id
+             AND r.periodo = c.periodo AND r.geracao = c.geracao
+            WHERE c.empresa_id = :empresa_id AND c.periodo = :periodo AND {_VIGENTE.format(a="c")}
+        """,
+    },
+    {
+        "nome": "alíquotas c170_clone x cadastro_tributacao",
+        "tabela": "t",
+        "indice": "ix_cadastro_tributacao_empresa_produto_ncm",
+        "sql": f"""
+            SELECT c.id FROM c170_clone c
+            JOIN cadastro_tributacao t ON t.empresa_id = c.empresa_id AND t.produto = c.descr_compl AND t.ncm = c.ncm
+            WHERE c.empresa_id = :empresa_id AND {_VIGENTE.format(a="c")}
+        """,
+    },
+    {
+        "nome": "produtos válidos c170 x 0200",
+        "tabela": "r0200",
+        "indice": "ix_0200_empresa_item",
+        "sql": f"""
+            SELECT c170.id FROM c170
+            LEFT JOIN `0200` r0200 ON r0200.cod_item = c170.cod_item AND r0200.empresa_id = c170.empresa_id
+             AND {_VIGENTE.format(a="r0200")}
+            WHERE c170.empresa_id = :empresa_id AND {_VIGENTE.format(a="c170")}
+        """,
+    },
+    {
+        "nome": "fornecedores do C100",
+        "tabela": "f",
+        "indice": "ix_cadastro_fornecedores_empresa_part",
+        "sql": f"""
+            SELECT c100.id FROM c100
+            JOIN cadastro_fornecedores f ON f.cod_part = c100.cod_part AND f.empresa_id = c100.empresa_id
+            WHERE c100.empresa_id = :empresa_id AND {_VIGENTE.format(a="c100")}
+        """,
+    },
+]
+
+class EsquemaIndicesRepository:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def tabelasExistentes(self) -> set:
+        return set(inspect(self.engine).get_table_names())
+
+    def colunasExistentes(self, tabela: str) -> set:
+        return {coluna["name"] for coluna in inspect(self.engine).get_columns(tabela)}
+
+    def indicesExistentes(self, tabela: str) -> set:
+        return {indice["name"] for indice in inspect(self.engine).get_indexes(tabela)}
+
+    def criar(self, indice):
+        indice.create(bind=self.engine)
+
+    def explicar(self, sql: str, parametros: dict) -> List[dict]:
+        """Plano da consulta como lista de {tabela, chaves_possiveis, chave}"""
+        with self.engine.connect() as conn:
+            if self.engine.dialect.name == "sqlite":
+                # EXPLAIN QUERY PLAN: "SEARCH c170 USING INDEX ix_... (empresa_id=? AND ...)"
+                linhas = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), parametros).fetchall()
+                plano = []
+                for linha in linhas:
+                    partes = linha[-1].split()
+                    tabela = partes[1] if len(partes) > 1 else ""
+                    if "AS" in partes:
+                        tabela = partes[partes.index("AS") + 1]
+                    chave = partes[partes.index("INDEX") + 1] if "INDEX" in partes else None
+                    # O SQLite só informa o índice escolhido, não os candidatos
+                    plano.append({"tabela": tabela, "chaves_possiveis": None, "chave": chave})
+                return plano
+
+            resultado = conn.execute(text(f"EXPLAIN {sql}"), parametros).mappings().all()
+            return [{
+                "tabela": linha["table"],
+                "chaves_possiveis": set((linha["possible_keys"] or "").split(",")) - {""},
+                "chave": linha["key"],
+            } for linha in resultado]
+
+class EsquemaIndicesService:
+    """Cria os índices compostos declarados nos modelos e confere com EXPLAIN se as consultas quentes os usam.
+
+    Bancos criados antes dos índices só ganham as tabelas via create_all, que
+    não altera tabelas existentes; aqui cada índice ausente é criado com
+    CREATE INDEX (DDL online no InnoDB, sem bloquear as gravações).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.repository = EsquemaIndicesRepository(engine)
+
+    def indicesDeclarados(self) -> Dict[str, list]:
+        return {
+            tabela: list(Base.metadata.tables[tabela].indexes)
+            for tabela in TABELAS_INDEXADAS if tabela in Base.metadata.tables
+        }
+
+    def _tabelaDoIndice(self, nome: str) -> str:
+        return next(tabela for tabela, indices in self.indicesDeclarados().items()
+                    if any(indice.name == nome for indice in indices))
+
+    def criarAusentes(self) -> List[str]:
+        existentes_tabelas = self.repository.tabelasExistentes()
+        criados = []
+        for tabela, indices in self.indicesDeclarados().items():
+            if tabela not in existentes_tabelas:
+                continue
+            existentes = self.repository.indicesExistentes(tabela)
+            colunas = self.repository.colunasExistentes(tabela)
+            for indice in indices:
+                if indice.name in existentes:
+                    continue
+                if any(coluna.name not in colunas for coluna in indice.columns):
+                    # Coluna ainda não migrada (ex.: geracao): o índice é criado junto com ela
+                    continue
+                inicio = time.time()
+                try:
+                    self.repository.criar(indice)
+                    criados.append(indice.name)
+                    print(f"[INFO] Índice {indice.name} criado em `{tabela}` ({time.time() - inicio:.1f}s)")
+                except Exception as e:
+                    print(f"[ERROR] Falha ao criar índice {indice.name} em `{tabela}`: {e}")
+        return criados
+
+    def verificar(self, empresa_id: int = 0, periodo: str = "") -> List[dict]:
+        """Roda EXPLAIN nas consultas quentes; devolve as que não podem usar o índice esperado"""
+        faltando = []
+        for consulta in CONSULTAS_QUENTES:
+            try:
+                plano = self.repository.explicar(consulta["sql"], {"empresa_id": empresa_id, "periodo": periodo, "geracao": 0})
+            except Exception as e:
+                print(f"[WARN] EXPLAIN falhou para {consulta['nome']}: {e}")
+                continue
+
+            linha = next((l for l in plano if l["tabela"] == consulta["tabela"]), None)
+            if linha is None:
+                continue
+            possiveis = linha["chaves_possiveis"]
+            if possiveis is None:
+                possiveis = self.repository.indicesExistentes(self._tabelaDoIndice(consulta["indice"]))
+            if consulta["indice"] not in possiveis and linha["chave"] != consulta["indice"]:
+                faltando.append({**consulta, "chave": linha["chave"]})
+                print(f"[WARN] {consulta['nome']}: índice {consulta['indice']} indisponível "
+                      f"(plano usa {linha['chave'] or 'varredura completa'})")
+            # Índice disponível mas não escolhido (tabela pequena, estatísticas desatualizadas) não é falha
+        return faltando
+
+    def inicializar(self) -> List[dict]:
+        inicio = time.time()
+        criados = self.criarAusentes()
+        faltando = self.verificar()
+        print(f"[INFO] Índices verificados em {time.time() - inicio:.1f}s: {len(criados)} criado(s), "
+              f"{len(faltando)} consulta(s) sem índice")
+        return faltando
+
+def inicializarIndices(engine=None):
+    """Ponto de entrada da inicialização do app; falhas só geram log"""
+    try:
+        return EsquemaIndicesService(engine or engine_principal).inicializar()
+    except Exception as e:
+        print(f"[ERROR] Falha ao verificar índices do banco: {e}")
+        return []
@@ -0,0 +1,128 @@
+import time
+from threading import Lock
+from typing import Dict, List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.sql import sqltypes
+
+from src.Config.Database.db import Base, engine as engine_principal
+from src.Models import c170Model, c170novaModel, c170cloneModel
+from src.Utils.aliquota import VALID_TOKENS
+
+# Tabelas com colunas monetárias/de alíquota que eram VARCHAR em bancos antigos
+TABELAS_NUMERICAS = ("c170", "c170nova", "c170_clone")
+
+# Colunas que passaram a ser DECIMAL; as demais colunas numéricas do C170 seguem como texto
+COLUNAS_NUMERICAS = {
+    "c170": ("qtd", "vl_item", "vl_desc", "aliq_icms"),
+    "c170nova": ("qtd", "vl_item", "vl_desc"),
+    "c170_clone": ("qtd", "vl_item", "vl_desc", "aliquota", "resultado"),
+}
+COLUNAS_NOVAS = {"c170_clone": ("aliquota_token",)}
+
+# Texto aceito na conversão ("1234,56", "12,00%"); o resto vira NULL em vez de abortar o ALTER
+_NUMERO_MYSQL = "^-?[0-9]+([.][0-9]+)?$"
+
+class EsquemaNumericoRepository:
+    _verificado = False
+    _lock = Lock()
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def colunas(self, tabela: str) -> Dict[str, object]:
+        inspetor = inspect(self.engine)
+        if not inspetor.has_table(tabela):
+            return {}
+        return {coluna["name"]: coluna["type"] for coluna in inspetor.get_columns(tabela)}
+
+    def _tipo(self, tabela: str, coluna: str) -> str:
+        return Base.metadata.tables[tabela].c[coluna].type.compile(dialect=self.engine.dialect)
+
+    def adicionarColuna(self, tabela: str, coluna: str):
+        with self.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE `{tabela}` ADD COLUMN `{coluna}` {self._tipo(tabela, coluna)}"))
+
+    def separarTokens(self, tabela: str):
+        """ST/ISENTO/PAUTA gravados em aliquota passam para aliquota_token"""
+        tokens = ", ".join(f"'{token}'" for token in sorted(VALID_TOKENS))
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                UPDATE `{tabela}` SET aliquota_token = UPPER(TRIM(aliquota)), aliquota = NULL
+                WHERE UPPER(TRIM(aliquota)) IN ({tokens})
+            """))
+
+    def normalizarTexto(self, tabela: str, coluna: str) -> int:
+        """Deixa o VARCHAR no formato que o MySQL converte sem perda; devolve as linhas anuladas"""
+        valor = f"REPLACE(REPLACE(TRIM(`{coluna}`), ',', '.'), '%', '')"
+        with self.engine.begin() as conn:
+            anuladas = conn.execute(text(f"""
+                UPDATE `{tabela}` SET `{coluna}` = NULL
+                WHERE `{coluna}` IS NOT NULL AND NOT ({valor} REGEXP '{_NUMERO_MYSQL}')
+            """)).rowcount
+            conn.execute(text(f"UPDATE `{tabela}` SET `{coluna}` = {valor} WHERE `{coluna}` <> {valor}"))
+        return anuladas
+
+    def converter(self, tabela: str, colunas: List[str]):
+        """Um único ALTER por tabela: a cópia da tabela acontece uma vez só"""
+        alteracoes = ", ".join(f"MODIFY `{coluna}` {self._tipo(tabela, coluna)} NULL" for coluna in colunas)
+        with self.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE `{tabela}` {alteracoes}"))
+
+class EsquemaNumericoService:
+    """Converte as colunas de valores e alíquotas de VARCHAR para DECIMAL em bancos antigos.
+
+    create_all não altera tabelas existentes. No MySQL, cada tabela tem o
+    texto normalizado (vírgula decimal, "%", tokens de alíquota) e depois um
+    ALTER TABLE ... MODIFY com cópia da tabela; em bases grandes a primeira
+    abertura após a atualização demora. No SQLite só a coluna aliquota_token
+    é criada: a afinidade de tipo aceita os valores já gravados.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.repository = EsquemaNumericoRepository(engine)
+
+    def _migrarTabela(self, tabela: str):
+        existentes = self.repository.colunas(tabela)
+        if not existentes:
+            return
+        for coluna in COLUNAS_NOVAS.get(tabela, ()):
+            if coluna not in existentes:
+                print(f"[INFO] Adicionando coluna {coluna} em `{tabela}`...")
+                self.repository.adicionarColuna(tabela, coluna)
+
+        if self.engine.dialect.name != "mysql":
+            return
+        pendentes = [
+            coluna for coluna in COLUNAS_NUMERICAS[tabela]
+            if not isinstance(existentes[coluna], sqltypes.Numeric)
+        ]
+        if not pendentes:
+            return
+
+        inicio = time.time()
+        print(f"[INFO] Convertendo {', '.join(pendentes)} de `{tabela}` para DECIMAL...")
+        if "aliquota" in pendentes and "aliquota_token" in COLUNAS_NOVAS.get(tabela, ()):
+            self.repository.separarTokens(tabela)
+        for coluna in pendentes:
+            anuladas = self.repository.normalizarTexto(tabela, coluna)
+            if anuladas:
+                print(f"[WARN] `{tabela}`.{coluna}: {anuladas} valor(es) não numérico(s) gravado(s) como NULL")
+        self.repository.converter(tabela, pendentes)
+        print(f"[INFO] `{tabela}` convertida em {time.time() - inicio:.1f}s")
+
+    def garantir(self):
+        with EsquemaNumericoRepository._lock:
+            if EsquemaNumericoRepository._verificado:
+                return
+            for tabela in TABELAS_NUMERICAS:
+                self._migrarTabela(tabela)
+            EsquemaNumericoRepository._verificado = True
+
+def inicializarColunasNumericas(engine=None):
+    """Migração das colunas DECIMAL na inicialização do app; falhas só geram log"""
+    try:
+        EsquemaNumericoService(engine or engine_principal).garantir()
+    except Exception as e:
+        print(f"[ERROR] Falha ao converter colunas numéricas: {e}")
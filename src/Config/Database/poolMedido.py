@@ -0,0 +1,83 @@
+import time
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class EstatisticasPool:
+    """Contadores de um pool: checkouts, tempo de espera por conexão, conexões abertas e invalidadas"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._lock = Lock()
+        self.checkouts = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.conexoes_abertas = 0
+        self.invalidadas = 0
+
+    def registrarCheckout(self, espera: float):
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+            # Abaixo de 1 ms a conexão estava livre no pool
+            if espera >= 0.001:
+                self.esperas += 1
+
+    def registrarConexao(self):
+        with self._lock:
+            self.conexoes_abertas += 1
+
+    def registrarInvalidacao(self):
+        with self._lock:
+            self.invalidadas += 1
+
+    def resumo(self, pool=None) -> dict:
+        with self._lock:
+            dados = {
+                "checkouts": self.checkouts,
+                "esperas": self.esperas,
+                "espera_total": self.espera_total,
+                "espera_media": self.espera_total / self.checkouts if self.checkouts else 0.0,
+                "espera_maxima": self.espera_maxima,
+                "conexoes_abertas": self.conexoes_abertas,
+                "invalidadas": self.invalidadas,
+            }
+        if isinstance(pool, QueuePool):
+            dados.update({
+                "tamanho": pool.size(),
+                "em_uso": pool.checkedout(),
+                "livres": pool.checkedin(),
+                "excedente": max(0, pool.overflow()),
+            })
+        return dados
+
+class PoolMedido(QueuePool):
+    """QueuePool que mede quanto cada checkout esperou por uma conexão livre"""
+    estatisticas: EstatisticasPool = None
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        conexao = super()._do_get()
+        if self.estatisticas is not None:
+            # Inclui a abertura de conexão nova quando o pool ainda não a tinha
+            self.estatisticas.registrarCheckout(time.perf_counter() - inicio)
+        return conexao
+
+    def recreate(self):
+        # engine.dispose() recria o pool: os contadores continuam os mesmos
+        novo = super().recreate()
+        novo.estatisticas = self.estatisticas
+        return novo
+
+class PoolMedidoAssincrono(PoolMedido, AsyncAdaptedQueuePool):
+    """PoolMedido com a fila asyncio do AsyncAdaptedQueuePool, para engines de create_async_engine"""
+
+def medirPool(engine, nome: str) -> EstatisticasPool:
+    estatisticas = EstatisticasPool(nome)
+    engine.pool.estatisticas = estatisticas
+    event.listen(engine, "connect", lambda *_: estatisticas.registrarConexao())
+    event.listen(engine, "invalidate", lambda *_: estatisticas.registrarInvalidacao())
+    return estatisticas
@@ -1,9 +1,9 @@
 from sqlalchemy.exc import SQLAlchemyError
 from src.Services.Empresa.empresaService import obterCadastrarEmpresa, listarEmpresas
-from src.Config.Database.db import SessionLocal
+from src.Config.Database.db import SessionUI
 
 def cadastrarEmpresa(cnpj: str) -> dict:
-    session = SessionLocal()
+    session = SessionUI()
     try:
         return obterCadastrarEmpresa(session, cnpj)
     except SQLAlchemyError as e:
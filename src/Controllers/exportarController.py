@@ -1,7 +1,7 @@
-from src.Config.Database.db import SessionLocal
+from src.Config.Database.db import SessionLocal, fabricaSessaoAssincrona
 from src.Services.Exportar.exportarPlanilhaService import ExportarPlanilhaService
 from src.Services.Exportar.exportarProdutosService import ExportarProdutosService
-from src.Services.Produto.produtoService import ProdutosService
+from src.Services.Produto.produtoService import ProdutosService, ProdutosServiceAsync
 
 class ExportarController:
     
@@ -35,9 +35,8 @@ class ExportarController:
         try:
             print(f"[DEBUG] Buscar produtos: empresa_id={empresa_id}, pagina={pagina}, limite={limite}")
             
-            with SessionLocal() as session:
-                service = ProdutosService(session)
-                return service.buscarProdutos(empresa_id, pagina, limite, filtro_nome, categoria_fiscal)
+            service = ProdutosServiceAsync(fabricaSessaoAssincrona())
+            return await service.buscarProdutos(empresa_id, pagina, limite, filtro_nome, categoria_fiscal)
                 
         except Exception as e:
             print(f"[DEBUG] Erro inesperado ao buscar produtos: {e}")
@@ -53,6 +52,14 @@ class ExportarController:
             print(f"[DEBUG] Erro ao buscar categorias: {e}")
             return []
     
+    @staticmethod
+    async def buscarCategoriasFiscaisAsync(empresa_id: int) -> list:
+        try:
+            return await ProdutosServiceAsync(fabricaSessaoAssincrona()).buscarCategoriasFiscais(empresa_id)
+        except Exception as e:
+            print(f"[DEBUG] Erro ao buscar categorias: {e}")
+            return []
+    
     @staticmethod
     def contarProdutos(empresa_id: int) -> int:
         try:
@@ -61,4 +68,12 @@ class ExportarController:
                 return service.contarProdutos(empresa_id)
         except Exception as e:
             print(f"[DEBUG] Erro ao contar produtos: {e}")
-            return 0
\ No newline at end of file
+            return 0
+    
+    @staticmethod
+    async def contarProdutosAsync(empresa_id: int) -> int:
+        try:
+            return await ProdutosServiceAsync(fabricaSessaoAssincrona()).contarProdutos(empresa_id)
+        except Exception as e:
+            print(f"[DEBUG] Erro ao contar produtos: {e}")
+            return 0
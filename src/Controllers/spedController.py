@@ -1,6 +1,13 @@
 from ..Services.Sped.Leitor.processarSpedService import ProcessadorSped
+from ..Services.Sped.Leitor.checkpointService import CheckpointService
+from ..Services.Sped.Leitor.importacaoSpedService import ImportacaoSpedService
+from ..Services.Sped.Leitor.indiceSpedService import IndiceSpedService
 from ..Services.Sped.Leitor.validarRegistro import ValidadorPeriodoService
-from src.Utils.sanitizacao import calcularPeriodo
+from ..Services.Sped.Leitor.particaoPeriodoService import ParticaoPeriodoService
+from ..Services.Sped.Leitor.periodoVersaoService import PeriodoVersaoService
+from ..Services.Sped.Leitor.purgaPeriodoService import purgarEmSegundoPlano
+from src.Config.Database.db import PURGA_APOS_IMPORTACAO
+from src.Config.Database.esquemaNumerico import EsquemaNumericoService
 from src.Services.Sped.Pos.spedPosProcessamento import PosProcessamentoService
 from src.Services.Aliquotas.aliquotaPoupService import AliquotaPoupService
 
@@ -12,15 +19,37 @@ class SpedController:
         validador = ValidadorPeriodoService(self.session, empresa_id)
 
         try:
+            # Banco anterior às colunas DECIMAL: converte (ou espera a conversão da inicialização) antes de gravar
+            EsquemaNumericoService(self.session.bind).garantir()
+
             # 1. Obter períodos por arquivo
-            periodos_por_arquivo = self._extrairPeriodosArquivos(validador, caminhos_arquivos)
+            periodos_por_arquivo = self._extrairPeriodosArquivos(caminhos_arquivos)
             if "erro" in periodos_por_arquivo:
                 return periodos_por_arquivo
 
+            # Períodos cujos arquivos já foram importados sem alteração reaproveitam os dados existentes
+            reaproveitados = self._periodosReaproveitados(validador, empresa_id, periodos_por_arquivo)
+            if reaproveitados:
+                periodos_por_arquivo = {c: p for c, p in periodos_por_arquivo.items() if p not in reaproveitados}
+                caminhos_arquivos = [c for c in caminhos_arquivos if c in periodos_por_arquivo]
+                if not caminhos_arquivos:
+                    periodos = sorted(reaproveitados)
+                    return {
+                        "status": "ok",
+                        "mensagem": f"Arquivo(s) já importado(s) sem alterações para os períodos: {', '.join(periodos)}. "
+                                    "Dados existentes reaproveitados.",
+                        "periodos": periodos
+                    }
+
             periodos_unicos = list(set(periodos_por_arquivo.values()))
 
             # 2. Verificar se já existem períodos processados
-            periodos_existentes = [p for p in periodos_unicos if validador.periodoJaProcessado(p)]
+            # Períodos com importação interrompida são retomados, sem novo soft delete
+            periodos_retomaveis = self._periodosRetomaveis(empresa_id, periodos_por_arquivo)
+            periodos_existentes = [
+                p for p in periodos_unicos
+                if p not in periodos_retomaveis and validador.periodoJaProcessado(p)
+            ]
 
             if periodos_existentes and not forcar:
                 return {
@@ -29,14 +58,28 @@ class SpedController:
                     "mensagem": f"Já existem dados ativos para os períodos: {', '.join(periodos_existentes)}. Deseja sobrescrever todos?"
                 }
 
-            # 3. Apagar registros antigos (soft delete)
+            # 3. Nova geração por período (os dados antigos seguem lidos até a publicação)
+            versoes = PeriodoVersaoService(self.session, empresa_id)
+            particoes = ParticaoPeriodoService(self.session, empresa_id)
+            importacoes = ImportacaoSpedService(self.session)
             for periodo in set(periodos_existentes):
-                validador.aplicarSoftDelete(periodo)
+                importacoes.desativarPeriodo(empresa_id, periodo)
+            for periodo in periodos_unicos:
+                particoes.prepararPeriodo(periodo)
+                if periodo not in periodos_retomaveis:
+                    versoes.novaGeracao(periodo)
             self.session.commit()
+            # Todo período com geração nova recomeça do zero, inclusive os arquivos que já tinham checkpoint
+            self._descartarCheckpoints(empresa_id, periodos_por_arquivo, set(periodos_unicos) - periodos_retomaveis)
 
             # 4. Processar arquivos
             processador = ProcessadorSped(self.session, empresa_id)
-            await processador.executar(caminhos_arquivos)
+            await processador.executar(caminhos_arquivos, periodos_por_arquivo)
+            # Com a carga completa, a geração nova passa a ser a lida; as anteriores ficam para a purga
+            for periodo in periodos_unicos:
+                versoes.publicar(periodo)
+            if PURGA_APOS_IMPORTACAO and periodos_existentes:
+                purgarEmSegundoPlano(empresa_id, sorted(set(periodos_existentes)))
 
             # 5. Pós-processamento (pré-alíquota)
             pos = PosProcessamentoService(self.session, empresa_id)
@@ -68,16 +111,44 @@ class SpedController:
             self.session.rollback()
             return {"status": "erro", "mensagem": f"Erro durante o processamento: {str(e)}"}            
 
-    def _extrairPeriodosArquivos(self, validador, caminhos: list[str]) -> dict:
+    def _periodosReaproveitados(self, validador, empresa_id: int, periodos_por_arquivo: dict) -> set:
+        importacoes = ImportacaoSpedService(self.session)
+        arquivos_por_periodo = {}
+        for caminho, periodo in periodos_por_arquivo.items():
+            arquivos_por_periodo.setdefault(periodo, []).append(caminho)
+        return {
+            periodo for periodo, caminhos in arquivos_por_periodo.items()
+            if all(importacoes.arquivoJaImportado(empresa_id, caminho, periodo) for caminho in caminhos)
+            and validador.periodoJaProcessado(periodo)
+        }
+
+    def _periodosRetomaveis(self, empresa_id: int, periodos_por_arquivo: dict) -> set:
+        checkpoints = CheckpointService(self.session, empresa_id)
+        arquivos_por_periodo = {}
+        for caminho, periodo in periodos_por_arquivo.items():
+            arquivos_por_periodo.setdefault(periodo, []).append(caminho)
+        return {
+            periodo for periodo, caminhos in arquivos_por_periodo.items()
+            if all(checkpoints.existeCheckpoint(caminho) for caminho in caminhos)
+        }
+
+    def _descartarCheckpoints(self, empresa_id: int, periodos_por_arquivo: dict, periodos: set):
+        """Períodos que não são retomados recomeçam do zero"""
+        checkpoints = CheckpointService(self.session, empresa_id)
+        for caminho, periodo in periodos_por_arquivo.items():
+            if periodo in periodos:
+                checkpoints.remover(caminho)
+
+    def _extrairPeriodosArquivos(self, caminhos: list[str]) -> dict:
         periodos = {}
         for caminho in caminhos:
-            dt_ini = validador.extrairDataInicial(caminho)
-            if not dt_ini:
+            # O índice fica em cache e é reaproveitado pelo validador, checkpoints e leitor
+            periodo = IndiceSpedService.obter(caminho).periodo
+            if not periodo:
                 return {
                     "erro": True,
                     "status": "erro",
                     "mensagem": f"Registro |0000| não encontrado ou incompleto no arquivo {caminho}."
                 }
-            periodo = calcularPeriodo(dt_ini)
             periodos[caminho] = periodo
         return periodos
@@ -2,7 +2,7 @@ import flet as ft
 from src.Config.theme import apply_theme
 from src.Components.Empresa.empresaCard import cardEmpresa
 from src.Components.Empresa.empresaAction import on_empresa_change, on_entrar_click, on_cadastrar_click
-from src.Components.Empresa.empresaServiceUI import obter_dropdown_options
+from src.Components.Empresa.empresaServiceUI import carregar_dropdown_options
 
 def TelaEmpresa(page: ft.Page) -> ft.View:
     theme = apply_theme(page)
@@ -12,7 +12,8 @@ def TelaEmpresa(page: ft.Page) -> ft.View:
 
     selected_empresa = ft.Ref[ft.Dropdown]()
     btn_entrar = ft.Ref[ft.ElevatedButton]()
-    dropdown_options = obter_dropdown_options(page)
+    # Opções carregadas pelo pool assíncrono depois que a view é montada
+    dropdown_options = []
 
     card = cardEmpresa(
         theme=theme,
@@ -24,10 +25,13 @@ def TelaEmpresa(page: ft.Page) -> ft.View:
         on_cadastrar_click=lambda e: on_cadastrar_click(page)
     )
 
-    return ft.View(
+    view = ft.View(
         route="/empresa",
         controls=[card],
         vertical_alignment=ft.MainAxisAlignment.CENTER,
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
         bgcolor=theme["BACKGROUNDSCREEN"],
     )
+
+    page.run_task(carregar_dropdown_options, page, selected_empresa)
+    return view
@@ -7,7 +7,18 @@ from src.Controllers.exportarController import ExportarController
 def TelaPrincipal(page: ft.Page, empresa_nome: str, empresa_id: int) -> ft.View:
     theme = apply_theme(page)
 
-    produtos_qtd = str(ExportarController.contarProdutos(empresa_id))
+    # Contagem preenchida pelo pool assíncrono depois que a tela abre
+    produtos_qtd = "..."
+    produtos_ref = ft.Ref[ft.Text]()
+
+    async def carregarContagem():
+        quantidade = await ExportarController.contarProdutosAsync(empresa_id)
+        if produtos_ref.current is None:
+            return
+        produtos_ref.current.value = f"{quantidade} produtos cadastrados"
+        if produtos_ref.current.page:
+            produtos_ref.current.update()
+
     refs = {
         "nome_arquivo": ft.Ref[ft.Text](),
         "status_envio": ft.Ref[ft.Text](),
@@ -33,7 +44,7 @@ def TelaPrincipal(page: ft.Page, empresa_nome: str, empresa_id: int) -> ft.View:
     refs['empresa_id'] = empresa_id
     refs['picker_sped'] = picker_sped
 
-    return ft.View(
+    view = ft.View(
         route="/principal",
         bgcolor=theme["BACKGROUNDSCREEN"],
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -44,7 +55,8 @@ def TelaPrincipal(page: ft.Page, empresa_nome: str, empresa_id: int) -> ft.View:
                 on_gerenciar_produtos=lambda e: page.go(f"/produtos?id={empresa_id}&nome={empresa_nome}"), 
                 theme=theme,
                 empresa_nome=empresa_nome,
-                produtos_qtd=produtos_qtd
+                produtos_qtd=produtos_qtd,
+                produtos_ref=produtos_ref
             ),
             ft.Container(height=24),  
             ft.Container(
@@ -60,4 +72,7 @@ def TelaPrincipal(page: ft.Page, empresa_nome: str, empresa_id: int) -> ft.View:
                 )
             )
         ]
-    )
\ No newline at end of file
+    )
+
+    page.run_task(carregarContagem)
+    return view
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from src.Config.Database.db import Base
 
 class Registro0000(Base):
     __tablename__ = "0000"
+    __table_args__ = (
+        Index("ix_0000_empresa_periodo_geracao", "empresa_id", "periodo", "geracao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
@@ -23,4 +26,5 @@ class Registro0000(Base):
     ind_ativ = Column(String(10))
     filial = Column(String(10))
     periodo = Column(String(10))
-    is_active = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    geracao = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from src.Config.Database.db import Base
 
 class Registro0150(Base):
     __tablename__ = "0150"
+    __table_args__ = (
+        Index("ix_0150_empresa_periodo_geracao", "empresa_id", "periodo", "geracao"),
+        Index("ix_0150_empresa_part", "empresa_id", "cod_part"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
@@ -23,4 +27,5 @@ class Registro0150(Base):
     uf = Column(String(5))
     pj_pf = Column(String(5))
     periodo = Column(String(10))
-    is_active = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    geracao = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from src.Config.Database.db import Base
 
 class Registro0200(Base):
     __tablename__ = "0200"
+    __table_args__ = (
+        Index("ix_0200_empresa_periodo_geracao", "empresa_id", "periodo", "geracao"),
+        Index("ix_0200_empresa_item", "empresa_id", "cod_item"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
@@ -20,4 +24,5 @@ class Registro0200(Base):
     aliq_icms = Column(String(10))
     cest = Column(String(10))
     periodo = Column(String(10))
-    is_active = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    geracao = Column(Integer, nullable=False, default=0, server_default="0")
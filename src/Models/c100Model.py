@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from src.Config.Database.db import Base
 
 class C100(Base):
     __tablename__ = "c100"
+    __table_args__ = (
+        Index("ix_c100_empresa_periodo_geracao", "empresa_id", "periodo", "geracao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
@@ -37,4 +40,5 @@ class C100(Base):
     vl_pis_st = Column(String(20))
     vl_cofins_st = Column(String(20))
     filial = Column(String(10))
-    is_active = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    geracao = Column(Integer, nullable=False, default=0, server_default="0")
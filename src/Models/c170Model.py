@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, Numeric
 from src.Config.Database.db import Base
 
 class C170(Base):
     __tablename__ = "c170"
+    __table_args__ = (
+        Index("ix_c170_empresa_periodo_geracao", "empresa_id", "periodo", "geracao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
@@ -11,16 +14,16 @@ class C170(Base):
     num_item = Column(String(10))
     cod_item = Column(String(60))
     descr_compl = Column(String(255))
-    qtd = Column(String(20))
+    qtd = Column(Numeric(18, 5))
     unid = Column(String(10))
-    vl_item = Column(String(20))
-    vl_desc = Column(String(20))
+    vl_item = Column(Numeric(18, 2))
+    vl_desc = Column(Numeric(18, 2))
     ind_mov = Column(String(5))
     cst_icms = Column(String(10))
     cfop = Column(String(10))
     cod_nat = Column(String(11))
     vl_bc_icms = Column(String(20))
-    aliq_icms = Column(String(10))
+    aliq_icms = Column(Numeric(7, 2))
     vl_icms = Column(String(20))
     vl_bc_icms_st = Column(String(20))
     aliq_st = Column(String(10))
@@ -55,4 +58,5 @@ class C170(Base):
     mercado = Column(String(15), default='')
     aliquota = Column(String(10), default='')
     resultado = Column(String(20), nullable=True)
-    is_active = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    geracao = Column(Integer, nullable=False, default=0, server_default="0")
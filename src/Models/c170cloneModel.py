@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, Numeric
 from src.Config.Database.db import Base
 
 class C170Clone(Base):
     __tablename__ = "c170_clone"
+    __table_args__ = (
+        Index("ix_c170_clone_empresa_periodo_geracao", "empresa_id", "periodo", "geracao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
@@ -11,10 +14,10 @@ class C170Clone(Base):
     num_item = Column(String(10))
     cod_item = Column(String(60))
     descr_compl = Column(String(255))
-    qtd = Column(String(20))
+    qtd = Column(Numeric(18, 5))
     unid = Column(String(10))
-    vl_item = Column(String(20))
-    vl_desc = Column(String(20))
+    vl_item = Column(Numeric(18, 2))
+    vl_desc = Column(Numeric(18, 2))
     cfop = Column(String(10))
     cst = Column(String(3))
     ncm = Column(String(40))
@@ -24,6 +27,9 @@ class C170Clone(Base):
     cod_part = Column(String(60))
     num_doc = Column(String(20))
     chv_nfe = Column(String(60))
-    aliquota = Column(String(10))
-    resultado = Column(String(20))
-    is_active = Column(Boolean, nullable=False, default=True)
+    # Taxa em % (12.00); ST/ISENTO/PAUTA ficam em aliquota_token com aliquota nula
+    aliquota = Column(Numeric(7, 2))
+    aliquota_token = Column(String(12))
+    resultado = Column(Numeric(18, 2))
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    geracao = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, Numeric
 from src.Config.Database.db import Base
 
 class C170Nova(Base):
     __tablename__ = "c170nova"
+    __table_args__ = (
+        Index("ix_c170nova_empresa_periodo_geracao", "empresa_id", "periodo", "geracao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
@@ -12,10 +15,10 @@ class C170Nova(Base):
     num_item = Column(String(10))
     descr_compl = Column(String(255))
     cod_ncm = Column(String(40))
-    qtd = Column(String(20))
+    qtd = Column(Numeric(18, 5))
     unid = Column(String(10))
-    vl_item = Column(String(20))
-    vl_desc = Column(String(20))
+    vl_item = Column(Numeric(18, 2))
+    vl_desc = Column(Numeric(18, 2))
     cst = Column(String(10))
     cfop = Column(String(10))
     id_c100 = Column(String(10))
@@ -24,4 +27,5 @@ class C170Nova(Base):
     cod_part = Column(String(60))
     num_doc = Column(String(20))
     chv_nfe = Column(String(60))
-    is_active = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    geracao = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from src.Config.Database.db import Base
 
 class CadastroFornecedor(Base):
     __tablename__ = "cadastro_fornecedores"
+    __table_args__ = (
+        Index("ix_cadastro_fornecedores_empresa_part", "empresa_id", "cod_part"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
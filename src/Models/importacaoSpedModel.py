@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Boolean, BigInteger, DateTime, JSON
+from src.Config.Database.db import Base
+
+class ImportacaoSped(Base):
+    __tablename__ = "importacao_sped"
+
+    id = Column(Integer, primary_key=True, index=True)
+    empresa_id = Column(Integer, index=True)
+    periodo = Column(String(10))
+    hash = Column(String(64), index=True)
+    # digestoAmostra: início e fim do arquivo; só descarta candidatos antes do digest completo
+    amostra = Column(String(64))
+    tamanho = Column(BigInteger)
+    contagens = Column(JSON)
+    status = Column(String(20))
+    importado_em = Column(DateTime)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from src.Config.Database.db import Base
+
+class PeriodoVersao(Base):
+    __tablename__ = "periodo_versao"
+
+    empresa_id = Column(Integer, primary_key=True)
+    periodo = Column(String(10), primary_key=True)
+    # Geração publicada (lida pelas consultas); NULL enquanto a primeira importação não termina
+    geracao = Column(Integer, nullable=True)
+    # Última geração iniciada; as linhas da importação em curso são gravadas com ela
+    ultima_geracao = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime)
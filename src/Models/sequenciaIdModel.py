@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, BigInteger
+from src.Config.Database.db import Base
+
+class SequenciaId(Base):
+    __tablename__ = "sequencia_id"
+
+    tabela = Column(String(30), primary_key=True)
+    ultimo_id = Column(BigInteger, nullable=False, default=0)
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from src.Config.Database.db import Base
 
 class CadastroTributacao(Base):
     __tablename__ = "cadastro_tributacao"
+    __table_args__ = (
+        Index("ix_cadastro_tributacao_empresa_produto_ncm", "empresa_id", "produto", "ncm"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     empresa_id = Column(Integer, index=True)
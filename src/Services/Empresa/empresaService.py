@@ -1,6 +1,7 @@
 import asyncio
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from src.Config.Database.db import SessionLocal
+from src.Config.Database.db import SessionUI, fabricaSessaoAssincrona
 from src.Models.empresasModel import Empresa
 from src.Utils.cnpj import buscarInformacoesApi
 
@@ -30,6 +31,15 @@ def obterCadastrarEmpresa(session: Session, cnpj: str) -> dict:
     }
 
 def listarEmpresas():
-    with SessionLocal() as db:
+    with SessionUI() as db:
         empresas = db.query(Empresa).all()
-        return [{"id": e.id, "razao_social": e.razao_social} for e in empresas]
\ No newline at end of file
+        return [{"id": e.id, "razao_social": e.razao_social} for e in empresas]
+
+async def listarEmpresasAsync():
+    """listarEmpresas pelo pool assíncrono da interface; sem driver asyncio roda numa thread"""
+    fabrica = fabricaSessaoAssincrona()
+    if fabrica is None:
+        return await asyncio.to_thread(listarEmpresas)
+    async with fabrica() as db:
+        empresas = (await db.execute(select(Empresa.id, Empresa.razao_social))).all()
+        return [{"id": e.id, "razao_social": e.razao_social} for e in empresas]
@@ -4,6 +4,7 @@ from openpyxl.styles import Font, PatternFill
 from sqlalchemy.orm import Session
 from src.Models.c170cloneModel import C170Clone 
 from src.Models._0150Model import Registro0150
+from src.Services.Sped.Leitor.periodoVersaoService import vigenteOrm
 
 COLUNAS = [
     'id', 'empresa_id', 'id_c100', 'ind_oper', 'filial', 'periodo', 'reg', 'cod_part',
@@ -27,12 +28,12 @@ class ExportarPlanilhaRepository:
                 (Registro0150.cod_part == C170Clone.cod_part) &
                 (Registro0150.empresa_id == C170Clone.empresa_id) &
                 (Registro0150.periodo == C170Clone.periodo) &
-                (Registro0150.is_active == True)
+                (Registro0150.geracao == C170Clone.geracao)
             )
             .filter(
                 C170Clone.empresa_id == empresa_id,
                 C170Clone.periodo == periodo,
-                C170Clone.is_active == True
+                vigenteOrm(C170Clone)
             )
             .distinct(C170Clone.id)
         )
@@ -73,6 +74,8 @@ class ExportarPlanilhaService:
                         linha.append(nome or "")
                     elif col == "cnpj":
                         linha.append(cnpj or "")
+                    elif col == "aliquota" and c170.aliquota_token:
+                        linha.append(c170.aliquota_token)
                     else:
                         valor = getattr(c170, col, None)
                         linha.append(valor if valor is not None else "")
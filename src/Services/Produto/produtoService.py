@@ -1,8 +1,64 @@
+import asyncio
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, select
 from src.Models.tributacaoModel import CadastroTributacao
 from src.Utils.aliquota import tratarAliquota
 
+def filtrosProdutos(empresa_id: int, filtro_nome: str = "", categoria_fiscal: str = "") -> list:
+    """Condições da listagem de produtos, comuns às versões síncrona e assíncrona"""
+    filtros = [CadastroTributacao.empresa_id == empresa_id]
+
+    if filtro_nome.strip():
+        filtro_like = f"%{filtro_nome.strip().lower()}%"
+        filtros.append(
+            or_(
+                func.lower(CadastroTributacao.produto).like(filtro_like),
+                func.lower(CadastroTributacao.codigo).like(filtro_like),
+                func.lower(CadastroTributacao.ncm).like(filtro_like)
+            )
+        )
+
+    if categoria_fiscal.strip():
+        filtros.append(CadastroTributacao.categoriaFiscal == categoria_fiscal)
+    return filtros
+
+def filtrosCategorias(empresa_id: int) -> list:
+    return [
+        CadastroTributacao.empresa_id == empresa_id,
+        CadastroTributacao.categoriaFiscal.isnot(None),
+        CadastroTributacao.categoriaFiscal != "",
+    ]
+
+def produtoParaDict(produto) -> dict:
+    return {
+        "id": produto.id,
+        "codigo": produto.codigo or "",
+        "nome": produto.produto or "",
+        "ncm": produto.ncm or "",
+        "aliquota": tratarAliquota(produto.aliquota),
+        "categoria_fiscal": produto.categoriaFiscal or ""
+    }
+
+def paginaProdutos(produtos: list, total: int, pagina: int, limite: int) -> dict:
+    total_paginas = (total + limite - 1) // limite if total > 0 else 1
+    return {
+        "produtos": produtos,
+        "total": total,
+        "pagina": pagina,
+        "total_paginas": total_paginas,
+        "status": "sucesso"
+    }
+
+def erroBuscaProdutos(e: Exception) -> dict:
+    return {
+        "produtos": [],
+        "total": 0,
+        "pagina": 1,
+        "total_paginas": 0,
+        "status": "erro",
+        "mensagem": f"Erro ao buscar produtos: {str(e)}"
+    }
+
 class ProdutosService:
     def __init__(self, session: Session):
         self.session = session
@@ -10,67 +66,27 @@ class ProdutosService:
     def buscarProdutos(self, empresa_id: int, pagina: int = 1, limite: int = 200, filtro_nome: str = "", categoria_fiscal: str = "") -> dict:
         try:
             query = self.session.query(CadastroTributacao).filter(
-                CadastroTributacao.empresa_id == empresa_id
+                *filtrosProdutos(empresa_id, filtro_nome, categoria_fiscal)
             )
             
-            if filtro_nome.strip():
-                filtro_like = f"%{filtro_nome.strip().lower()}%"
-                query = query.filter(
-                    or_(
-                        func.lower(CadastroTributacao.produto).like(filtro_like),
-                        func.lower(CadastroTributacao.codigo).like(filtro_like),
-                        func.lower(CadastroTributacao.ncm).like(filtro_like)
-                    )
-                )
-            
-            if categoria_fiscal.strip():
-                query = query.filter(CadastroTributacao.categoriaFiscal == categoria_fiscal)
-            
             total = query.count()
             
             offset = (pagina - 1) * limite
             produtos_db = query.offset(offset).limit(limite).all()
             
-            produtos = []
-            for produto in produtos_db:
-                produtos.append({
-                    "id": produto.id,
-                    "codigo": produto.codigo or "",
-                    "nome": produto.produto or "",
-                    "ncm": produto.ncm or "",
-                    "aliquota": tratarAliquota(produto.aliquota),
-                    "categoria_fiscal": produto.categoriaFiscal or ""
-                })
-            
-            total_paginas = (total + limite - 1) // limite if total > 0 else 1
-            
-            return {
-                "produtos": produtos,
-                "total": total,
-                "pagina": pagina,
-                "total_paginas": total_paginas,
-                "status": "sucesso"
-            }
+            produtos = [produtoParaDict(produto) for produto in produtos_db]
+            return paginaProdutos(produtos, total, pagina, limite)
             
         except Exception as e:
             print(f"[ERRO] Erro ao buscar produtos: {e}")
             import traceback
             traceback.print_exc()  # Para ver o stack completo
-            return {
-                "produtos": [],
-                "total": 0,
-                "pagina": 1,
-                "total_paginas": 0,
-                "status": "erro",
-                "mensagem": f"Erro ao buscar produtos: {str(e)}"
-            }
+            return erroBuscaProdutos(e)
     
     def buscarCategoriasFiscais(self, empresa_id: int) -> list:
         try:
             categorias = self.session.query(CadastroTributacao.categoriaFiscal)\
-                .filter(CadastroTributacao.empresa_id == empresa_id)\
-                .filter(CadastroTributacao.categoriaFiscal.isnot(None))\
-                .filter(CadastroTributacao.categoriaFiscal != "")\
+                .filter(*filtrosCategorias(empresa_id))\
                 .distinct()\
                 .order_by(CadastroTributacao.categoriaFiscal)\
                 .all()
@@ -195,4 +211,79 @@ class ProdutosService:
                 .count()
         except Exception as e:
             print(f"[ERRO] Erro ao contar produtos: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+class ProdutosServiceAsync:
+    """Listagem, contagem e categorias de produtos para a interface, no event loop do Flet.
+
+    Cada consulta abre sua própria AsyncSession (fabricaSessaoAssincrona), então
+    a contagem e a página da listagem rodam juntas e pedidos simultâneos da tela
+    usam conexões diferentes do pool. Sem o driver asyncio (fabrica None), cai
+    no ProdutosService com SessionUI numa thread (asyncio.to_thread).
+    """
+
+    def __init__(self, fabrica=None):
+        self.fabrica = fabrica
+
+    @staticmethod
+    def _emThread(metodo: str, *args):
+        from src.Config.Database.db import SessionUI
+
+        def executar():
+            with SessionUI() as session:
+                return getattr(ProdutosService(session), metodo)(*args)
+        return asyncio.to_thread(executar)
+
+    async def _escalar(self, consulta):
+        async with self.fabrica() as session:
+            return await session.scalar(consulta)
+
+    async def _linhas(self, consulta) -> list:
+        async with self.fabrica() as session:
+            return (await session.execute(consulta)).all()
+
+    async def buscarProdutos(self, empresa_id: int, pagina: int = 1, limite: int = 200, filtro_nome: str = "", categoria_fiscal: str = "") -> dict:
+        if self.fabrica is None:
+            return await self._emThread("buscarProdutos", empresa_id, pagina, limite, filtro_nome, categoria_fiscal)
+        try:
+            filtros = filtrosProdutos(empresa_id, filtro_nome, categoria_fiscal)
+            colunas = CadastroTributacao.__table__.c
+            total, linhas = await asyncio.gather(
+                self._escalar(select(func.count()).select_from(CadastroTributacao).where(*filtros)),
+                self._linhas(
+                    select(colunas.id, colunas.codigo, colunas.produto, colunas.ncm, colunas.aliquota, colunas.categoriaFiscal)
+                    .where(*filtros)
+                    .offset((pagina - 1) * limite)
+                    .limit(limite)
+                ),
+            )
+            return paginaProdutos([produtoParaDict(linha) for linha in linhas], total or 0, pagina, limite)
+        except Exception as e:
+            print(f"[ERRO] Erro ao buscar produtos: {e}")
+            return erroBuscaProdutos(e)
+
+    async def buscarCategoriasFiscais(self, empresa_id: int) -> list:
+        if self.fabrica is None:
+            return await self._emThread("buscarCategoriasFiscais", empresa_id)
+        try:
+            linhas = await self._linhas(
+                select(CadastroTributacao.categoriaFiscal)
+                .where(*filtrosCategorias(empresa_id))
+                .distinct()
+                .order_by(CadastroTributacao.categoriaFiscal)
+            )
+            return [cat[0] for cat in linhas if cat[0]]
+        except Exception as e:
+            print(f"[ERRO] Erro ao buscar categorias: {e}")
+            return []
+
+    async def contarProdutos(self, empresa_id: int) -> int:
+        if self.fabrica is None:
+            return await self._emThread("contarProdutos", empresa_id)
+        try:
+            return await self._escalar(
+                select(func.count()).select_from(CadastroTributacao).where(CadastroTributacao.empresa_id == empresa_id)
+            ) or 0
+        except Exception as e:
+            print(f"[ERRO] Erro ao contar produtos: {e}")
+            return 0
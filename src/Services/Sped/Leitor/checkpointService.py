@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+from threading import Lock
+from sqlalchemy import text
+
+from .digestoArquivo import digestoPrefixo, novoDigesto
+from .indiceSpedService import IndiceSpedService
+
+DIRETORIO_CHECKPOINTS = os.path.join(os.path.expanduser("~"), ".apuradorICMS", "checkpoints")
+
+# Tabelas gravadas pelo LeitorService, na ordem de dependência
+TABELAS_LEITURA = ("0000", "0150", "0200", "c100", "c170")
+
+class CheckpointRepository:
+    def __init__(self, session, diretorio: str = DIRETORIO_CHECKPOINTS):
+        self.session = session
+        self.diretorio = diretorio
+
+    def caminhoCheckpoint(self, empresa_id: int, caminho_arquivo: str) -> str:
+        chave = hashlib.sha1(os.path.abspath(caminho_arquivo).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.diretorio, f"{empresa_id}_{chave}.json")
+
+    def ler(self, empresa_id: int, caminho_arquivo: str) -> dict | None:
+        try:
+            with open(self.caminhoCheckpoint(empresa_id, caminho_arquivo), "r", encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+
+    def gravar(self, empresa_id: int, caminho_arquivo: str, dados: dict):
+        os.makedirs(self.diretorio, exist_ok=True)
+        destino = self.caminhoCheckpoint(empresa_id, caminho_arquivo)
+        temporario = destino + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo)
+        os.replace(temporario, destino)
+
+    def remover(self, empresa_id: int, caminho_arquivo: str):
+        try:
+            os.remove(self.caminhoCheckpoint(empresa_id, caminho_arquivo))
+        except FileNotFoundError:
+            pass
+
+    def removerApos(self, empresa_id: int, periodo: str, ultimos_ids: dict, faixas: dict | None):
+        """Apaga linhas gravadas depois do checkpoint (flush interrompido), filhas antes dos pais.
+
+        Só a faixa de ids reservada pelo leitor do arquivo é varrida, então
+        outros arquivos do mesmo período não são tocados. Checkpoints sem
+        faixas (gravados antes delas) apagam tudo acima do último id do período.
+        """
+        for tabela in reversed(TABELAS_LEITURA):
+            parametros = {"empresa_id": empresa_id, "periodo": periodo, "ultimo_id": ultimos_ids.get(tabela) or 0}
+            filtro_faixa = ""
+            if faixas is not None:
+                if tabela not in faixas:
+                    continue
+                parametros["inicio"], parametros["limite"] = faixas[tabela]
+                filtro_faixa = "AND id >= :inicio AND id < :limite"
+            self.session.execute(text(f"""
+                DELETE FROM `{tabela}`
+                WHERE empresa_id = :empresa_id AND periodo = :periodo AND id > :ultimo_id {filtro_faixa}
+            """), parametros)
+
+class CheckpointService:
+    """Checkpoints por arquivo SPED: offset já confirmado no banco e contexto para retomar a leitura.
+
+    O checkpoint guarda o digest dos bytes já lidos (calculado pelo próprio
+    leitor); só vale se o tamanho do arquivo e esse prefixo não mudaram. Caso
+    contrário é descartado e a leitura recomeça do início.
+    """
+
+    # Prefixos já validados nesta execução: o controller confere o checkpoint e o
+    # leitor continua do mesmo digest, sem ler o prefixo do arquivo de novo
+    _validados = {}
+    _lock = Lock()
+
+    def __init__(self, session, empresa_id, diretorio: str = DIRETORIO_CHECKPOINTS):
+        self.empresa_id = empresa_id
+        self.repository = CheckpointRepository(session, diretorio)
+        # Digest do prefixo validado, continuado pelo leitor a partir do offset
+        self.digestos = {}
+
+    @staticmethod
+    def periodoArquivo(caminho: str) -> str | None:
+        return IndiceSpedService.obter(caminho).periodo
+
+    @staticmethod
+    def _chaveValidado(caminho: str, checkpoint: dict) -> tuple:
+        estado = os.stat(caminho)
+        return (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns,
+                checkpoint.get("offset", 0), checkpoint.get("hash"))
+
+    def carregar(self, caminho: str) -> dict | None:
+        """Checkpoint válido do arquivo ou None (inexistente ou arquivo alterado)"""
+        checkpoint = self.repository.ler(self.empresa_id, caminho)
+        if not checkpoint:
+            return None
+
+        digesto = None
+        if checkpoint.get("tamanho") == os.path.getsize(caminho):
+            with CheckpointService._lock:
+                digesto = CheckpointService._validados.pop(self._chaveValidado(caminho, checkpoint), None)
+            if digesto is None:
+                digesto = digestoPrefixo(caminho, checkpoint.get("offset", 0))
+        if digesto is None or checkpoint.get("hash") != digesto.hexdigest():
+            print(f"[INFO] Checkpoint descartado: {os.path.basename(caminho)} foi alterado.")
+            self.repository.remover(self.empresa_id, caminho)
+            return None
+
+        self.digestos[caminho] = digesto
+        return checkpoint
+
+    def digestoInicial(self, caminho: str):
+        """Digest a ser continuado pelo leitor: o do prefixo validado ou um novo"""
+        return self.digestos.pop(caminho, None) or novoDigesto()
+
+    def existeCheckpoint(self, caminho: str) -> bool:
+        checkpoint = self.carregar(caminho)
+        if checkpoint is None:
+            return False
+        # O digest validado fica para o carregar do leitor
+        with CheckpointService._lock:
+            CheckpointService._validados[self._chaveValidado(caminho, checkpoint)] = self.digestos.pop(caminho)
+        return True
+
+    def iniciar(self, caminho: str) -> dict:
+        """Cria o checkpoint do início do arquivo; ids e faixas vêm do leitor a cada flush"""
+        periodo = self.periodoArquivo(caminho)
+        checkpoint = {
+            "arquivo": os.path.abspath(caminho),
+            "tamanho": os.path.getsize(caminho),
+            "hash": novoDigesto().hexdigest(),
+            "offset": 0,
+            "concluido": False,
+            "periodo": periodo,
+            "dt_ini_0000": None,
+            "filial": None,
+            "chave_c100": None,
+            "documento_c100": None,
+            "contagens": {},
+            # Por tabela: último id confirmado e faixa reservada em uso pelo leitor
+            "ultimos_ids": {},
+            "faixas": {},
+        }
+        self.repository.gravar(self.empresa_id, caminho, checkpoint)
+        return checkpoint
+
+    def atualizar(self, caminho: str, checkpoint: dict, **campos):
+        checkpoint.update(campos)
+        self.repository.gravar(self.empresa_id, caminho, checkpoint)
+
+    def prepararRetomada(self, checkpoint: dict):
+        """Remove do banco o que um flush interrompido gravou além do checkpoint"""
+        faixas = checkpoint.get("faixas")
+        legado = faixas is None and checkpoint.get("ultimos_ids")
+        if checkpoint.get("periodo") and (faixas or legado):
+            self.repository.removerApos(self.empresa_id, checkpoint["periodo"], checkpoint["ultimos_ids"], faixas)
+
+    def remover(self, caminho: str):
+        self.repository.remover(self.empresa_id, caminho)
+        caminho_absoluto = os.path.abspath(caminho)
+        with CheckpointService._lock:
+            for chave in [chave for chave in CheckpointService._validados if chave[0] == caminho_absoluto]:
+                del CheckpointService._validados[chave]
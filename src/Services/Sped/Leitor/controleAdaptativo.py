@@ -0,0 +1,86 @@
+import os
+import time
+from typing import Optional
+
+from src.Utils.memoria import rssProcesso
+
+# Teto de memória do processo para a importação (MB); 0 desativa o ajuste
+TETO_MEMORIA_MB_PADRAO = 2048
+
+class ControleAdaptativo:
+    """Ajusta o tamanho dos lotes de leitura e o limiar de flush a cada salvamento.
+
+    Com o RSS acima de `uso_maximo` do teto, lote e limiar caem pela metade. Com
+    folga (abaixo de `uso_folga`), crescem enquanto a vazão (registros gravados
+    por segundo entre dois flushes) continuar subindo; se a vazão cair após um
+    crescimento, o passo é desfeito e o tamanho fica estável por alguns flushes.
+    """
+
+    def __init__(self, tamanho_lote: int, limite_buffer: int, teto_memoria_mb: Optional[int] = None,
+                 lote_minimo: int = 1000, lote_maximo: int = 100000, fator: float = 1.5,
+                 uso_maximo: float = 0.85, uso_folga: float = 0.6, flushes_estaveis: int = 5):
+        if teto_memoria_mb is None:
+            teto_memoria_mb = int(os.getenv("LIMITE_MEMORIA_MB", TETO_MEMORIA_MB_PADRAO))
+        self.teto_memoria = teto_memoria_mb * 1024 * 1024
+        self.tamanho_lote = tamanho_lote
+        self.limite_buffer = limite_buffer
+        self.proporcao_buffer = limite_buffer / tamanho_lote
+        self.lote_minimo = lote_minimo
+        self.lote_maximo = lote_maximo
+        self.fator = fator
+        self.uso_maximo = uso_maximo
+        self.uso_folga = uso_folga
+        self.flushes_estaveis = flushes_estaveis
+
+        self.ajustes = []
+        self._ultima_taxa = None
+        self._cresceu = False
+        self._espera = 0
+        self._fim_ultimo_flush = time.time()
+
+    @property
+    def ativo(self) -> bool:
+        return self.teto_memoria > 0
+
+    def registrarFlush(self, registros: int, latencia: float) -> bool:
+        """Avalia o flush recém-concluído; True quando os tamanhos mudaram"""
+        agora = time.time()
+        intervalo = max(agora - self._fim_ultimo_flush, 1e-6)
+        self._fim_ultimo_flush = agora
+        rss = rssProcesso()
+        if not self.ativo or rss is None or not registros:
+            return False
+
+        taxa = registros / intervalo
+        uso = rss / self.teto_memoria
+        novo_lote, motivo = self.tamanho_lote, None
+
+        if uso >= self.uso_maximo:
+            novo_lote, motivo = self.tamanho_lote // 2, "memória perto do teto"
+            self._cresceu, self._espera = False, self.flushes_estaveis
+        elif self._cresceu and self._ultima_taxa and taxa < self._ultima_taxa * 0.95:
+            novo_lote, motivo = int(self.tamanho_lote / self.fator), "vazão caiu após aumento"
+            self._cresceu, self._espera = False, self.flushes_estaveis
+        elif self._espera:
+            self._espera -= 1
+        elif uso < self.uso_folga and (not self._cresceu or taxa > self._ultima_taxa * 1.05):
+            novo_lote, motivo = int(self.tamanho_lote * self.fator), "folga de memória"
+            self._cresceu = True
+        else:
+            self._cresceu = False
+
+        self._ultima_taxa = taxa
+        novo_lote = max(self.lote_minimo, min(self.lote_maximo, novo_lote))
+        if not motivo or novo_lote == self.tamanho_lote:
+            return False
+
+        novo_limite = int(novo_lote * self.proporcao_buffer)
+        print(f"[INFO] Ajuste adaptativo ({motivo}): lote {self.tamanho_lote:,} -> {novo_lote:,}, "
+              f"flush {self.limite_buffer:,} -> {novo_limite:,} | RSS {rss / 2**20:.0f} MB de "
+              f"{self.teto_memoria / 2**20:.0f} MB, {taxa:.0f} reg/s, flush em {latencia:.2f}s")
+        self.ajustes.append({
+            "lote": novo_lote, "limite_buffer": novo_limite, "motivo": motivo,
+            "rss": rss, "taxa": taxa, "latencia": latencia,
+        })
+        self.tamanho_lote, self.limite_buffer = novo_lote, novo_limite
+        return True
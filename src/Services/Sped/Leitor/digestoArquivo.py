@@ -0,0 +1,32 @@
+import hashlib
+
+# Digest rápido em streaming, atualizado pelos leitores enquanto percorrem o arquivo
+def novoDigesto():
+    return hashlib.blake2b(digest_size=32)
+
+def digestoPrefixo(caminho: str, tamanho: int):
+    """Digest dos primeiros `tamanho` bytes do arquivo (pode continuar sendo atualizado)"""
+    digesto = novoDigesto()
+    restante = tamanho
+    with open(caminho, "rb") as arquivo:
+        while restante > 0:
+            bloco = arquivo.read(min(restante, 1024 * 1024))
+            if not bloco:
+                break
+            digesto.update(bloco)
+            restante -= len(bloco)
+    return digesto
+
+# Início (0000, 0150...) e fim (bloco 9, com as contagens 9900 e o 9999) de cada arquivo
+BLOCO_AMOSTRA = 64 * 1024
+
+def digestoAmostra(caminho: str, tamanho: int) -> str:
+    """Digest do tamanho, do primeiro e do último bloco do arquivo: pré-checagem sem ler o arquivo inteiro"""
+    digesto = novoDigesto()
+    digesto.update(str(tamanho).encode("ascii"))
+    with open(caminho, "rb") as arquivo:
+        digesto.update(arquivo.read(BLOCO_AMOSTRA))
+        if tamanho > BLOCO_AMOSTRA:
+            arquivo.seek(max(BLOCO_AMOSTRA, tamanho - BLOCO_AMOSTRA))
+            digesto.update(arquivo.read(BLOCO_AMOSTRA))
+    return digesto.hexdigest()
@@ -0,0 +1,47 @@
+from itertools import repeat
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence
+
+ENCODING_SPED = "latin1"
+
+# Quantidade de campos (incluindo REG) que cada Registro*Service espera em `partes`
+ESQUEMA_REGISTROS: Dict[str, int] = {
+    "0000": 15,
+    "0150": 13,
+    "0200": 13,
+    "C100": 29,
+    "C170": 39,
+}
+
+# Remove o '|' inicial e o final da linha antes de dividir
+_sem_bordas = itemgetter(slice(1, -1))
+
+def larguraRegistro(tipo: str) -> Optional[int]:
+    return ESQUEMA_REGISTROS.get(tipo)
+
+def dividirRegistros(tipo: str, linhas: Sequence) -> List[tuple]:
+    """Divide em campos um grupo de linhas (str ou bytes) do mesmo registro.
+
+    O grupo inteiro passa por map() em C (decode, recorte e split), sem cache
+    por linha. As tuplas saem com a largura do esquema: campos ausentes viram
+    None e excedentes são descartados, como nos sanitizarPartes dos serviços.
+    """
+    if not linhas:
+        return []
+
+    if isinstance(linhas[0], bytes):
+        linhas = map(bytes.decode, linhas, repeat(ENCODING_SPED))
+    campos_por_linha = map(str.split, map(_sem_bordas, linhas), repeat("|"))
+
+    largura = larguraRegistro(tipo)
+    if largura is None:
+        return list(map(tuple, campos_por_linha))
+
+    registros = []
+    for campos in campos_por_linha:
+        falta = largura - len(campos)
+        if falta > 0:
+            registros.append(tuple(campos) + (None,) * falta)
+        else:
+            registros.append(tuple(campos[:largura]) if falta else tuple(campos))
+    return registros
@@ -0,0 +1,94 @@
+import os
+from datetime import datetime
+from sqlalchemy import inspect, text
+
+from src.Models.importacaoSpedModel import ImportacaoSped
+from .digestoArquivo import digestoAmostra
+from .indiceSpedService import IndiceSpedService
+
+class ImportacaoSpedRepository:
+    _tabela_verificada = False
+
+    def __init__(self, session):
+        self.session = session
+        self.garantirTabela()
+
+    def garantirTabela(self):
+        if not ImportacaoSpedRepository._tabela_verificada:
+            bind = self.session.bind
+            ImportacaoSped.__table__.create(bind=bind, checkfirst=True)
+            if "amostra" not in {coluna["name"] for coluna in inspect(bind).get_columns("importacao_sped")}:
+                tipo = ImportacaoSped.__table__.c.amostra.type.compile(dialect=bind.dialect)
+                with bind.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE importacao_sped ADD COLUMN amostra {tipo}"))
+            ImportacaoSpedRepository._tabela_verificada = True
+
+    def inserir(self, registro: dict):
+        self.session.add(ImportacaoSped(**registro))
+
+    def buscarConcluidas(self, empresa_id: int, periodo: str, tamanho: int) -> list:
+        result = self.session.execute(text("""
+            SELECT hash, amostra FROM importacao_sped
+            WHERE empresa_id = :empresa_id AND periodo = :periodo AND tamanho = :tamanho
+              AND status = 'concluido' AND is_active = 1
+        """), {"empresa_id": empresa_id, "periodo": periodo, "tamanho": tamanho})
+        return result.fetchall()
+
+    def marcarConcluidas(self, empresa_id: int):
+        self.session.execute(text("""
+            UPDATE importacao_sped SET status = 'concluido'
+            WHERE empresa_id = :empresa_id AND status = 'importado' AND is_active = 1
+        """), {"empresa_id": empresa_id})
+
+    def desativar(self, empresa_id: int, periodo: str):
+        self.session.execute(text("""
+            UPDATE importacao_sped SET is_active = 0
+            WHERE empresa_id = :empresa_id AND periodo = :periodo AND is_active = 1
+        """), {"empresa_id": empresa_id, "periodo": periodo})
+
+class ImportacaoSpedService:
+    """Registro de impressões digitais (hash, tamanho, período) dos arquivos SPED já importados.
+
+    O hash é o digest completo calculado pelo LeitorService durante a leitura.
+    Antes de importar, um arquivo é considerado idêntico se houver importação
+    concluída (pós-processamento incluído) com o mesmo período, tamanho e
+    digest completo. Tamanho e amostra (primeiro e último bloco) só descartam
+    candidatos sem ler o arquivo inteiro; a confirmação é sempre pelo digest
+    completo, reaproveitado do índice do arquivo quando o leitor já o calculou.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.repository = ImportacaoSpedRepository(session)
+
+    def registrar(self, empresa_id: int, impressoes: list[dict]):
+        for impressao in impressoes:
+            self.repository.inserir({
+                "empresa_id": empresa_id,
+                "periodo": impressao["periodo"],
+                "hash": impressao["hash"],
+                "amostra": impressao.get("amostra"),
+                "tamanho": impressao["tamanho"],
+                "contagens": impressao["contagens"],
+                "status": "importado",
+                "importado_em": datetime.now(),
+                "is_active": True,
+            })
+        self.session.commit()
+
+    def arquivoJaImportado(self, empresa_id: int, caminho: str, periodo: str) -> bool:
+        tamanho = os.path.getsize(caminho)
+        concluidas = self.repository.buscarConcluidas(empresa_id, periodo, tamanho)
+        if not concluidas:
+            return False
+        # Amostra diferente descarta o candidato; igual não confirma nada (o meio do arquivo pode ter mudado)
+        amostra = digestoAmostra(caminho, tamanho)
+        candidatas = {linha.hash for linha in concluidas if linha.amostra is None or linha.amostra == amostra}
+        return bool(candidatas) and IndiceSpedService.digestoCompleto(caminho) in candidatas
+
+    def marcarConcluidas(self, empresa_id: int):
+        self.repository.marcarConcluidas(empresa_id)
+        self.session.commit()
+
+    def desativarPeriodo(self, empresa_id: int, periodo: str):
+        self.repository.desativar(empresa_id, periodo)
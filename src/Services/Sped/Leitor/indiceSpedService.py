@@ -0,0 +1,178 @@
+import os
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from src.Utils.sanitizacao import calcularPeriodo
+from .digestoArquivo import digestoPrefixo
+from .esquemaRegistros import ENCODING_SPED
+from .leituraMmap import abrirMapeamento
+
+# Blocos da EFD ICMS/IPI na ordem em que aparecem no arquivo
+BLOCOS_SPED = "0BCDEGHK19"
+
+@dataclass
+class IndiceSped:
+    """Índice de um arquivo SPED montado em uma única passada"""
+    caminho: str
+    tamanho: int
+    campos_0000: Tuple[str, ...] = ()
+    # Bloco -> (offset da linha X001, offset logo após a linha X990)
+    blocos: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # Quantidades declaradas nos registros 9900
+    contagens_declaradas: Dict[str, int] = field(default_factory=dict)
+    # Offsets das linhas C100, em ordem
+    offsets_c100: array = field(default_factory=lambda: array("q"))
+    # Total de linhas declarado no 9999
+    linhas_declaradas: Optional[int] = None
+    # Digest completo (hexdigest de novoDigesto): do leitor ao fim da leitura ou calculado sob demanda
+    digesto: Optional[str] = None
+
+    @property
+    def dt_ini(self) -> Optional[str]:
+        return self.campos_0000[3] if len(self.campos_0000) > 3 else None
+
+    @property
+    def periodo(self) -> Optional[str]:
+        return calcularPeriodo(self.dt_ini) if self.dt_ini else None
+
+    @property
+    def cnpj(self) -> Optional[str]:
+        return self.campos_0000[6] if len(self.campos_0000) > 6 else None
+
+    def c100Anterior(self, posicao: int) -> Optional[int]:
+        """Offset do último C100 que começa antes de `posicao`"""
+        i = bisect_left(self.offsets_c100, posicao)
+        return self.offsets_c100[i - 1] if i else None
+
+    def proximoC100(self, posicao: int) -> Optional[int]:
+        """Offset do primeiro C100 que começa em `posicao` ou depois"""
+        i = bisect_left(self.offsets_c100, posicao)
+        return self.offsets_c100[i] if i < len(self.offsets_c100) else None
+
+class IndiceSpedService:
+    """Pré-varredura dos arquivos SPED (0000, blocos, 9900, 9999 e C100), com cache por arquivo.
+
+    Usa apenas buscas em bytes sobre o arquivo mapeado: o 9900 (no fim do
+    arquivo) diz quais blocos existem, e cada busca continua de onde a
+    anterior parou, de modo que o arquivo é percorrido uma única vez.
+    """
+    _cache = OrderedDict()
+    _lock = Lock()
+    limite_cache = 32
+
+    @classmethod
+    def obter(cls, caminho: str) -> IndiceSped:
+        estado = os.stat(caminho)
+        chave = (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns)
+        with cls._lock:
+            if chave in cls._cache:
+                cls._cache.move_to_end(chave)
+                return cls._cache[chave]
+
+        indice = cls.indexar(caminho)
+
+        with cls._lock:
+            cls._cache[chave] = indice
+            while len(cls._cache) > cls.limite_cache:
+                cls._cache.popitem(last=False)
+        return indice
+
+    @classmethod
+    def digestoCompleto(cls, caminho: str) -> str:
+        """Digest do arquivo inteiro, calculado uma vez por versão do arquivo (mesma chave do cache)"""
+        indice = cls.obter(caminho)
+        if indice.digesto is None:
+            indice.digesto = digestoPrefixo(caminho, indice.tamanho).hexdigest()
+        return indice.digesto
+
+    @classmethod
+    def registrarDigesto(cls, caminho: str, tamanho: int, digesto: str):
+        """Guarda o digest calculado pelo leitor, se o arquivo ainda for o que foi lido"""
+        indice = cls.obter(caminho)
+        if indice.tamanho == tamanho:
+            indice.digesto = digesto
+
+    @classmethod
+    def indexar(cls, caminho: str) -> IndiceSped:
+        with open(caminho, "rb") as arquivo:
+            dados = abrirMapeamento(arquivo)
+            try:
+                return cls._indexarDados(caminho, dados)
+            finally:
+                if hasattr(dados, "close"):
+                    dados.close()
+
+    @staticmethod
+    def _campos(dados, inicio: int) -> Tuple[str, ...]:
+        fim = dados.find(b"\n", inicio)
+        linha = dados[inicio:fim if fim != -1 else len(dados)]
+        return tuple(linha.strip().decode(ENCODING_SPED).split("|")[1:-1])
+
+    @classmethod
+    def _indexarDados(cls, caminho: str, dados) -> IndiceSped:
+        indice = IndiceSped(caminho=caminho, tamanho=len(dados))
+        if not dados:
+            return indice
+
+        if dados[:6] == b"|0000|":
+            indice.campos_0000 = cls._campos(dados, 0)
+
+        # 9900: quantidades declaradas por registro (bloco 9 fica no fim do arquivo)
+        inicio_9900 = dados.rfind(b"\n|9001|")
+        posicao = dados.find(b"\n|9900|", max(inicio_9900, 0))
+        while posicao != -1:
+            campos = cls._campos(dados, posicao + 1)
+            if len(campos) > 2 and campos[2].isdigit():
+                indice.contagens_declaradas[campos[1]] = int(campos[2])
+            posicao = dados.find(b"\n|9900|", posicao + 1)
+
+        encerramento = dados.rfind(b"\n|9999|")
+        if encerramento != -1:
+            campos = cls._campos(dados, encerramento + 1)
+            if len(campos) > 1 and campos[1].isdigit():
+                indice.linhas_declaradas = int(campos[1])
+
+        # Blocos presentes (pelo 9900 quando existir), buscados em sequência
+        presentes = [
+            bloco for bloco in BLOCOS_SPED
+            if not indice.contagens_declaradas or f"{bloco}001" in indice.contagens_declaradas
+        ]
+        posicao = 0
+        aberturas = []
+        for bloco in presentes:
+            abertura = f"|{bloco}001|".encode(ENCODING_SPED)
+            inicio = 0 if dados[:len(abertura)] == abertura else dados.find(b"\n" + abertura, posicao)
+            if inicio == -1:
+                continue
+            inicio = inicio + 1 if dados[inicio:inicio + 1] == b"\n" else inicio
+            fechamento = dados.find(f"\n|{bloco}990|".encode(ENCODING_SPED), inicio)
+            fim = None
+            if fechamento != -1:
+                fim_linha = dados.find(b"\n", fechamento + 1)
+                fim = len(dados) if fim_linha == -1 else fim_linha + 1
+                posicao = fim - 1
+            aberturas.append((bloco, inicio, fim))
+
+        # Blocos sem XX990 terminam onde começa o próximo
+        for n, (bloco, inicio, fim) in enumerate(aberturas):
+            if fim is None:
+                fim = aberturas[n + 1][1] if n + 1 < len(aberturas) else len(dados)
+            indice.blocos[bloco] = (inicio, fim)
+
+        # C100 a partir do bloco C; a busca vai até o fim para não perder linhas fora de ordem
+        cls._indexarC100(indice, dados, indice.blocos.get("C", (0, 0))[0])
+        return indice
+
+    @staticmethod
+    def _indexarC100(indice: IndiceSped, dados, inicio: int):
+        offsets = indice.offsets_c100
+        if dados[inicio:inicio + 6] == b"|C100|":
+            offsets.append(inicio)
+        achado = dados.find(b"\n|C100|", inicio)
+        while achado != -1:
+            offsets.append(achado + 1)
+            achado = dados.find(b"\n|C100|", achado + 1)
@@ -1,18 +1,30 @@
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed, ProcessPoolExecutor
-from threading import Lock, Event
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from threading import Condition, Lock, Event
 import threading
 import queue
 from typing import List, Dict, Any, Optional, Tuple
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 import time
 import logging
 from dataclasses import dataclass, field
 import multiprocessing as mp
-from functools import lru_cache
 import gc
 import os
 
+from .checkpointService import CheckpointService
+from .controleAdaptativo import ControleAdaptativo
+from .digestoArquivo import digestoAmostra, novoDigesto
+from .esquemaRegistros import dividirRegistros
+from .indiceSpedService import IndiceSpedService
+from .progressoSped import ProgressoSped
+from .periodoVersaoService import PeriodoVersaoService
+from .leituraMmap import (
+    abrirMapeamento, proximaFaixa, extrairRegistros, prefixosRegistros,
+    processarFaixa, ChaveC100, ENCODING_SPED,
+)
+from src.Utils.sanitizacao import calcularPeriodo
+from ..Salvar.escritaCoordenada import EscritaCoordenada
 from ..Salvar import (
     registro0000Service,
     registro0150Service,
@@ -21,79 +33,243 @@ from ..Salvar import (
     registroC170Service,
 )
 
+# Registros gravados pelo leitor, na ordem de dependência
+TIPOS_GRAVADOS = ("0000", "0150", "0200", "C100", "C170")
+
 @dataclass
 class ProcessingMetrics:
     """Métricas de processamento para monitoramento"""
     registros_processados: int = 0
+    bytes_processados: int = 0
     tempo_inicio: float = field(default_factory=time.time)
     ultimo_checkpoint: float = field(default_factory=time.time)
+    ignorados_por_registro: Counter = field(default_factory=Counter)
+    # Backpressure: tempo (s) bloqueado em cada estágio e profundidades máximas observadas
+    espera_leitor: float = 0.0
+    espera_parsers: float = 0.0
+    espera_buffer: float = 0.0
+    pico_fila: int = 0
+    pico_futures: int = 0
+    pico_buffer: int = 0
+    _lock: Lock = field(default_factory=Lock, repr=False)
     
-    def registrar_progresso(self, count: int):
+    def registrar_ignorados(self, ignorados: Dict[str, int]):
+        with self._lock:
+            self.ignorados_por_registro.update(ignorados)
+
+    def total_ignorados(self) -> int:
+        return sum(self.ignorados_por_registro.values())
+
+    def registrar_progresso(self, count: int, num_bytes: int = 0):
         self.registros_processados += count
+        self.bytes_processados += num_bytes
         agora = time.time()
         if agora - self.ultimo_checkpoint > 10:  # Log a cada 10 segundos
-            velocidade = self.registros_processados / (agora - self.tempo_inicio)
+            decorrido = agora - self.tempo_inicio
+            velocidade = self.registros_processados / decorrido
             print(f"[METRICS] Processados: {self.registros_processados:,} registros "
-                  f"({velocidade:.0f} reg/s)")
+                  f"({velocidade:.0f} reg/s, {self.bytes_por_segundo(decorrido) / 1e6:.1f} MB/s)")
             self.ultimo_checkpoint = agora
 
+    def bytes_por_segundo(self, decorrido: float) -> float:
+        return self.bytes_processados / decorrido if decorrido > 0 else 0
+
+    def registrar_espera(self, estagio: str, segundos: float):
+        with self._lock:
+            setattr(self, f"espera_{estagio}", getattr(self, f"espera_{estagio}") + segundos)
+
+    def registrar_profundidade(self, estagio: str, profundidade: int):
+        if profundidade > getattr(self, f"pico_{estagio}"):
+            setattr(self, f"pico_{estagio}", profundidade)
+
 class OptimizedBufferManager:
-    """Gerenciador de buffer otimizado com flush automático"""
+    """Buffer de registros parseados com flush por limiar e limite rígido de memória.
+
+    Ao cruzar `limite_buffer` a thread de salvamento é acordada na hora; ao
+    atingir `limite_maximo` quem adiciona fica bloqueado até o próximo flush
+    esvaziar o buffer (backpressure até o leitor, pela fila limitada).
+    """
     
-    def __init__(self, limite_buffer: int = 15000):
+    def __init__(self, limite_buffer: int = 15000, limite_maximo: Optional[int] = None,
+                 metrics: Optional[ProcessingMetrics] = None):
         self.buffers = defaultdict(deque)
         self.limite_buffer = limite_buffer
+        self.limite_maximo = limite_maximo or limite_buffer * 2
+        self.metrics = metrics
         self._lock = Lock()
+        self._condicao = Condition(self._lock)
+        self._encerrado = False
         self._total_registros = 0
+        # Por arquivo: (offset final, chave do último C100, digest até o offset) do último lote no buffer
+        # e contagens por registro
+        self.marcas = {}
+        self.contagens = defaultdict(Counter)
         
     def adicionar(self, tipo: str, registros: List[Any]):
         with self._lock:
             self.buffers[tipo].extend(registros)
             self._total_registros += len(registros)
             
+    def adicionar_lote(self, registros_por_tipo: Dict[str, List], arquivo_idx: int, fim: int, chave_final,
+                       digesto: Optional[str] = None):
+        """Adiciona os registros de um lote inteiro; lotes devem chegar na ordem do arquivo"""
+        with self._condicao:
+            if self._total_registros >= self.limite_maximo and not self._encerrado:
+                inicio = time.time()
+                self._condicao.wait_for(lambda: self._total_registros < self.limite_maximo or self._encerrado)
+                if self.metrics:
+                    self.metrics.registrar_espera("buffer", time.time() - inicio)
+            for tipo, registros in registros_por_tipo.items():
+                if registros:
+                    self.buffers[tipo].extend(registros)
+                    self._total_registros += len(registros)
+                    self.contagens[arquivo_idx][tipo] += len(registros)
+            self.marcas[arquivo_idx] = (fim, chave_final, digesto)
+            if self.metrics:
+                self.metrics.registrar_profundidade("buffer", self._total_registros)
+            if self._total_registros >= self.limite_buffer:
+                self._condicao.notify_all()
+            
     def precisa_flush(self) -> bool:
         return self._total_registros >= self.limite_buffer
+
+    def aguardar_flush(self) -> bool:
+        """Bloqueia até o buffer cruzar o limiar; False quando o buffer foi encerrado"""
+        with self._condicao:
+            self._condicao.wait_for(lambda: self.precisa_flush() or self._encerrado)
+            return not self._encerrado
+
+    def encerrar(self):
+        """Libera a thread de salvamento e quem estiver bloqueado adicionando"""
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
         
-    def extrair_todos(self) -> Dict[str, List]:
-        with self._lock:
+    def extrair_todos(self) -> Tuple[Dict[str, List], Dict[int, tuple], Dict[int, Counter]]:
+        """Esvazia o buffer e devolve também as marcas e contagens dos lotes extraídos"""
+        with self._condicao:
             resultado = {}
             for tipo, buffer in self.buffers.items():
                 if buffer:
                     resultado[tipo] = list(buffer)
                     buffer.clear()
             self._total_registros = 0
-            return resultado
+            marcas, self.marcas = self.marcas, {}
+            contagens, self.contagens = self.contagens, defaultdict(Counter)
+            self._condicao.notify_all()
+            return resultado, marcas, contagens
             
     def tamanho_total(self) -> int:
         return self._total_registros
 
+    def redimensionar(self, limite_buffer: int):
+        """Novo limiar de flush (o limite rígido acompanha na mesma proporção)"""
+        with self._condicao:
+            self.limite_maximo = int(self.limite_maximo * limite_buffer / self.limite_buffer)
+            self.limite_buffer = limite_buffer
+            self._condicao.notify_all()
+
+@dataclass
+class LoteTexto:
+    """Linhas de um único arquivo com as chaves (offsets) dos C100 que contém"""
+    linhas: List[str]
+    arquivo_idx: int
+    chave_inicial: Optional[ChaveC100]
+    chaves_c100: List[ChaveC100]
+    fim: int = 0
+    digesto: Optional[str] = None
+
+    @property
+    def chave_final(self) -> Optional[ChaveC100]:
+        return self.chaves_c100[-1] if self.chaves_c100 else self.chave_inicial
+
+    def __len__(self):
+        return len(self.linhas)
+
+@dataclass
+class LoteBytes:
+    """Faixa de bytes de um arquivo mapeado, delimitada em quebras de linha"""
+    caminho: str
+    dados: Any
+    inicio: int
+    fim: int
+    arquivo_idx: int = 0
+    chave_inicial: Optional[ChaveC100] = None
+    chave_final: Optional[ChaveC100] = None
+    digesto: Optional[str] = None
+
+MODOS_LEITURA = ("texto", "mmap", "processos")
+
+# Registros no buffer que disparam um flush; o buffer nunca passa de LIMITE_BUFFER * FATOR_LIMITE_MAXIMO
+LIMITE_BUFFER = 20000
+FATOR_LIMITE_MAXIMO = 2
+PROFUNDIDADE_FILA = 20
+# Estimativa de bytes por linha usada para limitar lotes e faixas em bytes
+BYTES_POR_REGISTRO = 200
+
 class LeitorService:
-    def __init__(self, empresa_id, session):
+    def __init__(self, empresa_id, session, modo_leitura: str = "texto", num_processos: Optional[int] = None,
+                 checkpoints: bool = True, progresso: Optional[ProgressoSped] = None):
+        if modo_leitura not in MODOS_LEITURA:
+            raise ValueError(f"Modo de leitura inválido: {modo_leitura}")
+
         self.empresa_id = empresa_id
         self.session = session
+        self.modo_leitura = modo_leitura
         self.filial = None
         self.dt_ini_0000 = None
-        self.ultimo_num_doc = None
+        # Geração do período em carga: todas as linhas gravadas levam a mesma
+        self.versoes = PeriodoVersaoService(session, empresa_id)
+        self.geracao = 0
         
         # Configurações otimizadas
         self.cpu_count = min(mp.cpu_count(), 8)  # Limitar para evitar overhead
         self.io_workers = min(4, self.cpu_count)  # Workers para I/O
         self.processing_workers = self.cpu_count  # Workers para processamento
+        if modo_leitura == "processos":
+            # Parsing fora do GIL: cada processo recebe faixas de bytes do arquivo
+            self.processing_workers = num_processos or self.cpu_count
         
         # Buffer manager otimizado
-        self.buffer_manager = OptimizedBufferManager(limite_buffer=20000)
         self.metrics = ProcessingMetrics()
+        self.buffer_manager = OptimizedBufferManager(
+            limite_buffer=LIMITE_BUFFER, limite_maximo=LIMITE_BUFFER * FATOR_LIMITE_MAXIMO, metrics=self.metrics
+        )
+        # Profundidade da fila leitor -> parsers e lotes em parsing simultâneo (limitam a memória em trânsito)
+        self.profundidade_fila = PROFUNDIDADE_FILA
+        self.janela_parsers = self.processing_workers * 3
         
         # Lock otimizado
         self._main_lock = Lock()
         
-        # Cache para extrairCampos
-        self._cache_extração = {}
-        self._cache_size_limit = 10000
-        
         # Event para controle de parada
         self._stop_event = Event()
         
+        # Arquivos mapeados em memória (modo mmap), fechados no cleanup
+        self._mapeamentos = []
+        self._prefixos = ()
+        
+        # Retomada: checkpoint por índice de arquivo e ponto de partida de cada leitura
+        self.checkpoint_service = CheckpointService(session, empresa_id) if checkpoints else None
+        self._checkpoints = {}
+        self._inicios = {}
+        self._erro_pipeline = None
+        self._arquivos_com_erro = set()
+        self._digestos = {}
+        # Impressões digitais (hash, tamanho, período, contagens) dos arquivos lidos por completo
+        self.impressoes = []
+        
+        # Progresso publicado no EventBus; compartilhado quando vários leitores rodam juntos
+        self.progresso = progresso
+        self._progresso_proprio = progresso is None
+        self._caminhos = []
+        
+        # Lote de leitura e limiar de flush ajustados pelo RSS do processo durante a execução
+        self.controle: Optional[ControleAdaptativo] = None
+        
+        # Escritores do flush: uma conexão e transação do pool por tabela, commit coordenado
+        self.escrita = EscritaCoordenada(session.bind)
+        
         # Inicialização de serviços (lazy loading)
         self._servicos = None
         
@@ -119,14 +295,25 @@ class LeitorService:
         try:
             print(f"[INFO] Iniciando processamento de {len(caminhos_arquivos)} arquivo(s)")
             print(f"[INFO] Configuração: {self.processing_workers} workers de processamento, "
-                  f"lotes de {tamanho_lote:,} registros")
+                  f"lotes de {tamanho_lote:,} registros, leitura '{self.modo_leitura}'")
             
             inicio = time.time()
+            self.controle = ControleAdaptativo(tamanho_lote, self.buffer_manager.limite_buffer)
+            self._caminhos = list(caminhos_arquivos)
+            if self._progresso_proprio:
+                self.progresso = ProgressoSped(caminhos_arquivos)
+            self._preparar_checkpoints(caminhos_arquivos)
             self.pipeline_otimizado(caminhos_arquivos, tamanho_lote)
+            if self._erro_pipeline:
+                # Nada após o lote com falha é gravado: a próxima execução retoma do último checkpoint
+                raise RuntimeError(f"Falha ao processar lote: {self._erro_pipeline}")
             
             # Flush final
-            if self.buffer_manager.tamanho_total() > 0:
-                self.salvamento_otimizado()
+            self.salvamento_otimizado()
+            self._concluir_checkpoints()
+            self._conferir_contagens()
+            if self._progresso_proprio:
+                self.progresso.finalizar()
                 
             fim = time.time()
             tempo_total = fim - inicio
@@ -134,6 +321,9 @@ class LeitorService:
             print(f"[SUCCESS] Processamento finalizado em {tempo_total:.1f}s")
             print(f"[SUCCESS] Total processado: {self.metrics.registros_processados:,} registros")
             print(f"[SUCCESS] Velocidade média: {self.metrics.registros_processados/tempo_total:.0f} reg/s")
+            print(f"[SUCCESS] Taxa de leitura: {self.metrics.bytes_por_segundo(tempo_total) / 1e6:.1f} MB/s "
+                  f"({self.metrics.bytes_processados:,} bytes)")
+            self._resumo_ignorados()
             
         except Exception as e:
             self._stop_event.set()
@@ -143,22 +333,178 @@ class LeitorService:
         finally:
             self._cleanup()
 
+    def _preparar_checkpoints(self, caminhos_arquivos: List[str]):
+        """Carrega (ou cria) o checkpoint de cada arquivo e restaura o contexto da retomada"""
+        if not self.checkpoint_service:
+            return
+        
+        for i, caminho in enumerate(caminhos_arquivos):
+            checkpoint = self.checkpoint_service.carregar(caminho)
+            if not checkpoint:
+                checkpoint = self.checkpoint_service.iniciar(caminho)
+            elif checkpoint["concluido"]:
+                print(f"[INFO] {os.path.basename(caminho)} já importado por completo; ignorando.")
+            else:
+                print(f"[INFO] Retomando {os.path.basename(caminho)} a partir do byte {checkpoint['offset']:,} "
+                      f"({sum(checkpoint['contagens'].values()):,} registros já gravados)")
+                self.checkpoint_service.prepararRetomada(checkpoint)
+                self.session.commit()
+                self._restaurar_contexto(i, checkpoint)
+            
+            self._checkpoints[i] = (caminho, checkpoint)
+            self._digestos[i] = self.checkpoint_service.digestoInicial(caminho)
+            chave = (i, checkpoint["chave_c100"]) if checkpoint["chave_c100"] is not None else None
+            self._inicios[i] = (checkpoint["tamanho"] if checkpoint["concluido"] else checkpoint["offset"], chave)
+            if self.progresso:
+                self.progresso.retomar(caminho, self._inicios[i][0])
+
+    def _restaurar_contexto(self, arquivo_idx: int, checkpoint: dict):
+        self.dt_ini_0000 = checkpoint["dt_ini_0000"]
+        self.filial = checkpoint["filial"]
+        self._atualizar_geracao()
+        
+        # C170 logo após o checkpoint pertencem ao último C100 já gravado
+        if checkpoint["chave_c100"] is not None and checkpoint["documento_c100"]:
+            chave = (arquivo_idx, checkpoint["chave_c100"])
+            self.servicos["C100"].mapa_documentos[chave] = dict(checkpoint["documento_c100"])
+            self.servicos["C170"].setDocumentos(self.servicos["C100"].getDocumentos())
+
+    def _atualizar_checkpoints(self, marcas: Dict[int, tuple], contagens: Dict[int, Counter]):
+        """Registra o offset confirmado de cada arquivo após o commit de um flush"""
+        if not self.checkpoint_service:
+            return
+        
+        mapa_documentos = self.servicos["C100"].getDocumentos()
+        for arquivo_idx, (fim, chave_final, digesto) in marcas.items():
+            caminho, checkpoint = self._checkpoints[arquivo_idx]
+            total = Counter(checkpoint["contagens"])
+            total.update(contagens.get(arquivo_idx, {}))
+            self.checkpoint_service.atualizar(
+                caminho, checkpoint,
+                offset=fim,
+                hash=digesto,
+                periodo=calcularPeriodo(self.dt_ini_0000) if self.dt_ini_0000 else checkpoint["periodo"],
+                dt_ini_0000=self.dt_ini_0000,
+                filial=self.filial,
+                chave_c100=chave_final[1] if chave_final else None,
+                documento_c100=mapa_documentos.get(chave_final) if chave_final else None,
+                contagens=dict(total),
+                ultimos_ids=self._ultimos_ids(checkpoint),
+            )
+
+    def _ultimos_ids(self, checkpoint: dict) -> Dict[str, int]:
+        """Último id entregue por tabela (conhecido no cliente), sobre os que o checkpoint já tinha"""
+        ultimos = dict(checkpoint.get("ultimos_ids") or {})
+        for tipo in TIPOS_GRAVADOS:
+            ids = self.servicos[tipo].ids
+            if ids.ultimo_id is not None:
+                ultimos[ids.tabela] = ids.ultimo_id
+        return ultimos
+
+    def _reservar_ids(self, registros_buffer: Dict[str, List]):
+        """Ids de todas as tabelas do flush antes de processá-lo; só vai ao banco quando a faixa acaba"""
+        for tipo in TIPOS_GRAVADOS:
+            quantidade = len(registros_buffer.get(tipo, ()))
+            if quantidade:
+                self.servicos[tipo].reservarIds(quantidade)
+
+    def _registrar_faixas(self, marcas: Dict[int, tuple]):
+        """Grava no checkpoint as faixas de ids em uso antes do flush chegar ao banco.
+
+        Na retomada, o que passou do checkpoint é apagado só dentro dessas
+        faixas. Como os ids deste flush ainda não foram entregues, os últimos
+        ids registrados junto são os do último flush confirmado.
+        """
+        if not self.checkpoint_service:
+            return
+
+        faixas = {}
+        for tipo in TIPOS_GRAVADOS:
+            faixa = self.servicos[tipo].ids.faixa
+            if faixa:
+                faixas[self.servicos[tipo].ids.tabela] = list(faixa)
+        for arquivo_idx in marcas:
+            caminho, checkpoint = self._checkpoints[arquivo_idx]
+            if checkpoint.get("faixas") != faixas:
+                self.checkpoint_service.atualizar(
+                    caminho, checkpoint, faixas=faixas, ultimos_ids=self._ultimos_ids(checkpoint)
+                )
+
+    def _concluir_checkpoints(self):
+        """Marca como concluídos os arquivos lidos até o fim e monta suas impressões digitais"""
+        if not self.checkpoint_service:
+            return
+        for arquivo_idx, (caminho, checkpoint) in self._checkpoints.items():
+            if checkpoint["offset"] != checkpoint["tamanho"] or arquivo_idx in self._arquivos_com_erro:
+                continue
+            if not checkpoint["concluido"]:
+                self.checkpoint_service.atualizar(caminho, checkpoint, concluido=True)
+            IndiceSpedService.registrarDigesto(caminho, checkpoint["tamanho"], checkpoint["hash"])
+            self.impressoes.append({
+                "caminho": caminho,
+                "hash": checkpoint["hash"],
+                "amostra": digestoAmostra(caminho, checkpoint["tamanho"]),
+                "tamanho": checkpoint["tamanho"],
+                "periodo": checkpoint["periodo"],
+                "contagens": checkpoint["contagens"],
+            })
+
+    def _conferir_contagens(self):
+        """Compara os registros gravados de cada arquivo concluído com as quantidades declaradas no 9900"""
+        for impressao in self.impressoes:
+            declaradas = IndiceSpedService.obter(impressao["caminho"]).contagens_declaradas
+            if not declaradas:
+                continue
+            for registro in self.servicos:
+                esperado = declaradas.get(registro, 0)
+                obtido = impressao["contagens"].get(registro, 0)
+                if esperado != obtido:
+                    print(f"[WARN] {os.path.basename(impressao['caminho'])}: registro {registro} com "
+                          f"{obtido:,} linha(s) lida(s), 9900 declara {esperado:,}")
+
+    def _resumo_backpressure(self):
+        m = self.metrics
+        print(f"[METRICS] Backpressure: leitor bloqueado {m.espera_leitor:.1f}s (fila máx. {m.pico_fila}/"
+              f"{self.profundidade_fila}), parsers {m.espera_parsers:.1f}s (janela máx. {m.pico_futures}/"
+              f"{self.janela_parsers}), buffer {m.espera_buffer:.1f}s (pico {m.pico_buffer:,}/"
+              f"{self.buffer_manager.limite_maximo:,})")
+
+    def _enfileirar(self, fila_lotes: queue.Queue, lote):
+        """put bloqueante na fila limitada, contabilizando o tempo de espera do leitor"""
+        if fila_lotes.full():
+            inicio = time.time()
+            fila_lotes.put(lote)
+            self.metrics.registrar_espera("leitor", time.time() - inicio)
+        else:
+            fila_lotes.put(lote)
+
+    def _resumo_ignorados(self):
+        """Linhas descartadas pelo pré-filtro de registros, por tipo"""
+        ignorados = self.metrics.ignorados_por_registro
+        if not ignorados:
+            return
+        print(f"[SUCCESS] Linhas ignoradas pelo pré-filtro: {self.metrics.total_ignorados():,}")
+        for registro, quantidade in ignorados.most_common():
+            print(f"[SUCCESS]   {registro}: {quantidade:,}")
+
     def pipeline_otimizado(self, caminhos_arquivos: List[str], tamanho_lote: int):
         """Pipeline otimizado com melhor balanceamento de carga"""
         
-        # Fila otimizada com tamanho dinâmico
-        max_queue_size = max(20, min(100, len(caminhos_arquivos) * 2))
-        fila_lotes = queue.Queue(maxsize=max_queue_size)
+        # Fila limitada: o leitor bloqueia quando os parsers estão atrasados
+        fila_lotes = queue.Queue(maxsize=self.profundidade_fila)
+        
+        self._prefixos = prefixosRegistros(self.servicos.keys())
+        leitor = self.leitor_otimizado if self.modo_leitura == "texto" else self.leitor_mmap
         
         # Thread de leitura otimizada
         leitor_thread = threading.Thread(
-            target=self.leitor_otimizado, 
+            target=leitor, 
             args=(caminhos_arquivos, tamanho_lote, fila_lotes),
             daemon=False
         )
         leitor_thread.start()
         
-        # Thread de salvamento automático
+        # Thread de salvamento: acordada pelo buffer assim que o limiar é cruzado
         salvamento_thread = threading.Thread(
             target=self.salvamento_automatico,
             daemon=True
@@ -166,110 +512,210 @@ class LeitorService:
         salvamento_thread.start()
         
         # Pool de processamento otimizado
-        with ThreadPoolExecutor(
-            max_workers=self.processing_workers,
-            thread_name_prefix="Parser"
-        ) as executor:
+        fim_da_fila = False
+        with self._criar_executor() as executor:
             futures = deque()
             lotes_submetidos = 0
             
             while not self._stop_event.is_set():
                 try:
-                    # Controlar número de futures pendentes
+                    # Janela de parsing cheia: bloquear no lote mais antigo (a ordem do arquivo é mantida)
+                    if len(futures) >= self.janela_parsers:
+                        inicio_espera = time.time()
+                        wait([futures[0][0]])
+                        self.metrics.registrar_espera("parsers", time.time() - inicio_espera)
                     self._limpar_futures_concluidos(futures)
-                    
-                    # Limitar futures pendentes para evitar uso excessivo de memória
-                    if len(futures) >= self.processing_workers * 3:
-                        time.sleep(0.01)
+                    if len(futures) >= self.janela_parsers:
                         continue
                     
-                    lote = fila_lotes.get(timeout=0.5)
+                    self.metrics.registrar_profundidade("fila", fila_lotes.qsize())
+                    lote = fila_lotes.get()
                     if lote is None:  # Sinal de fim
+                        fim_da_fila = True
                         break
                         
-                    future = executor.submit(self.parser_otimizado, lote, lotes_submetidos)
-                    futures.append(future)
+                    if self.modo_leitura == "processos":
+                        future = executor.submit(
+                            processarFaixa, lote.caminho, lote.inicio, lote.fim,
+                            self._prefixos, lote.arquivo_idx, lote.chave_inicial
+                        )
+                    else:
+                        future = executor.submit(self.parser_otimizado, lote, lotes_submetidos)
+                    futures.append((future, lote))
+                    self.metrics.registrar_profundidade("futures", len(futures))
                     lotes_submetidos += 1
                     
-                except queue.Empty:
-                    if not leitor_thread.is_alive():
-                        break
-                    continue
                 except Exception as e:
                     print(f"[ERROR] Erro no pipeline: {e}")
-                    self._stop_event.set()
+                    self._falha_no_pipeline(e)
                     break
             
             # Aguardar conclusão de todos os futures
             self._aguardar_futures(futures)
         
-        leitor_thread.join(timeout=30)
-        if leitor_thread.is_alive():
-            print("[WARNING] Thread de leitura não finalizou no tempo esperado")
+        # Interrompido antes do fim: esvaziar a fila para o leitor não ficar bloqueado no put
+        while not fim_da_fila:
+            fim_da_fila = fila_lotes.get() is None
+        leitor_thread.join()
+        
+        self.buffer_manager.encerrar()
+        salvamento_thread.join()
+        self._resumo_backpressure()
+
+    def _criar_executor(self):
+        """Pool de parsing: processos no modo 'processos', threads nos demais"""
+        if self.modo_leitura == "processos":
+            return ProcessPoolExecutor(max_workers=self.processing_workers)
+        return ThreadPoolExecutor(
+            max_workers=self.processing_workers,
+            thread_name_prefix="Parser"
+        )
 
     def leitor_otimizado(self, caminhos_arquivos: List[str], tamanho_lote: int, fila_lotes: queue.Queue):
         """Leitor otimizado com melhor gerenciamento de memória"""
         try:
-            buffer_linhas = []
-            buffer_size = 0
-            max_buffer_memory = tamanho_lote * 200  # Estimativa de bytes
-            
             for i, caminho in enumerate(caminhos_arquivos):
                 if self._stop_event.is_set():
                     break
                     
                 print(f"[INFO] Processando arquivo {i+1}/{len(caminhos_arquivos)}: {os.path.basename(caminho)}")
                 
+                # Lotes não misturam arquivos: as chaves de C100 são (arquivo, offset)
+                ignorados = Counter()
+                buffer_linhas = []
+                buffer_size = 0
+                chaves_c100 = []
+                brutas = []
+                digesto = self._digestos.get(i) or novoDigesto()
+                posicao, chave_inicial = self._inicios.get(i, (0, None))
+                if posicao and posicao >= os.path.getsize(caminho):
+                    continue
+                
                 try:
-                    # Determinar encoding automaticamente se necessário
-                    with open(caminho, 'r', encoding="latin1", buffering=8192*2) as arquivo:
-                        for linha in arquivo:
-                            linha = linha.strip()
+                    # Linhas lidas em bytes: offsets exatos e digest do arquivo na mesma passada
+                    with open(caminho, 'rb', buffering=8192*2) as arquivo:
+                        arquivo.seek(posicao)
+                        for linha_bruta in arquivo:
+                            brutas.append(linha_bruta)
+                            inicio_linha = posicao
+                            posicao += len(linha_bruta)
+                            # Pré-filtro: registros sem serviço não chegam ao decode/split
+                            if not linha_bruta.startswith(self._prefixos):
+                                if linha_bruta.strip():
+                                    ignorados[linha_bruta[1:5]] += 1
+                                continue
+                            linha = linha_bruta.strip().decode(ENCODING_SPED)
                             if linha and not self._stop_event.is_set():
                                 buffer_linhas.append(linha)
                                 buffer_size += len(linha)
+                                if linha.startswith("|C100|"):
+                                    chaves_c100.append((i, inicio_linha))
                                 
                                 # Flush baseado em tamanho ou memória
-                                if (len(buffer_linhas) >= tamanho_lote or 
-                                    buffer_size >= max_buffer_memory):
+                                if (len(buffer_linhas) >= self.controle.tamanho_lote or 
+                                    buffer_size >= self.controle.tamanho_lote * BYTES_POR_REGISTRO):
                                     
-                                    fila_lotes.put(buffer_linhas.copy())
-                                    buffer_linhas.clear()
+                                    digesto.update(b"".join(brutas))
+                                    self._enfileirar(fila_lotes, LoteTexto(
+                                        buffer_linhas, i, chave_inicial, chaves_c100, posicao, digesto.hexdigest()
+                                    ))
+                                    if chaves_c100:
+                                        chave_inicial = chaves_c100[-1]
+                                    brutas = []
+                                    buffer_linhas = []
+                                    chaves_c100 = []
                                     buffer_size = 0
                                     
                 except IOError as e:
                     print(f"[ERROR] Erro ao ler arquivo {caminho}: {e}")
+                    self._arquivos_com_erro.add(i)
                     continue
+                finally:
+                    self.metrics.registrar_ignorados({
+                        codigo.decode(ENCODING_SPED): quantidade for codigo, quantidade in ignorados.items()
+                    })
                     
-            # Flush final
-            if buffer_linhas and not self._stop_event.is_set():
-                fila_lotes.put(buffer_linhas)
+                # Flush do arquivo (lote vazio também marca o fim do arquivo para o checkpoint)
+                if not self._stop_event.is_set():
+                    digesto.update(b"".join(brutas))
+                    self._enfileirar(fila_lotes, LoteTexto(
+                        buffer_linhas, i, chave_inicial, chaves_c100, posicao, digesto.hexdigest()
+                    ))
                 
         except Exception as e:
             print(f"[ERROR] Erro no leitor: {e}")
-            self._stop_event.set()
+            self._falha_no_pipeline(e)
+        finally:
+            fila_lotes.put(None)  # Sinal de fim
+
+    def leitor_mmap(self, caminhos_arquivos: List[str], tamanho_lote: int, fila_lotes: queue.Queue):
+        """Leitor por mapeamento em memória: enfileira faixas de bytes sem decodificar linhas"""
+        try:
+            for i, caminho in enumerate(caminhos_arquivos):
+                if self._stop_event.is_set():
+                    break
+                    
+                print(f"[INFO] Mapeando arquivo {i+1}/{len(caminhos_arquivos)}: {os.path.basename(caminho)}")
+                
+                try:
+                    arquivo = open(caminho, 'rb')
+                except IOError as e:
+                    print(f"[ERROR] Erro ao ler arquivo {caminho}: {e}")
+                    self._arquivos_com_erro.add(i)
+                    continue
+                    
+                dados = abrirMapeamento(arquivo)
+                self._mapeamentos.append((arquivo, dados))
+                
+                offset, chave_inicial = self._inicios.get(i, (0, None))
+                digesto = self._digestos.get(i) or novoDigesto()
+                indice = IndiceSpedService.obter(caminho)
+                fim = offset
+                while fim < len(dados):
+                    if self._stop_event.is_set():
+                        break
+                    # Tamanho da faixa acompanha o lote atual do controle adaptativo
+                    inicio, fim = proximaFaixa(dados, fim, self.controle.tamanho_lote * BYTES_POR_REGISTRO)
+                    # C170 no início da próxima faixa pertencem ao último C100 desta (offsets do índice)
+                    offset_c100 = indice.c100Anterior(fim)
+                    chave_final = (i, offset_c100) if offset_c100 is not None else chave_inicial
+                    with memoryview(dados) as visao, visao[inicio:fim] as faixa:
+                        digesto.update(faixa)
+                    self._enfileirar(fila_lotes, LoteBytes(
+                        caminho, dados, inicio, fim, i, chave_inicial, chave_final, digesto.hexdigest()
+                    ))
+                    chave_inicial = chave_final
+                    
+        except Exception as e:
+            print(f"[ERROR] Erro no leitor mmap: {e}")
+            self._falha_no_pipeline(e)
         finally:
             fila_lotes.put(None)  # Sinal de fim
 
-    def parser_otimizado(self, linhas: List[str], lote_id: int) -> Dict[str, Any]:
+    def parser_otimizado(self, lote: LoteTexto | LoteBytes, lote_id: int) -> Dict[str, Any]:
         """Parser otimizado com melhor cache e processamento"""
         try:
             inicio = time.time()
-            registros_processados = self.processamento_otimizado(linhas)
-            
-            # Adicionar ao buffer de forma thread-safe
-            for tipo, registros in registros_processados.items():
-                if registros:
-                    self.buffer_manager.adicionar(tipo, registros)
-            
-            # Atualizar métricas
-            self.metrics.registrar_progresso(len(linhas))
+            if isinstance(lote, LoteBytes):
+                ignorados = Counter()
+                registros_processados = extrairRegistros(
+                    lote.dados, lote.inicio, lote.fim, self._prefixos, lote.arquivo_idx, lote.chave_inicial, ignorados
+                )
+                self.metrics.registrar_ignorados(ignorados)
+                quantidade = sum(len(regs) for regs in registros_processados.values())
+                num_bytes = lote.fim - lote.inicio
+            else:
+                registros_processados = self.processamento_otimizado(lote)
+                quantidade = len(lote)
+                num_bytes = sum(map(len, lote.linhas))
             
             tempo_processamento = time.time() - inicio
             
             return {
                 "lote_id": lote_id,
-                "processados": len(linhas),
+                "registros": registros_processados,
+                "processados": quantidade,
+                "bytes": num_bytes,
                 "tempo": tempo_processamento,
                 "tipos_encontrados": len(registros_processados)
             }
@@ -278,45 +724,74 @@ class LeitorService:
             print(f"[ERROR] Erro no parser (lote {lote_id}): {e}")
             return {"lote_id": lote_id, "erro": str(e)}
 
-    def processamento_otimizado(self, linhas: List[str]) -> Dict[str, List]:
-        """Processamento otimizado com cache melhorado"""
-        registros_por_tipo = defaultdict(list)
+    def _registrar_registros(self, lote: LoteTexto | LoteBytes, registros_processados: Dict[str, List],
+                             quantidade: int, num_bytes: int):
+        """Envia os registros parseados ao buffer e atualiza as métricas"""
+        self.buffer_manager.adicionar_lote(
+            registros_processados, lote.arquivo_idx, lote.fim, lote.chave_final, lote.digesto
+        )
+        self.metrics.registrar_progresso(quantidade, num_bytes)
+        if self.progresso:
+            self.progresso.avancar(self._caminhos[lote.arquivo_idx], lote.fim)
+
+    def _concluir_future(self, future, lote: LoteTexto | LoteBytes):
+        """Integra ao buffer o resultado do lote; chamado na ordem de submissão, então o buffer
+        sempre contém um prefixo contínuo de cada arquivo"""
+        resultado = future.result()
+        if self.modo_leitura == "processos":
+            registros_processados, quantidade, num_bytes, ignorados = resultado
+            self.metrics.registrar_ignorados(ignorados)
+        elif "erro" in resultado:
+            raise RuntimeError(resultado["erro"])
+        else:
+            registros_processados, quantidade, num_bytes = resultado["registros"], resultado["processados"], resultado["bytes"]
+        self._registrar_registros(lote, registros_processados, quantidade, num_bytes)
+        return resultado
+
+    def processamento_otimizado(self, lote: LoteTexto) -> Dict[str, List]:
+        """Agrupa as linhas do lote por registro e divide cada grupo de uma vez pelo esquema"""
+        linhas_por_tipo = defaultdict(list)
+        chaves_c170 = []
+        chaves_c100 = iter(lote.chaves_c100)
+        chave_atual = lote.chave_inicial
         
-        # Processamento em lote para melhor localidade de cache
-        for linha in linhas:
-            partes = self.extrair_campos_cached(linha)
-            if partes and len(partes) > 0:
-                tipo_registro = partes[0]
-                registros_por_tipo[tipo_registro].append(partes)
+        # Linhas já passaram pelo pré-filtro: todas começam com |XXXX|
+        for linha in lote.linhas:
+            tipo_registro = linha[1:5]
+            linhas_por_tipo[tipo_registro].append(linha)
+            if tipo_registro == "C100":
+                chave_atual = next(chaves_c100)
+            elif tipo_registro == "C170":
+                chaves_c170.append(chave_atual)
         
-        return registros_por_tipo
-
-    @lru_cache(maxsize=5000)
-    def extrair_campos_cached(self, linha: str) -> Tuple[str, ...]:
-        """Extração de campos com cache LRU otimizado"""
-        if not linha.strip():
-            return tuple()
+        registros_por_tipo = {
+            tipo: dividirRegistros(tipo, linhas) for tipo, linhas in linhas_por_tipo.items()
+        }
+        if "C100" in registros_por_tipo:
+            registros_por_tipo["C100"] = list(zip(lote.chaves_c100, registros_por_tipo["C100"]))
+        if "C170" in registros_por_tipo:
+            registros_por_tipo["C170"] = list(zip(chaves_c170, registros_por_tipo["C170"]))
         
-        campos = linha.split("|")[1:-1]
-        return tuple(campos) if campos else tuple()
+        return registros_por_tipo
 
     def salvamento_automatico(self):
-        """Thread de salvamento automático baseado em buffer"""
-        while not self._stop_event.is_set():
+        """Thread de salvamento: dorme até o buffer cruzar o limiar e grava na hora"""
+        while self.buffer_manager.aguardar_flush():
             try:
-                if self.buffer_manager.precisa_flush():
-                    self.salvamento_otimizado()
-                time.sleep(1)  # Check a cada segundo
+                self.salvamento_otimizado()
             except Exception as e:
+                # Os registros extraídos do buffer foram perdidos: parar para retomar do último checkpoint
                 print(f"[ERROR] Erro no salvamento automático: {e}")
-                time.sleep(5)  # Esperar mais em caso de erro
+                self._falha_no_pipeline(e)
+                break
 
     def salvamento_otimizado(self):
         """Salvamento otimizado com melhor paralelização"""
         with self._main_lock:  # Garantir que apenas um salvamento ocorra por vez
             try:
-                registros_buffer = self.buffer_manager.extrair_todos()
+                registros_buffer, marcas, contagens = self.buffer_manager.extrair_todos()
                 if not registros_buffer:
+                    self._atualizar_checkpoints(marcas, contagens)
                     return
                     
                 total_registros = sum(len(regs) for regs in registros_buffer.values())
@@ -324,14 +799,18 @@ class LeitorService:
                 
                 inicio_salvamento = time.time()
                 
+                self._reservar_ids(registros_buffer)
+                self._registrar_faixas(marcas)
+                
                 # Processar registros críticos primeiro (0000, C100)
                 self._processar_registros_criticos(registros_buffer)
                 
                 # Processar outros registros em paralelo
                 self._processar_registros_paralelo(registros_buffer)
                 
-                # Commit otimizado
+                # Tabelas já confirmadas pela escrita coordenada; a sessão só leva o que for dela
                 self.session.commit()
+                self._atualizar_checkpoints(marcas, contagens)
                 
                 # Limpeza
                 self._limpar_lotes_servicos()
@@ -340,6 +819,9 @@ class LeitorService:
                 print(f"[DEBUG] Salvamento concluído em {tempo_salvamento:.2f}s "
                       f"({total_registros/tempo_salvamento:.0f} reg/s)")
                 
+                if self.controle and self.controle.registrarFlush(total_registros, tempo_salvamento):
+                    self.buffer_manager.redimensionar(self.controle.limite_buffer)
+                
                 # Garbage collection periódico
                 if self.metrics.registros_processados % 50000 == 0:
                     gc.collect()
@@ -358,11 +840,10 @@ class LeitorService:
                 self.processar_registro0000(list(partes))
             del registros_buffer["0000"]
         
-        # Processar C100 e obter mapeamento
+        # Processar C100 com os ids já reservados; a gravação segue junto com o C170
         if "C100" in registros_buffer:
-            for partes in registros_buffer["C100"]:
-                self.processar_registro_c100(list(partes))
-            self.servicos["C100"].salvar()
+            for chave, partes in registros_buffer["C100"]:
+                self.processar_registro_c100(list(partes), chave)
             
             # Configurar C170 com documentos
             mapa_documentos = self.servicos["C100"].getDocumentos()
@@ -375,30 +856,22 @@ class LeitorService:
         for tipo, registros in registros_buffer.items():
             if tipo in self.servicos:
                 servico = self.servicos[tipo]
-                servico.set_context(self.dt_ini_0000, self.filial)
+                servico.set_context(self.dt_ini_0000, self.filial, self.geracao)
                 
-                for partes in registros:
-                    if tipo == "C170" and self.ultimo_num_doc:
-                        servico.processar(list(partes), self.ultimo_num_doc)
-                    else:
+                if tipo == "C170":
+                    for chave_c100, partes in registros:
+                        servico.processar(list(partes), chave_c100)
+                else:
+                    for partes in registros:
                         servico.processar(list(partes))
         
-        # Salvar em paralelo (exceto C100 que já foi salvo)
-        tipos_para_salvar = ["0000", "0150", "0200", "C170"]
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = []
-            for tipo in tipos_para_salvar:
-                if tipo in self.servicos:
-                    future = executor.submit(self.servicos[tipo].salvar)
-                    futures.append(future)
-            
-            # Aguardar conclusão
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"[ERROR] Erro ao salvar serviço: {e}")
-                    raise
+        # Salvar em paralelo, cada tabela na sua conexão; id_c100 do C170 já foi atribuído no cliente
+        escritores = {
+            tipo: self.servicos[tipo].salvar
+            for tipo in TIPOS_GRAVADOS
+            if self.servicos[tipo].lote
+        }
+        self.escrita.gravar(escritores)
 
     def processar_registro0000(self, partes: List[str]):
         """Processamento otimizado do registro 0000"""
@@ -407,34 +880,47 @@ class LeitorService:
         
         cnpj = partes[6] if len(partes) > 6 else ''
         self.filial = cnpj[8:12] if len(cnpj) >= 12 else "0000"
+        self._atualizar_geracao()
         
-        self.servicos["0000"].set_context(self.dt_ini_0000, self.filial)
+        self.servicos["0000"].set_context(self.dt_ini_0000, self.filial, self.geracao)
         self.servicos["0000"].processar(partes)
 
-    def processar_registro_c100(self, partes: List[str]):
+    def _atualizar_geracao(self):
+        if self.dt_ini_0000:
+            self.geracao = self.versoes.geracaoEmCarga(calcularPeriodo(self.dt_ini_0000))
+
+    def processar_registro_c100(self, partes: List[str], chave: ChaveC100):
         """Processamento otimizado do registro C100"""
-        self.servicos["C100"].set_context(self.dt_ini_0000, self.filial)
-        self.servicos["C100"].processar(partes)
-        
-        if len(partes) > 7:
-            self.ultimo_num_doc = partes[7]
+        self.servicos["C100"].set_context(self.dt_ini_0000, self.filial, self.geracao)
+        self.servicos["C100"].processar(partes, chave)
 
     def _limpar_futures_concluidos(self, futures: deque):
         """Remove futures concluídos da deque"""
-        while futures and futures[0].done():
-            future = futures.popleft()
+        while futures and futures[0][0].done() and not self._erro_pipeline:
+            future, lote = futures.popleft()
             try:
-                future.result()  # Capturar exceções
+                self._concluir_future(future, lote)  # Capturar exceções
             except Exception as e:
                 print(f"[ERROR] Erro em future: {e}")
+                self._falha_no_pipeline(e)
 
     def _aguardar_futures(self, futures: deque):
         """Aguarda conclusão de todos os futures"""
-        for future in futures:
+        for future, lote in futures:
+            if self._erro_pipeline:
+                future.cancel()
+                continue
             try:
-                future.result()
+                self._concluir_future(future, lote)
             except Exception as e:
                 print(f"[ERROR] Erro ao finalizar future: {e}")
+                self._falha_no_pipeline(e)
+
+    def _falha_no_pipeline(self, erro: Exception):
+        """Um lote perdido interrompe a leitura: os seguintes não entram no buffer"""
+        self._erro_pipeline = self._erro_pipeline or erro
+        self._stop_event.set()
+        self.buffer_manager.encerrar()
 
     def _limpar_lotes_servicos(self):
         """Limpa lotes de todos os serviços"""
@@ -445,9 +931,14 @@ class LeitorService:
     def _cleanup(self):
         """Limpeza final de recursos"""
         self._stop_event.set()
+        self.escrita.encerrar()
         
-        # Limpar cache
-        self.extrair_campos_cached.cache_clear()
+        # Liberar arquivos mapeados
+        for arquivo, dados in self._mapeamentos:
+            if hasattr(dados, "close"):
+                dados.close()
+            arquivo.close()
+        self._mapeamentos.clear()
         
         # Garbage collection final
         gc.collect()
@@ -459,6 +950,15 @@ class LeitorService:
             "registros_processados": self.metrics.registros_processados,
             "tempo_decorrido": tempo_decorrido,
             "velocidade_media": self.metrics.registros_processados / tempo_decorrido if tempo_decorrido > 0 else 0,
+            "bytes_processados": self.metrics.bytes_processados,
+            "velocidade_bytes": self.metrics.bytes_por_segundo(tempo_decorrido),
+            "linhas_ignoradas": dict(self.metrics.ignorados_por_registro),
             "buffer_atual": self.buffer_manager.tamanho_total(),
+            "espera_leitor": self.metrics.espera_leitor,
+            "espera_parsers": self.metrics.espera_parsers,
+            "espera_buffer": self.metrics.espera_buffer,
+            "pico_fila": self.metrics.pico_fila,
+            "pico_futures": self.metrics.pico_futures,
+            "pico_buffer": self.metrics.pico_buffer,
             "workers_configurados": self.processing_workers
         }
\ No newline at end of file
@@ -0,0 +1,99 @@
+import mmap
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .esquemaRegistros import ENCODING_SPED, dividirRegistros
+
+# Chave do C100 dono de cada C170: (índice do arquivo, offset da linha do C100)
+ChaveC100 = Tuple[int, int]
+
+def prefixosRegistros(tipos: Iterable[str]) -> Tuple[bytes, ...]:
+    """Prefixos em bytes (|XXXX|) dos registros que devem ser decodificados"""
+    return tuple(f"|{tipo}|".encode(ENCODING_SPED) for tipo in tipos)
+
+def abrirMapeamento(arquivo) -> mmap.mmap | bytes:
+    """Mapeia o arquivo em memória (somente leitura); arquivos vazios retornam bytes vazios"""
+    try:
+        return mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # mmap não aceita arquivos de tamanho zero
+        return b""
+
+def proximaFaixa(dados, inicio: int, tamanho_faixa: int) -> Tuple[int, int]:
+    """Faixa de cerca de `tamanho_faixa` bytes a partir de `inicio`, terminando em quebra de linha"""
+    total = len(dados)
+    fim = min(inicio + tamanho_faixa, total)
+    if fim < total:
+        quebra = dados.find(b"\n", fim)
+        fim = total if quebra == -1 else quebra + 1
+    return inicio, fim
+
+def dividirFaixas(dados, tamanho_faixa: int, inicio: int = 0) -> List[Tuple[int, int]]:
+    """Divide o conteúdo (a partir de `inicio`) em faixas de bytes sempre terminando em quebra de linha"""
+    faixas = []
+    while inicio < len(dados):
+        faixas.append(proximaFaixa(dados, inicio, tamanho_faixa))
+        inicio = faixas[-1][1]
+    return faixas
+
+def extrairRegistros(dados, inicio: int, fim: int, prefixos: Tuple[bytes, ...],
+                     arquivo_idx: int = 0, chave_inicial: Optional[ChaveC100] = None,
+                     ignorados: Optional[Counter] = None) -> Dict[str, List]:
+    """Separa as linhas da faixa em bytes e decodifica apenas os registros aceitos.
+
+    As linhas são agrupadas por registro e cada grupo é dividido conforme o
+    esquema (ver dividirRegistros). C100 e C170 são devolvidos como
+    (chave, campos): a chave do C100 é o offset da própria linha e cada C170
+    recebe a chave do último C100 lido antes dele. Linhas descartadas pelo
+    prefixo são contadas por registro em `ignorados`.
+    """
+    linhas_por_tipo = defaultdict(list)
+    chaves_por_tipo = {b"C100": [], b"C170": []}
+    descartados = Counter()
+    chave_atual = chave_inicial
+    posicao = inicio
+
+    for linha in dados[inicio:fim].split(b"\n"):
+        inicio_linha = posicao
+        posicao += len(linha) + 1
+        if not linha.startswith(prefixos):
+            if linha.strip():
+                # Código do registro pelo prefixo fixo |XXXX|, sem dividir a linha
+                descartados[linha[1:5]] += 1
+            continue
+
+        tipo = linha[1:5]
+        linhas_por_tipo[tipo].append(linha.strip())
+        if tipo == b"C100":
+            chave_atual = (arquivo_idx, inicio_linha)
+            chaves_por_tipo[tipo].append(chave_atual)
+        elif tipo == b"C170":
+            chaves_por_tipo[tipo].append(chave_atual)
+
+    registros_por_tipo = {}
+    for tipo, linhas in linhas_por_tipo.items():
+        nome = tipo.decode(ENCODING_SPED)
+        registros = dividirRegistros(nome, linhas)
+        registros_por_tipo[nome] = list(zip(chaves_por_tipo[tipo], registros)) if tipo in chaves_por_tipo else registros
+
+    if ignorados is not None:
+        for codigo, quantidade in descartados.items():
+            ignorados[codigo.decode(ENCODING_SPED)] += quantidade
+
+    return registros_por_tipo
+
+def processarFaixa(caminho: str, inicio: int, fim: int, prefixos: Tuple[bytes, ...],
+                   arquivo_idx: int = 0, chave_inicial: Optional[ChaveC100] = None
+                   ) -> Tuple[Dict[str, List], int, int, Dict[str, int]]:
+    """Ponto de entrada dos processos de parsing: lê a faixa do próprio arquivo e devolve os registros por tipo"""
+    ignorados = Counter()
+    with open(caminho, "rb") as arquivo:
+        dados = abrirMapeamento(arquivo)
+        try:
+            registros_por_tipo = extrairRegistros(dados, inicio, fim, prefixos, arquivo_idx, chave_inicial, ignorados)
+        finally:
+            if isinstance(dados, mmap.mmap):
+                dados.close()
+
+    quantidade = sum(len(registros) for registros in registros_por_tipo.values())
+    return registros_por_tipo, quantidade, fim - inicio, dict(ignorados)
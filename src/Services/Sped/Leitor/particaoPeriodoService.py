@@ -0,0 +1,234 @@
+import re
+import sys
+import time
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from src.Config.Database.db import ARMAZENAMENTO_PARTICIONADO
+from src.Models import _0150Model, _0200Model, c100Model, c170Model, c170novaModel, c170cloneModel
+
+# Tabelas por período que podem ser particionadas por (empresa_id, periodo); o 0000 segue com soft delete
+MODELOS_PARTICIONADOS = {
+    "0150": _0150Model.Registro0150,
+    "0200": _0200Model.Registro0200,
+    "c100": c100Model.C100,
+    "c170": c170Model.C170,
+    "c170nova": c170novaModel.C170Nova,
+    "c170_clone": c170cloneModel.C170Clone,
+}
+
+# Partição obrigatória do LIST: nunca recebe linhas
+PARTICAO_VAZIA = "p_vazia"
+
+def nomeParticao(empresa_id: int, periodo: str) -> str:
+    return f"p{int(empresa_id)}_{re.sub(r'[^0-9A-Za-z]', '', periodo or '')}"
+
+def nomeTroca(tabela: str, particao: str) -> str:
+    return f"{tabela}_troca_{particao}"[:64]
+
+def _valores(empresa_id: int, periodo: str) -> str:
+    periodo = (periodo or "").replace("\\", "\\\\").replace("'", "''")
+    return f"({int(empresa_id)}, '{periodo}')"
+
+class ParticaoPeriodoRepository:
+    def __init__(self, bind):
+        self.bind = bind
+
+    def _executar(self, sql: str, parametros: dict | None = None):
+        with self.bind.begin() as conn:
+            return conn.execute(text(sql), parametros or {})
+
+    def particoes(self, tabela: str) -> set:
+        with self.bind.connect() as conn:
+            resultado = conn.execute(text("""
+                SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela AND PARTITION_NAME IS NOT NULL
+            """), {"tabela": tabela})
+            return {linha[0] for linha in resultado}
+
+    def linhasParticao(self, tabela: str, particao: str) -> int:
+        with self.bind.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM `{tabela}` PARTITION (`{particao}`)")).scalar()
+
+    def periodosExistentes(self, tabela: str) -> List[tuple]:
+        with self.bind.connect() as conn:
+            return [tuple(linha) for linha in conn.execute(text(f"SELECT DISTINCT empresa_id, periodo FROM `{tabela}`"))]
+
+    def converter(self, tabela: str, modelo, periodos: List[tuple]):
+        """PK passa a incluir as colunas da partição (exigência do MySQL) e a tabela ganha uma partição por período"""
+        dialeto = self.bind.dialect
+        tipo_periodo = modelo.__table__.c.periodo.type.compile(dialect=dialeto)
+        self._executar(f"UPDATE `{tabela}` SET periodo = '00/0000' WHERE periodo IS NULL")
+        self._executar(f"UPDATE `{tabela}` SET empresa_id = 0 WHERE empresa_id IS NULL")
+        particoes = [f"PARTITION `{PARTICAO_VAZIA}` VALUES IN ((0, ''))"] + [
+            f"PARTITION `{nomeParticao(empresa_id, periodo)}` VALUES IN ({_valores(empresa_id, periodo)})"
+            for empresa_id, periodo in periodos
+        ]
+        self._executar(f"""
+            ALTER TABLE `{tabela}`
+                MODIFY empresa_id INT NOT NULL,
+                MODIFY periodo {tipo_periodo} NOT NULL,
+                DROP PRIMARY KEY, ADD PRIMARY KEY (id, empresa_id, periodo)
+            PARTITION BY LIST COLUMNS (empresa_id, periodo) ({", ".join(particoes)})
+        """)
+
+    def adicionarParticao(self, tabela: str, particao: str, empresa_id: int, periodo: str):
+        self._executar(
+            f"ALTER TABLE `{tabela}` ADD PARTITION (PARTITION `{particao}` VALUES IN ({_valores(empresa_id, periodo)}))"
+        )
+
+    def criarTabelaTroca(self, tabela: str, troca: str):
+        self._executar(f"CREATE TABLE `{troca}` LIKE `{tabela}`")
+        self._executar(f"ALTER TABLE `{troca}` REMOVE PARTITIONING")
+
+    def temGeracoesMortas(self, tabela: str, particao: str, geracao: int) -> bool:
+        with self.bind.connect() as conn:
+            return bool(conn.execute(text(
+                f"SELECT 1 FROM `{tabela}` PARTITION (`{particao}`) WHERE geracao < :geracao LIMIT 1"
+            ), {"geracao": geracao}).first())
+
+    def copiarVivas(self, tabela: str, particao: str, troca: str, geracao: int) -> int:
+        """Cópia das linhas da geração publicada e das posteriores (importação em andamento)"""
+        return self._executar(
+            f"INSERT INTO `{troca}` SELECT * FROM `{tabela}` PARTITION (`{particao}`) WHERE geracao >= :geracao",
+            {"geracao": geracao},
+        ).rowcount
+
+    def trocar(self, tabela: str, particao: str, troca: str):
+        # Só metadados: as linhas mudam de tabela sem cópia nem validação linha a linha
+        self._executar(f"ALTER TABLE `{tabela}` EXCHANGE PARTITION `{particao}` WITH TABLE `{troca}` WITHOUT VALIDATION")
+
+    def devolverGravadasNaTroca(self, tabela: str, particao: str, troca: str, geracao: int) -> int:
+        """Linhas vivas gravadas entre a cópia e a troca ficaram só na tabela de troca: voltam para a partição"""
+        return self._executar(f"""
+            INSERT INTO `{tabela}`
+            SELECT t.* FROM `{troca}` t
+            WHERE t.geracao >= :geracao
+              AND NOT EXISTS (SELECT 1 FROM `{tabela}` PARTITION (`{particao}`) x WHERE x.id = t.id)
+        """, {"geracao": geracao}).rowcount
+
+    def existeTabela(self, tabela: str) -> bool:
+        with self.bind.connect() as conn:
+            return bool(conn.execute(text("""
+                SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela
+            """), {"tabela": tabela}).first())
+
+    def removerTabela(self, tabela: str):
+        self._executar(f"DROP TABLE IF EXISTS `{tabela}`")
+
+    def removerParticao(self, tabela: str, particao: str):
+        self._executar(f"ALTER TABLE `{tabela}` DROP PARTITION `{particao}`")
+
+class ParticaoPeriodoService:
+    """Armazenamento opcional das tabelas SPED particionado por (empresa, período).
+
+    A reimportação grava uma geração nova na mesma partição e a anterior
+    segue lida até a publicação. As gerações mortas saem depois, pela purga
+    (purgaPeriodoService), com compactarTabela: as linhas vivas são copiadas
+    para uma tabela de troca, que assume o lugar da partição por EXCHANGE
+    PARTITION, e a partição antiga é descartada sem DELETE linha a linha. Só
+    atua no MySQL e nas tabelas que já foram migradas (ver migrar).
+    """
+
+    def __init__(self, session, empresa_id: int | None = None, ativo: bool = ARMAZENAMENTO_PARTICIONADO):
+        self.session = session
+        self.empresa_id = empresa_id
+        self.repository = ParticaoPeriodoRepository(session.bind)
+        self.ativo = ativo and session.bind.dialect.name == "mysql"
+        self._particoes: Dict[str, set] = {}
+
+    def _particoesDe(self, tabela: str) -> set:
+        if tabela not in self._particoes:
+            self._particoes[tabela] = self.repository.particoes(tabela)
+        return self._particoes[tabela]
+
+    def tabelasParticionadas(self) -> List[str]:
+        if not self.ativo:
+            return []
+        return [tabela for tabela in MODELOS_PARTICIONADOS if self._particoesDe(tabela)]
+
+    def prepararPeriodo(self, periodo: str):
+        """Cria a partição do período em cada tabela; o LIST recusa linhas sem partição"""
+        particao = nomeParticao(self.empresa_id, periodo)
+        for tabela in self.tabelasParticionadas():
+            if particao not in self._particoesDe(tabela):
+                self.repository.adicionarParticao(tabela, particao, self.empresa_id, periodo)
+                self._particoes[tabela].add(particao)
+
+    def compactarTabela(self, tabela: str, periodo: str, geracao: int | None) -> bool:
+        """A partição do período em `tabela` fica só com as linhas da geração `geracao` em diante.
+
+        Não é uma troca só de metadados: as linhas vivas são copiadas para a
+        tabela de troca antes do EXCHANGE, então o custo é proporcional ao
+        período. Por isso roda na purga, fora da importação.
+        """
+        particao = nomeParticao(self.empresa_id, periodo)
+        if geracao is None or tabela not in self.tabelasParticionadas() or particao not in self._particoesDe(tabela):
+            return False
+        if not self.repository.temGeracoesMortas(tabela, particao, geracao):
+            return False
+        troca = nomeTroca(tabela, particao)
+        if self.repository.existeTabela(troca):
+            # Sobra de uma execução anterior: pode ser a única cópia de dados antigos, não sobrescrever
+            print(f"[WARN] `{troca}` já existe; período {periodo} de `{tabela}` não compactado")
+            return False
+        inicio = time.time()
+        trocada = False
+        try:
+            self.repository.criarTabelaTroca(tabela, troca)
+            copiadas = self.repository.copiarVivas(tabela, particao, troca, geracao)
+            self.repository.trocar(tabela, particao, troca)
+            trocada = True
+            devolvidas = self.repository.devolverGravadasNaTroca(tabela, particao, troca, geracao)
+        except Exception as e:
+            if trocada:
+                # A tabela de troca guarda a partição antiga inteira: fica para conferência manual
+                print(f"[ERROR] Falha ao compactar `{tabela}` período {periodo} após a troca; `{troca}` mantida: {e}")
+            else:
+                # Antes da troca a tabela de troca só tem cópias das linhas vivas
+                print(f"[WARN] Compactação de `{tabela}` período {periodo} não concluída: {e}")
+                self.repository.removerTabela(troca)
+            return False
+        self.repository.removerTabela(troca)
+        print(f"[INFO] Período {periodo} compactado em `{tabela}` por troca de partição: "
+              f"{copiadas + devolvidas:,} linha(s) vivas mantidas ({time.time() - inicio:.2f}s)")
+        return True
+
+    def descartarPeriodo(self, periodo: str) -> List[str]:
+        """Remove o período inteiro por DROP PARTITION"""
+        particao = nomeParticao(self.empresa_id, periodo)
+        removidas = []
+        for tabela in self.tabelasParticionadas():
+            if particao in self._particoesDe(tabela):
+                self.repository.removerParticao(tabela, particao)
+                self._particoes[tabela].discard(particao)
+                removidas.append(tabela)
+        return removidas
+
+    def migrar(self):
+        """Converte as tabelas ainda não particionadas (ALTER TABLE com cópia: rodar fora do expediente)"""
+        if self.session.bind.dialect.name != "mysql":
+            raise RuntimeError("Particionamento por período disponível apenas no MySQL.")
+        for tabela, modelo in MODELOS_PARTICIONADOS.items():
+            if self.repository.particoes(tabela):
+                print(f"[INFO] `{tabela}` já particionada.")
+                continue
+            periodos = self.repository.periodosExistentes(tabela)
+            inicio = time.time()
+            print(f"[INFO] Particionando `{tabela}` em {len(periodos) + 1} partição(ões)...")
+            self.repository.converter(tabela, modelo, periodos)
+            print(f"[INFO] `{tabela}` particionada em {time.time() - inicio:.1f}s")
+        self._particoes.clear()
+
+if __name__ == "__main__":
+    from src.Config.Database.db import getSession
+
+    if "--migrar" not in sys.argv:
+        print("Uso: python -m src.Services.Sped.Leitor.particaoPeriodoService --migrar")
+        sys.exit(1)
+    session = getSession()
+    try:
+        ParticaoPeriodoService(session, ativo=True).migrar()
+    finally:
+        session.close()
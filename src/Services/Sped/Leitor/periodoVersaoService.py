@@ -0,0 +1,170 @@
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import inspect, select, update, insert, text, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from src.Config.Database.db import Base, engine as engine_principal
+from src.Models.periodoVersaoModel import PeriodoVersao
+
+# Tabelas cujas linhas são gravadas com a geração da importação
+TABELAS_VERSIONADAS = ("0000", "0150", "0200", "c100", "c170", "c170nova", "c170_clone")
+
+def filtroVigente(alias: str) -> str:
+    """Condição SQL que mantém só as linhas da geração publicada do período (no lugar de is_active = 1)"""
+    return (
+        f"({alias}.empresa_id, {alias}.periodo, {alias}.geracao) IN "
+        "(SELECT empresa_id, periodo, geracao FROM periodo_versao WHERE geracao IS NOT NULL)"
+    )
+
+def vigenteOrm(modelo):
+    """Equivalente ORM de filtroVigente"""
+    versao = PeriodoVersao.__table__.c
+    return tuple_(modelo.empresa_id, modelo.periodo, modelo.geracao).in_(
+        select(versao.empresa_id, versao.periodo, versao.geracao).where(versao.geracao.isnot(None))
+    )
+
+class PeriodoVersaoRepository:
+    _esquema_verificado = False
+    _lock = Lock()
+
+    def __init__(self, bind):
+        self.bind = bind
+        self.garantirEsquema()
+
+    def garantirEsquema(self):
+        """Cria periodo_versao e a coluna geracao nas tabelas SPED de bancos anteriores ao versionamento"""
+        with PeriodoVersaoRepository._lock:
+            if PeriodoVersaoRepository._esquema_verificado:
+                return
+
+            inspetor = inspect(self.bind)
+            tabela_nova = not inspetor.has_table(PeriodoVersao.__tablename__)
+            PeriodoVersao.__table__.create(bind=self.bind, checkfirst=True)
+
+            for tabela in TABELAS_VERSIONADAS:
+                if not inspetor.has_table(tabela):
+                    continue
+                if "geracao" not in {c["name"] for c in inspetor.get_columns(tabela)}:
+                    self._versionarTabela(tabela)
+                self._removerIndiceAtivo(inspetor, tabela)
+
+            if tabela_nova and inspetor.has_table("0000"):
+                self._registrarPeriodosExistentes()
+            PeriodoVersaoRepository._esquema_verificado = True
+
+    def _versionarTabela(self, tabela: str):
+        print(f"[INFO] Adicionando coluna geracao em `{tabela}`...")
+        with self.bind.begin() as conn:
+            conn.execute(text(f"ALTER TABLE `{tabela}` ADD COLUMN geracao INTEGER NOT NULL DEFAULT 0"))
+            # Linhas já desativadas pelo soft delete ficam fora de qualquer geração
+            conn.execute(text(f"UPDATE `{tabela}` SET geracao = -1 WHERE is_active = 0"))
+        for indice in Base.metadata.tables[tabela].indexes:
+            if "geracao" in indice.columns:
+                indice.create(bind=self.bind, checkfirst=True)
+
+    def _removerIndiceAtivo(self, inspetor, tabela: str):
+        """(empresa_id, is_active, periodo) servia ao soft delete; as leituras filtram pela geração"""
+        nome = f"ix_{tabela}_empresa_ativo_periodo"
+        if nome in {indice["name"] for indice in inspetor.get_indexes(tabela)}:
+            print(f"[INFO] Removendo índice {nome} de `{tabela}`...")
+            em_tabela = "" if self.bind.dialect.name == "sqlite" else f" ON `{tabela}`"
+            with self.bind.begin() as conn:
+                conn.execute(text(f"DROP INDEX `{nome}`{em_tabela}"))
+
+    def _registrarPeriodosExistentes(self):
+        """Períodos ativos antes do versionamento viram a geração 0 publicada"""
+        with self.bind.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO periodo_versao (empresa_id, periodo, geracao, ultima_geracao, atualizado_em)
+                SELECT DISTINCT empresa_id, periodo, 0, 0, :agora
+                FROM `0000`
+                WHERE is_active = 1 AND empresa_id IS NOT NULL AND periodo IS NOT NULL
+            """), {"agora": datetime.now()})
+
+    def buscar(self, empresa_id: int, periodo: str):
+        versao = PeriodoVersao.__table__
+        with self.bind.connect() as conn:
+            return conn.execute(
+                select(versao.c.geracao, versao.c.ultima_geracao)
+                .where(versao.c.empresa_id == empresa_id, versao.c.periodo == periodo)
+            ).first()
+
+    def iniciar(self, empresa_id: int, periodo: str, somente_ausente: bool = False) -> int:
+        """Avança ultima_geracao (ou cria o período na geração 1) e devolve a geração em carga.
+
+        Com `somente_ausente`, um período já registrado mantém a geração em carga atual.
+        """
+        versao = PeriodoVersao.__table__
+        filtro = (versao.c.empresa_id == empresa_id) & (versao.c.periodo == periodo)
+
+        while True:
+            try:
+                with self.bind.begin() as conn:
+                    if not somente_ausente:
+                        conn.execute(
+                            update(versao).where(filtro)
+                            .values(ultima_geracao=versao.c.ultima_geracao + 1, atualizado_em=datetime.now())
+                        )
+                    existente = conn.execute(select(versao.c.ultima_geracao).where(filtro)).scalar()
+                    if existente is None:
+                        conn.execute(insert(versao).values(
+                            empresa_id=empresa_id, periodo=periodo, geracao=None, ultima_geracao=1,
+                            atualizado_em=datetime.now(),
+                        ))
+                        return 1
+                    return existente
+            except IntegrityError:
+                # Outra importação registrou o período ao mesmo tempo: repetir
+                continue
+
+    def publicar(self, empresa_id: int, periodo: str):
+        versao = PeriodoVersao.__table__
+        with self.bind.begin() as conn:
+            conn.execute(
+                update(versao)
+                .where(versao.c.empresa_id == empresa_id, versao.c.periodo == periodo)
+                .values(geracao=versao.c.ultima_geracao, atualizado_em=datetime.now())
+            )
+
+class PeriodoVersaoService:
+    """Versionamento dos períodos por geração.
+
+    Cada importação grava suas linhas com uma geração nova do período; as
+    consultas leem só a geração publicada em periodo_versao. Reimportar um
+    período é avançar e depois publicar esse ponteiro (uma linha), sem o
+    UPDATE is_active = 0 nas tabelas SPED. Até a publicação, a geração
+    anterior continua sendo a lida.
+    """
+
+    def __init__(self, session, empresa_id: int):
+        self.session = session
+        self.empresa_id = empresa_id
+        self.repository = PeriodoVersaoRepository(session.bind)
+
+    def geracaoVigente(self, periodo: str) -> Optional[int]:
+        versao = self.repository.buscar(self.empresa_id, periodo)
+        return versao.geracao if versao else None
+
+    def periodoPublicado(self, periodo: str) -> bool:
+        return self.geracaoVigente(periodo) is not None
+
+    def novaGeracao(self, periodo: str) -> int:
+        geracao = self.repository.iniciar(self.empresa_id, periodo)
+        print(f"[INFO] Período {periodo}: importação na geração {geracao}.")
+        return geracao
+
+    def geracaoEmCarga(self, periodo: str) -> int:
+        """Geração das linhas gravadas agora; a retomada de uma importação continua na mesma"""
+        return self.repository.iniciar(self.empresa_id, periodo, somente_ausente=True)
+
+    def publicar(self, periodo: str):
+        self.repository.publicar(self.empresa_id, periodo)
+
+def inicializarVersionamento(engine=None):
+    """Migração do versionamento na inicialização do app; falhas só geram log"""
+    try:
+        PeriodoVersaoRepository(engine or engine_principal)
+    except Exception as e:
+        print(f"[ERROR] Falha ao preparar o versionamento de períodos: {e}")
@@ -1,18 +1,105 @@
+import asyncio
+import os
+from collections import defaultdict
+
+from src.Config.Database.db import ARQUIVOS_SIMULTANEOS, estatisticasPools, getSession
+from .checkpointService import CheckpointService
+from .importacaoSpedService import ImportacaoSpedService
 from .leitorService import LeitorService
+from .progressoSped import ProgressoSped
+
+MAX_ARQUIVOS_SIMULTANEOS = ARQUIVOS_SIMULTANEOS
 
 class ProcessadorSped:
-    def __init__(self, session, empresa_id):
+    def __init__(self, session, empresa_id, max_arquivos_simultaneos: int = MAX_ARQUIVOS_SIMULTANEOS,
+                 modo_leitura: str = "texto"):
         self.session = session
         self.empresa_id = empresa_id
+        self.max_arquivos_simultaneos = max(1, max_arquivos_simultaneos)
+        self.modo_leitura = modo_leitura
+        self.progresso = None
 
-    async def executar(self, caminho_arquivo: str):
+    async def executar(self, caminhos_arquivos: list[str], periodos_por_arquivo: dict | None = None):
         try:
-            leitor = LeitorService(self.empresa_id, self.session)
-            leitor.executar(caminho_arquivo)
+            grupos = self._agruparPorPeriodo(caminhos_arquivos, periodos_por_arquivo)
+            impressoes = []
+            self.progresso = ProgressoSped(caminhos_arquivos)
+
+            if len(grupos) <= 1 or self.max_arquivos_simultaneos == 1:
+                for caminhos in grupos:
+                    for caminho in caminhos:
+                        leitor = LeitorService(self.empresa_id, self.session, self.modo_leitura,
+                                               progresso=self.progresso)
+                        leitor.executar([caminho])
+                        impressoes.extend(leitor.impressoes)
+                self.session.commit()
+            else:
+                impressoes = await self._executarEmParalelo(grupos)
+            self.progresso.finalizar()
+
+            # Todos os arquivos gravados: registrar impressões e descartar os checkpoints
+            ImportacaoSpedService(self.session).registrar(self.empresa_id, impressoes)
+            checkpoints = CheckpointService(self.session, self.empresa_id)
+            for caminho in caminhos_arquivos:
+                checkpoints.remover(caminho)
 
-            self.session.commit()
             print("[INFO] Leitura e salvamento dos dados concluído com sucesso.")
+            self._resumoPools()
 
         except Exception as e:
             self.session.rollback()
-            raise RuntimeError(f"[ERRO] Falha no processamento do SPED: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"[ERRO] Falha no processamento do SPED: {str(e)}")
+
+    def _resumoPools(self):
+        for nome, dados in estatisticasPools().items():
+            print(f"[METRICS] Pool {nome}: {dados['checkouts']} checkout(s), {dados['esperas']} com espera "
+                  f"(média {dados['espera_media'] * 1000:.1f} ms, máx. {dados['espera_maxima'] * 1000:.1f} ms), "
+                  f"{dados['conexoes_abertas']} conexão(ões) aberta(s), {dados['invalidadas']} invalidada(s)")
+
+    def _agruparPorPeriodo(self, caminhos_arquivos: list[str], periodos_por_arquivo: dict | None) -> list[list[str]]:
+        """Arquivos do mesmo período ficam no mesmo grupo e são lidos em sequência"""
+        if not periodos_por_arquivo:
+            return [[caminho] for caminho in caminhos_arquivos]
+
+        grupos = defaultdict(list)
+        for caminho in caminhos_arquivos:
+            grupos[periodos_por_arquivo.get(caminho, caminho)].append(caminho)
+        return list(grupos.values())
+
+    async def _executarEmParalelo(self, grupos: list[list[str]]) -> list[dict]:
+        limite = asyncio.Semaphore(self.max_arquivos_simultaneos)
+        print(f"[INFO] Processando {len(grupos)} período(s) em paralelo "
+              f"(máx. {self.max_arquivos_simultaneos} simultâneos)")
+
+        async def processarGrupo(caminhos: list[str]):
+            async with limite:
+                return await asyncio.to_thread(self._processarGrupo, caminhos)
+
+        resultados = await asyncio.gather(*(processarGrupo(caminhos) for caminhos in grupos), return_exceptions=True)
+
+        falhas = [(caminhos, erro) for caminhos, erro in zip(grupos, resultados) if isinstance(erro, Exception)]
+        if falhas:
+            detalhes = "; ".join(f"{', '.join(caminhos)}: {erro}" for caminhos, erro in falhas)
+            raise RuntimeError(f"{len(falhas)} período(s) com falha: {detalhes}")
+
+        return [impressao for impressoes in resultados for impressao in impressoes]
+
+    def _processarGrupo(self, caminhos: list[str]) -> list[dict]:
+        """Cada arquivo tem sua própria sessão e LeitorService (contexto 0000, filial e mapa de C100)"""
+        impressoes = []
+        for caminho in caminhos:
+            session = getSession()
+            try:
+                # No modo "processos" os núcleos são divididos entre os arquivos simultâneos
+                num_processos = max(1, (os.cpu_count() or 1) // self.max_arquivos_simultaneos)
+                leitor = LeitorService(self.empresa_id, session, self.modo_leitura, num_processos,
+                                       progresso=self.progresso)
+                leitor.executar([caminho])
+                session.commit()
+                impressoes.extend(leitor.impressoes)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+        return impressoes
@@ -0,0 +1,98 @@
+import time
+from threading import Lock, Thread
+from typing import Dict, List, Optional
+
+from src.Utils.event import EventBus
+from .indiceSpedService import IndiceSpedService
+
+EVENTO_PROGRESSO_SPED = "sped_progresso"
+
+class ProgressoSped:
+    """Progresso da leitura de um conjunto de arquivos SPED, publicado no EventBus.
+
+    A fração vem dos bytes já lidos de cada arquivo contra o tamanho total; as
+    linhas por segundo usam o total declarado no 9999 (via índice) quando
+    existir. Eventos são limitados a um por `intervalo` segundos e emitidos em
+    uma thread à parte; se a emissão anterior ainda estiver em andamento, a
+    atualização é apenas descartada, sem bloquear a leitura.
+    """
+
+    def __init__(self, caminhos: List[str], intervalo: float = 0.5):
+        self.intervalo = intervalo
+        indices = {caminho: IndiceSpedService.obter(caminho) for caminho in caminhos}
+        self.tamanhos = {caminho: indice.tamanho for caminho, indice in indices.items()}
+        self.bytes_totais = sum(self.tamanhos.values())
+        linhas = [indice.linhas_declaradas for indice in indices.values()]
+        self.linhas_totais = sum(linhas) if linhas and all(linhas) else None
+
+        self.posicoes: Dict[str, int] = {caminho: 0 for caminho in caminhos}
+        self._lock = Lock()
+        self._emitindo = Lock()
+        self._bytes_iniciais = 0
+        self._inicio = time.time()
+        self._ultima_emissao = 0.0
+
+    def retomar(self, caminho: str, offset: int):
+        """Bytes já gravados em execução anterior: contam na fração, não na velocidade"""
+        with self._lock:
+            self._bytes_iniciais += offset - self.posicoes.get(caminho, 0)
+            self.posicoes[caminho] = offset
+
+    def avancar(self, caminho: str, posicao: int):
+        """Registra a posição já lida do arquivo (lotes chegam na ordem do arquivo)"""
+        with self._lock:
+            self.posicoes[caminho] = max(self.posicoes.get(caminho, 0), posicao)
+        if time.time() - self._ultima_emissao >= self.intervalo and self._emitindo.acquire(blocking=False):
+            # Callbacks da interface rodam fora da thread do pipeline
+            self._ultima_emissao = time.time()
+            Thread(target=self._emitir, daemon=True).start()
+
+    def finalizar(self):
+        with self._lock:
+            self.posicoes = dict(self.tamanhos)
+        self._emitindo.acquire()
+        self._emitir()
+
+    def estado(self) -> dict:
+        with self._lock:
+            bytes_lidos = sum(self.posicoes.values())
+        fracao = bytes_lidos / self.bytes_totais if self.bytes_totais else 1.0
+        decorrido = time.time() - self._inicio
+        bytes_na_execucao = bytes_lidos - self._bytes_iniciais
+        bytes_por_segundo = bytes_na_execucao / decorrido if decorrido > 0 else 0
+
+        linhas_por_segundo: Optional[float] = None
+        if self.linhas_totais and self.bytes_totais:
+            linhas_por_segundo = bytes_por_segundo * self.linhas_totais / self.bytes_totais
+
+        eta = (self.bytes_totais - bytes_lidos) / bytes_por_segundo if bytes_por_segundo > 0 else None
+        return {
+            "fracao": min(fracao, 1.0),
+            "bytes_lidos": bytes_lidos,
+            "bytes_totais": self.bytes_totais,
+            "linhas_totais": self.linhas_totais,
+            "linhas_por_segundo": linhas_por_segundo,
+            "bytes_por_segundo": bytes_por_segundo,
+            "eta_segundos": eta,
+            "arquivos": len(self.tamanhos),
+        }
+
+    def _emitir(self):
+        """Publica o estado atual; chamado com `_emitindo` adquirido"""
+        try:
+            EventBus.emit(EVENTO_PROGRESSO_SPED, self.estado())
+        finally:
+            self._emitindo.release()
+
+def formatarProgresso(estado: dict) -> str:
+    """Texto curto para a interface: percentual, velocidade e tempo restante"""
+    partes = [f"{estado['fracao'] * 100:.0f}%"]
+    if estado.get("linhas_por_segundo"):
+        partes.append(f"{estado['linhas_por_segundo']:,.0f} linhas/s".replace(",", "."))
+    elif estado.get("bytes_por_segundo"):
+        partes.append(f"{estado['bytes_por_segundo'] / 1e6:.1f} MB/s")
+    eta = estado.get("eta_segundos")
+    if eta is not None and estado["fracao"] < 1:
+        minutos, segundos = divmod(int(eta), 60)
+        partes.append(f"restante {minutos} min {segundos:02d} s" if minutos else f"restante {segundos} s")
+    return " · ".join(partes)
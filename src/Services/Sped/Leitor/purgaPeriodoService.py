@@ -0,0 +1,282 @@
+import argparse
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from src.Config.Database.db import PURGA_LOTE, PURGA_PAUSA
+from .particaoPeriodoService import ParticaoPeriodoService
+from .periodoVersaoService import PeriodoVersaoRepository
+
+# Filhas antes das mães: um C170 nunca fica sem o C100 durante a purga
+TABELAS_PURGA = ("c170_clone", "c170nova", "c170", "c100", "0200", "0150", "0000")
+
+@dataclass
+class ResultadoPurga:
+    tabela: str
+    empresa_id: int
+    periodo: str
+    linhas: int = 0
+    bytes: int = 0
+    lotes: int = 0
+    segundos: float = 0.0
+
+class PurgaPeriodoRepository:
+    def __init__(self, bind):
+        self.bind = bind
+        PeriodoVersaoRepository(bind)
+
+    def periodos(self, empresa_id: Optional[int] = None, periodo: Optional[str] = None) -> list:
+        filtros, parametros = [], {}
+        if empresa_id is not None:
+            filtros.append("empresa_id = :empresa_id")
+            parametros["empresa_id"] = empresa_id
+        if periodo is not None:
+            filtros.append("periodo = :periodo")
+            parametros["periodo"] = periodo
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        with self.bind.connect() as conn:
+            return conn.execute(text(f"""
+                SELECT empresa_id, periodo, geracao, ultima_geracao FROM periodo_versao {where}
+                ORDER BY empresa_id, periodo
+            """), parametros).fetchall()
+
+    def versao(self, empresa_id: int, periodo: str):
+        """Leitura atual de periodo_versao; uma importação pode ter começado depois da listagem"""
+        with self.bind.connect() as conn:
+            return conn.execute(text("""
+                SELECT empresa_id, periodo, geracao, ultima_geracao FROM periodo_versao
+                WHERE empresa_id = :empresa_id AND periodo = :periodo
+            """), {"empresa_id": empresa_id, "periodo": periodo}).first()
+
+    def geracoes(self, tabela: str, empresa_id: int, periodo: str) -> List[int]:
+        with self.bind.connect() as conn:
+            return [linha[0] for linha in conn.execute(text(f"""
+                SELECT DISTINCT geracao FROM `{tabela}` WHERE empresa_id = :empresa_id AND periodo = :periodo
+            """), {"empresa_id": empresa_id, "periodo": periodo})]
+
+    def contar(self, tabela: str, empresa_id: int, periodo: str, geracao: int) -> int:
+        with self.bind.connect() as conn:
+            return conn.execute(text(f"""
+                SELECT COUNT(*) FROM `{tabela}`
+                WHERE empresa_id = :empresa_id AND periodo = :periodo AND geracao = :geracao
+            """), {"empresa_id": empresa_id, "periodo": periodo, "geracao": geracao}).scalar()
+
+    def proximaFaixa(self, tabela: str, empresa_id: int, periodo: str, geracao: int, apos_id: int, lote: int):
+        """Próximos `lote` ids da geração em ordem de PK (lidos do índice empresa/período/geração)"""
+        with self.bind.connect() as conn:
+            ids = [linha[0] for linha in conn.execute(text(f"""
+                SELECT id FROM `{tabela}`
+                WHERE empresa_id = :empresa_id AND periodo = :periodo AND geracao = :geracao AND id > :apos_id
+                ORDER BY id
+                LIMIT {int(lote)}
+            """), {"empresa_id": empresa_id, "periodo": periodo, "geracao": geracao, "apos_id": apos_id})]
+        return (ids[0], ids[-1]) if ids else None
+
+    def removerFaixa(self, tabela: str, empresa_id: int, periodo: str, geracao: int,
+                     primeiro: int, ultimo: int, arquivo: Optional[str] = None) -> int:
+        """Uma transação curta por faixa; com `arquivo`, as linhas são copiadas antes de sair"""
+        filtro = """
+            WHERE id BETWEEN :primeiro AND :ultimo
+              AND empresa_id = :empresa_id AND periodo = :periodo AND geracao = :geracao
+        """
+        parametros = {
+            "empresa_id": empresa_id, "periodo": periodo, "geracao": geracao, "primeiro": primeiro, "ultimo": ultimo,
+        }
+        with self.bind.begin() as conn:
+            if arquivo:
+                conn.execute(text(f"INSERT INTO `{arquivo}` SELECT * FROM `{tabela}` {filtro}"), parametros)
+            return conn.execute(text(f"DELETE FROM `{tabela}` {filtro}"), parametros).rowcount
+
+    def garantirArquivo(self, tabela: str) -> str:
+        arquivo = f"{tabela}_arquivo"
+        with self.bind.begin() as conn:
+            if self.bind.dialect.name == "mysql":
+                existe = conn.execute(text("""
+                    SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela
+                """), {"tabela": arquivo}).first()
+                if not existe:
+                    conn.execute(text(f"CREATE TABLE `{arquivo}` LIKE `{tabela}`"))
+                    particionada = conn.execute(text("""
+                        SELECT 1 FROM information_schema.PARTITIONS
+                        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela AND PARTITION_NAME IS NOT NULL
+                    """), {"tabela": arquivo}).first()
+                    if particionada:
+                        conn.execute(text(f"ALTER TABLE `{arquivo}` REMOVE PARTITIONING"))
+            else:
+                conn.execute(text(f"CREATE TABLE IF NOT EXISTS `{arquivo}` AS SELECT * FROM `{tabela}` WHERE 0"))
+        return arquivo
+
+    def bytesPorLinha(self, tabela: str) -> float:
+        """Tamanho médio de uma linha com seus índices; 0 quando o banco não informa"""
+        try:
+            with self.bind.connect() as conn:
+                if self.bind.dialect.name == "mysql":
+                    linha = conn.execute(text("""
+                        SELECT DATA_LENGTH + INDEX_LENGTH, TABLE_ROWS FROM information_schema.TABLES
+                        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela
+                    """), {"tabela": tabela}).first()
+                else:
+                    # dbstat só existe no SQLite compilado com SQLITE_ENABLE_DBSTAT_VTAB
+                    linha = conn.execute(text(f"""
+                        SELECT (SELECT SUM(pgsize) FROM dbstat WHERE name = :tabela), COUNT(*) FROM `{tabela}`
+                    """), {"tabela": tabela}).first()
+        except Exception:
+            return 0.0
+        if not linha or not linha[0] or not linha[1]:
+            return 0.0
+        return float(linha[0]) / float(linha[1])
+
+class PurgaPeriodoService:
+    """Remove (ou arquiva) as linhas das gerações que nenhuma consulta lê mais.
+
+    Uma geração morta é qualquer uma abaixo da publicada em periodo_versao:
+    as substituídas por reimportações, as de importações abandonadas antes de
+    uma publicação posterior e as linhas do antigo soft delete (-1). A geração
+    publicada só avança, então uma geração morta nunca volta a ser lida, e as
+    gerações novas de importações iniciadas durante a purga (sempre acima da
+    publicada) ficam de fora. A remoção anda em
+    faixas de PK de `lote` linhas, cada uma na sua transação, com `pausa`
+    entre elas, para rodar durante o expediente sem segurar locks longos.
+    Nas tabelas particionadas por período (sem arquivamento), a partição é
+    compactada por troca de partição em vez das faixas de DELETE.
+    """
+
+    def __init__(self, session, lote: int = PURGA_LOTE, pausa: float = PURGA_PAUSA, arquivar: bool = False):
+        self.session = session
+        self.lote = lote
+        self.pausa = pausa
+        self.arquivar = arquivar
+        self.repository = PurgaPeriodoRepository(session.bind)
+        self._arquivos = {}
+        self._particoes = {}
+
+    @staticmethod
+    def geracoesMortas(versao, geracoes: List[int]) -> List[int]:
+        if versao is None or versao.geracao is None:
+            # Período nunca publicado: todas as gerações podem estar em carga
+            return []
+        return sorted(geracao for geracao in geracoes if geracao < versao.geracao)
+
+    def _arquivo(self, tabela: str) -> Optional[str]:
+        if not self.arquivar:
+            return None
+        if tabela not in self._arquivos:
+            self._arquivos[tabela] = self.repository.garantirArquivo(tabela)
+        return self._arquivos[tabela]
+
+    def _compactar(self, tabela: str, versao, mortas: List[int], resultado: ResultadoPurga) -> bool:
+        """Troca de partição no lugar das faixas de DELETE; False quando não se aplica ou não concluiu"""
+        if self.arquivar:
+            return False
+        if versao.empresa_id not in self._particoes:
+            self._particoes[versao.empresa_id] = ParticaoPeriodoService(self.session, versao.empresa_id)
+        particoes = self._particoes[versao.empresa_id]
+        if tabela not in particoes.tabelasParticionadas():
+            return False
+        linhas = sum(self.repository.contar(tabela, versao.empresa_id, versao.periodo, geracao) for geracao in mortas)
+        if not particoes.compactarTabela(tabela, versao.periodo, versao.geracao):
+            return False
+        resultado.linhas += linhas
+        resultado.lotes += 1
+        return True
+
+    def _purgarGeracao(self, tabela: str, versao, geracao: int, resultado: ResultadoPurga):
+        apos_id = 0
+        while True:
+            faixa = self.repository.proximaFaixa(tabela, versao.empresa_id, versao.periodo, geracao, apos_id, self.lote)
+            if faixa is None:
+                return
+            primeiro, ultimo = faixa
+            resultado.linhas += self.repository.removerFaixa(
+                tabela, versao.empresa_id, versao.periodo, geracao, primeiro, ultimo, self._arquivo(tabela)
+            )
+            resultado.lotes += 1
+            apos_id = ultimo
+            if self.pausa:
+                time.sleep(self.pausa)
+
+    def purgarPeriodo(self, versao, simular: bool = False) -> List[ResultadoPurga]:
+        resultados = []
+        for tabela in TABELAS_PURGA:
+            # Relida por tabela: a listagem de purgar() pode estar desatualizada
+            atual = self.repository.versao(versao.empresa_id, versao.periodo)
+            mortas = self.geracoesMortas(atual, self.repository.geracoes(tabela, versao.empresa_id, versao.periodo))
+            if not mortas:
+                continue
+
+            resultado = ResultadoPurga(tabela, versao.empresa_id, versao.periodo)
+            bytes_linha = self.repository.bytesPorLinha(tabela)
+            inicio = time.time()
+            if simular:
+                for geracao in mortas:
+                    resultado.linhas += self.repository.contar(tabela, versao.empresa_id, versao.periodo, geracao)
+            elif not self._compactar(tabela, atual, mortas, resultado):
+                for geracao in mortas:
+                    self._purgarGeracao(tabela, versao, geracao, resultado)
+            resultado.segundos = time.time() - inicio
+            resultado.bytes = int(resultado.linhas * bytes_linha)
+            resultados.append(resultado)
+
+            acao = "a remover" if simular else ("arquivadas" if self.arquivar else "removidas")
+            print(f"[METRICS] Purga `{tabela}` empresa {versao.empresa_id} período {versao.periodo}: "
+                  f"{resultado.linhas:,} linha(s) {acao}, ~{resultado.bytes / 1024 / 1024:.1f} MB, "
+                  f"{resultado.lotes} lote(s) em {resultado.segundos:.1f}s")
+        return resultados
+
+    def purgar(self, empresa_id: Optional[int] = None, periodos: Optional[List[str]] = None,
+               simular: bool = False) -> List[ResultadoPurga]:
+        if periodos:
+            versoes = [v for periodo in periodos for v in self.repository.periodos(empresa_id, periodo)]
+        else:
+            versoes = self.repository.periodos(empresa_id)
+
+        resultados = []
+        for versao in versoes:
+            resultados.extend(self.purgarPeriodo(versao, simular))
+
+        linhas = sum(r.linhas for r in resultados)
+        total_bytes = sum(r.bytes for r in resultados)
+        print(f"[INFO] Purga {'simulada' if simular else 'concluída'}: {len(versoes)} período(s), "
+              f"{linhas:,} linha(s), ~{total_bytes / 1024 / 1024:.1f} MB liberados")
+        return resultados
+
+def purgarEmSegundoPlano(empresa_id: int, periodos: List[str]) -> threading.Thread:
+    """Purga dos períodos recém-reimportados numa thread própria, com sessão própria"""
+    from src.Config.Database.db import SessionLocal
+
+    def executar():
+        session = SessionLocal()
+        try:
+            PurgaPeriodoService(session).purgar(empresa_id, periodos)
+        except Exception as e:
+            print(f"[ERROR] Falha na purga em segundo plano da empresa {empresa_id}: {e}")
+        finally:
+            session.close()
+
+    thread = threading.Thread(target=executar, name=f"purga-{empresa_id}", daemon=True)
+    thread.start()
+    return thread
+
+if __name__ == "__main__":
+    from src.Config.Database.db import getSession
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.Services.Sped.Leitor.purgaPeriodoService",
+        description="Remove ou arquiva as linhas das gerações antigas dos períodos SPED.",
+    )
+    parser.add_argument("--empresa", type=int, help="empresa_id (padrão: todas)")
+    parser.add_argument("--periodo", action="append", help="MM/AAAA; pode repetir (padrão: todos)")
+    parser.add_argument("--arquivar", action="store_true", help="copiar para <tabela>_arquivo antes de remover")
+    parser.add_argument("--lote", type=int, default=PURGA_LOTE, help="linhas por transação")
+    parser.add_argument("--pausa", type=float, default=PURGA_PAUSA, help="segundos entre lotes")
+    parser.add_argument("--simular", action="store_true", help="só contar as linhas que seriam removidas")
+    args = parser.parse_args()
+
+    session = getSession()
+    try:
+        PurgaPeriodoService(session, args.lote, args.pausa, args.arquivar).purgar(args.empresa, args.periodo, args.simular)
+    finally:
+        session.close()
@@ -1,6 +1,8 @@
 from pathlib import Path
 from sqlalchemy import text
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from .indiceSpedService import IndiceSpedService
+from .periodoVersaoService import PeriodoVersaoRepository
 from src.Models import _0000Model, _0150Model, _0200Model, c100Model, c170Model, c170novaModel, c170cloneModel
     
 class ValidadorPeriodoRepository:
@@ -16,6 +18,7 @@ class ValidadorPeriodoRepository:
             c170novaModel.C170Nova,
             c170cloneModel.C170Clone
         ]
+        self.versoes = PeriodoVersaoRepository(session.bind)
 
     def softDelete(self, periodo: str, empresa_id: int):
         for modelo in self.modelos:
@@ -33,24 +36,9 @@ class ValidadorPeriodoRepository:
             })
 
     def verificarRegistroPeriodoAtivo(self, periodo: str, empresa_id: int) -> bool:
-        for modelo in self.modelos:
-            table_name = modelo.__tablename__
-            query = text(f"""
-                SELECT 1
-                FROM `{table_name}`
-                WHERE empresa_id = :empresa_id
-                  AND periodo = :periodo
-                  AND is_active = 1
-                LIMIT 1
-            """)
-            resultado = self.session.execute(query, {
-                "empresa_id": empresa_id,
-                "periodo": periodo
-            }).first()
-
-            if resultado:
-                return True
-        return False
+        """Período com geração publicada em periodo_versao (uma linha, sem varrer as tabelas SPED)"""
+        versao = self.versoes.buscar(empresa_id, periodo)
+        return versao is not None and versao.geracao is not None
 
 class ValidadorPeriodoService:
     def __init__(self, session, empresa_id):
@@ -96,17 +84,10 @@ class ValidadorPeriodoService:
         return resultados
 
     def extrairDataInicial(self, caminho_arquivo: str) -> str | None:
-        for encoding in ["utf-8", "latin1"]:
-            try:
-                with open(caminho_arquivo, 'r', encoding=encoding) as f:
-                    for linha in f:
-                        if linha.startswith("|0000|"):
-                            partes = linha.strip().split("|")[1:-1]
-                            return partes[3] if len(partes) > 3 else None
-                break
-            except Exception:
-                continue
-        return None
+        try:
+            return IndiceSpedService.obter(caminho_arquivo).dt_ini
+        except OSError:
+            return None
     
     # @staticmethod
     # def extrairDataInicial(caminho_arquivo: str) -> tuple[str, str | None]:
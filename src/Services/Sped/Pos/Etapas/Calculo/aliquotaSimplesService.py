@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from src.Models.c170cloneModel import C170Clone
+from src.Services.Sped.Leitor.periodoVersaoService import filtroVigente
 
 import pandas as pd
 
@@ -10,7 +11,7 @@ class AliquotaSimplesRepository:
         self.db = db_session
 
     def buscarRegistroSimples(self, empresa_id: int, periodo: str) -> pd.DataFrame:
-        query = text("""
+        query = text(f"""
             SELECT 
                 c.id,
                 c.aliquota,
@@ -23,8 +24,9 @@ class AliquotaSimplesRepository:
             WHERE 
                 c.periodo = :periodo
                 AND c.empresa_id = :empresa_id
-                AND c.is_active = 1
+                AND {filtroVigente("c")}
                 AND f.simples = 1
+                AND c.aliquota IS NOT NULL
         """)
         return pd.read_sql(query, self.db.bind, params={"empresa_id": empresa_id, "periodo": periodo})
 
@@ -34,8 +36,9 @@ class AliquotaSimplesRepository:
             return
 
         updates = df[["id", "aliquota"]].to_dict(orient="records")
-        with self.db.begin():
-            self.db.bulk_update_mappings(C170Clone, updates)
+        # A sessão já está em transação (consultas anteriores da etapa): grava e confirma nela
+        self.db.bulk_update_mappings(C170Clone, updates)
+        self.db.commit()
         print(f"[OK] {len(updates)} registros atualizados com sucesso.")
 
 
@@ -54,29 +57,10 @@ class AliquotaSimplesService:
                 print("[OK] Nenhum registro para processar.")
                 return
 
-            # Limpeza
-            df["aliquota_str"] = df["aliquota"].astype(str).str.strip().str.upper()
-
-            def calcular_nova_aliquota(row):
-                aliq = row["aliquota_str"]
-                if aliq in ["ST", "ISENTO", "PAUTA", ""]:
-                    return None
-                try:
-                    valor = float(aliq.replace(",", ".").replace("%", ""))
-                    nova = round(valor + 3, 2)
-                    return f"{nova:.2f}".replace(".", ",") + "%"
-                except Exception as e:
-                    print(f"[AVISO] Erro ao processar registro {row['id']}: {e}")
-                    return None
-
-            df["nova_aliquota"] = df.apply(calcular_nova_aliquota, axis=1)
-            df_resultado = df[df["nova_aliquota"].notnull()][["id", "nova_aliquota"]].copy()
-            df_resultado.rename(columns={"nova_aliquota": "aliquota"}, inplace=True)
-
-            if not df_resultado.empty:
-                self.repository.atualizarDados(df_resultado)
-            else:
-                print("[OK] Nenhuma alíquota foi considerada válida para atualização.")
+            # Tokens (ST/ISENTO/PAUTA) ficam em aliquota_token e não entram na consulta
+            df_resultado = df[["id"]].copy()
+            df_resultado["aliquota"] = (df["aliquota"].astype(float) + 3).round(2)
+            self.repository.atualizarDados(df_resultado)
 
         except Exception as e:
             self.repository.db.rollback()
@@ -2,6 +2,8 @@ import pandas as pd
 from sqlalchemy import text
 from src.Models.c170cloneModel import C170Clone
 from src.Models._0000Model import Registro0000
+from src.Services.Sped.Leitor.periodoVersaoService import filtroVigente
+from src.Utils.aliquota import separarAliquota
 
 LOTE_TAMANHO = 50000
 
@@ -10,11 +12,11 @@ class AtualizarAliquotaRepository:
         self.db = db_session
 
     def buscarDtInit(self, empresa_id: int):
-        query = """
+        query = f"""
             SELECT dt_ini 
-            FROM `0000` 
+            FROM `0000` r0000
             WHERE empresa_id = :empresa_id 
-            AND is_active = 1
+            AND {filtroVigente("r0000")}
             ORDER BY id DESC
             LIMIT 1
         """
@@ -23,7 +25,7 @@ class AtualizarAliquotaRepository:
         return df.iloc[0]['dt_ini'] if not df.empty else None
 
     def buscarRegistrosPandas(self, empresa_id: int) -> pd.DataFrame:
-        query = """
+        query = f"""
             SELECT 
                 c.id AS id_c170,
                 t.aliquota AS nova_aliquota,
@@ -35,8 +37,9 @@ class AtualizarAliquotaRepository:
              AND t.produto = c.descr_compl
              AND t.ncm = c.ncm
             WHERE c.empresa_id = :empresa_id
-              AND c.is_active = 1
-              AND (c.aliquota IS NULL OR TRIM(c.aliquota) = '')
+              AND {filtroVigente("c")}
+              AND c.aliquota IS NULL
+              AND c.aliquota_token IS NULL
               AND t.aliquota IS NOT NULL
               AND TRIM(t.aliquota) != ''
         """
@@ -50,11 +53,19 @@ class AtualizarAliquotaRepository:
 
         # Criar tabela temporária
         temp_table = "temp_atualiza_aliquota"
-        df_temp = df_lote[["id_c170", "nova_aliquota"]].copy()
-        df_temp.columns = ["id", "aliquota"]
-        df_temp["aliquota"] = df_temp["aliquota"].astype(str).str[:10]
-
-        df_temp.to_sql(temp_table, self.db.bind, index=False, if_exists="replace")
+        # O cadastro guarda texto ("12.00", "ST"); c170_clone guarda a taxa e o token separados
+        separadas = [separarAliquota(aliquota) for aliquota in df_lote["nova_aliquota"]]
+        df_temp = pd.DataFrame({
+            "id": df_lote["id_c170"].to_numpy(),
+            "aliquota": [taxa for taxa, _ in separadas],
+            "aliquota_token": [token for _, token in separadas],
+        })
+
+        colunas = C170Clone.__table__.c
+        df_temp.to_sql(
+            temp_table, self.db.bind, index=False, if_exists="replace",
+            dtype={"aliquota": colunas.aliquota.type, "aliquota_token": colunas.aliquota_token.type},
+        )
         self.db.commit()
 
         dialeto = self.db.bind.dialect.name
@@ -64,8 +75,16 @@ class AtualizarAliquotaRepository:
             update_query = f"""
                 UPDATE c170_clone
                 JOIN {temp_table} AS tmp ON tmp.id = c170_clone.id
-                SET c170_clone.aliquota = tmp.aliquota
-                WHERE c170_clone.is_active = 1
+                SET c170_clone.aliquota = tmp.aliquota, c170_clone.aliquota_token = tmp.aliquota_token
+                WHERE {filtroVigente("c170_clone")}
+            """
+        elif dialeto in ("sqlite", "postgresql"):
+            # UPDATE ... FROM (SQLite >= 3.33)
+            update_query = f"""
+                UPDATE c170_clone
+                SET aliquota = tmp.aliquota, aliquota_token = tmp.aliquota_token
+                FROM {temp_table} AS tmp
+                WHERE tmp.id = c170_clone.id AND {filtroVigente("c170_clone")}
             """
         else:
             raise NotImplementedError(f"UPDATE JOIN não implementado para {dialeto}")
@@ -3,6 +3,7 @@ import asyncio
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy import text
 from src.Models.c170cloneModel import C170Clone
+from src.Services.Sped.Leitor.periodoVersaoService import filtroVigente
 import numpy as np
 import time
 
@@ -11,16 +12,16 @@ class CalculoResultadoRepository:
         self.session_factory = session_factory
 
     def buscarRegistros(self, db: Session, empresa_id: int) -> pd.DataFrame:
-        query = text("""
-            SELECT id, vl_item, vl_desc, aliquota
+        query = text(f"""
+            SELECT id, vl_item, vl_desc, aliquota, aliquota_token
             FROM c170_clone
             WHERE empresa_id = :empresa_id
-              AND is_active = 1
+              AND {filtroVigente("c170_clone")}
         """)
         return pd.read_sql(query, con=db.bind, params={"empresa_id": empresa_id})
 
     def atualizarLoteComVerificacao(self, df_lote: pd.DataFrame):
-        """✅ Atualização com verificação is_active"""
+        """✅ Atualização restrita à geração vigente"""
         if df_lote.empty:
             return 0
             
@@ -40,10 +41,10 @@ class CalculoResultadoRepository:
                 # Para lotes pequenos, usar UPDATE individual
                 for _, row in df_lote.iterrows():
                     result = session.execute(
-                        text("""
+                        text(f"""
                             UPDATE c170_clone 
                             SET resultado = :resultado 
-                            WHERE id = :id AND is_active = 1
+                            WHERE id = :id AND {filtroVigente("c170_clone")}
                         """),
                         {"id": int(row["id"]), "resultado": float(row["resultado"])}
                     )
@@ -91,15 +92,15 @@ class CalculoResultadoRepository:
                     UPDATE c170_clone c
                     JOIN {temp_table} tmp ON tmp.id = c.id
                     SET c.resultado = tmp.resultado
-                    WHERE c.is_active = 1
+                    WHERE {filtroVigente("c")}
                 """
-            elif dialeto in ("postgresql", "postgres"):
+            elif dialeto in ("postgresql", "postgres", "sqlite"):
                 update_query = f"""
                     UPDATE c170_clone
                     SET resultado = tmp.resultado
                     FROM {temp_table} tmp
                     WHERE tmp.id = c170_clone.id
-                      AND c170_clone.is_active = 1
+                      AND {filtroVigente("c170_clone")}
                 """
             else:
                 raise NotImplementedError(f"Dialeto {dialeto} não suportado")
@@ -145,10 +146,10 @@ class CalculoResultadoRepository:
                 ]
                 
                 result = session.execute(
-                    text("""
+                    text(f"""
                         UPDATE c170_clone 
                         SET resultado = :resultado 
-                        WHERE id = :id AND is_active = 1
+                        WHERE id = :id AND {filtroVigente("c170_clone")}
                     """),
                     batch_data
                 )
@@ -320,36 +321,11 @@ class CalculoResultadoService:
     def _processar_dados_vetorizado(self, df: pd.DataFrame) -> pd.DataFrame:
         print("[CALC] ⚙️ Iniciando processamento vetorizado...")
         
-        # Conversões otimizadas
-        df["vl_item"] = pd.to_numeric(
-            df["vl_item"].astype(str).str.replace(",", ".", regex=False), 
-            errors="coerce"
-        ).fillna(0.0)
-        
-        df["vl_desc"] = pd.to_numeric(
-            df["vl_desc"].astype(str).str.replace(",", ".", regex=False), 
-            errors="coerce"
-        ).fillna(0.0)
-        
-        df["aliquota_str"] = df["aliquota"].astype(str).str.strip().str.upper()
-        df["resultado"] = 0.0
-
-        # Processamento de isentos
-        mask_isento = df["aliquota_str"].isin(["ISENTO", "ST"])
+        # Colunas DECIMAL: read_sql já entrega números (NULL -> NaN)
+        base = (df["vl_item"].astype(float).fillna(0.0) - df["vl_desc"].astype(float).fillna(0.0)).clip(lower=0)
+        mask_isento = df["aliquota_token"].isin(["ISENTO", "ST"])
+        df["resultado"] = (base * (df["aliquota"].astype(float) / 100)).round(2).fillna(0.0)
         df.loc[mask_isento, "resultado"] = 0.00
-        
-        # Processamento de não-isentos
-        df_nao_isento = df[~mask_isento].copy()
-        if not df_nao_isento.empty:
-            aliquotas_clean = (df_nao_isento["aliquota_str"]
-                              .str.replace(",", ".", regex=False)
-                              .str.replace("%", "", regex=False))
-            
-            aliquotas_numeric = pd.to_numeric(aliquotas_clean, errors="coerce")
-            base = (df_nao_isento["vl_item"] - df_nao_isento["vl_desc"]).clip(lower=0)
-            resultado_calculado = (base * (aliquotas_numeric / 100)).round(2)
-            mask_valido = aliquotas_numeric.notnull()
-            df.loc[df_nao_isento[mask_valido].index, "resultado"] = resultado_calculado[mask_valido]
 
         # Filtrar registros válidos
         df_validos = df[mask_isento | (df["resultado"] > 0)].copy()
@@ -1,7 +1,9 @@
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from src.Config.Database.db import metodoInsercao
 from src.Models.c170novaModel import C170Nova
+from src.Services.Sped.Leitor.periodoVersaoService import filtroVigente
 
 class C170NovaRepository:
     def __init__(self, db_session: Session):
@@ -17,10 +19,10 @@ class C170NovaRepository:
         return set(f"{row['cod_part']}_{row['empresa_id']}" for _, row in df.iterrows())
 
     def dados0200(self, empresa_id: int) -> dict:
-        query = text("""
+        query = text(f"""
             SELECT cod_item, empresa_id, descr_item, cod_ncm
-            FROM `0200`
-            WHERE empresa_id = :empresa_id AND is_active = 1
+            FROM `0200` r0200
+            WHERE empresa_id = :empresa_id AND {filtroVigente("r0200")}
         """)
         df = pd.read_sql(query, self.db.bind, params={"empresa_id": empresa_id})
         return {
@@ -37,12 +39,12 @@ class C170NovaRepository:
                 c170.cod_item, c170.periodo, c170.reg, c170.num_item, c170.descr_compl,
                 c170.qtd, c170.unid, c170.vl_item, c170.vl_desc, c170.cfop,
                 c170.cst_icms, c170.id_c100, c170.filial, c170.ind_oper,
-                c100.cod_part, c100.num_doc, c100.chv_nfe, c170.empresa_id
+                c100.cod_part, c100.num_doc, c100.chv_nfe, c170.empresa_id, c170.geracao
             FROM c170
             JOIN c100 ON c170.id_c100 = c100.id
             WHERE c170.empresa_id = :empresa_id
-              AND c170.is_active = 1
-              AND c100.is_active = 1
+              AND {filtroVigente("c170")}
+              AND c100.geracao = c170.geracao
               AND c170.cfop IN ('1101', '1401', '1102', '1403', '1910', '1116')
             LIMIT {lote_tamanho} OFFSET {offset}
         """)
@@ -56,7 +58,7 @@ class C170NovaRepository:
             con=self.db.bind,
             if_exists="append",
             index=False,
-            method="multi",
+            method=metodoInsercao(self.db.bind),
             chunksize=10000
         )
 
@@ -112,7 +114,8 @@ class C170NovaService:
                         'num_doc': row['num_doc'],
                         'chv_nfe': row['chv_nfe'],
                         'empresa_id': empresa_id,
-                        'cod_ncm': cod_ncm
+                        'cod_ncm': cod_ncm,
+                        'geracao': row['geracao']
                     })
 
                 if dadosInsercao:
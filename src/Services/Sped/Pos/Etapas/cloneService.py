@@ -1,21 +1,23 @@
 import pandas as pd
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from src.Config.Database.db import metodoInsercao
 from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from src.Services.Sped.Leitor.periodoVersaoService import filtroVigente
 
 class ClonagemRepository:
     def __init__(self, db_session: Session):
         self.db = db_session
 
     def buscarC170Nova(self, empresa_id: int) -> pd.DataFrame:
-        query = text("""
+        query = text(f"""
             SELECT 
                 empresa_id, cod_item, periodo, reg, num_item, descr_compl, cod_ncm, qtd,
                 unid, vl_item, vl_desc, cst, cfop, id_c100, filial, ind_oper, cod_part,
-                num_doc, chv_nfe
+                num_doc, chv_nfe, geracao
             FROM c170nova
-            WHERE empresa_id = :empresa_id AND is_active = 1
+            WHERE empresa_id = :empresa_id AND {filtroVigente("c170nova")}
         """)
         return pd.read_sql(query, self.db.bind, params={"empresa_id": empresa_id})
 
@@ -27,8 +29,9 @@ class ClonagemRepository:
         print(f"[INFO] Inserindo {len(df)} registros com {num_threads} thread(s)...")
 
         # Preparar DataFrame
-        df['aliquota'] = ''
-        df['resultado'] = ''
+        df['aliquota'] = None
+        df['aliquota_token'] = None
+        df['resultado'] = None
         df['is_active'] = True
         df.rename(columns={"cod_ncm": "ncm"}, inplace=True)
 
@@ -36,7 +39,7 @@ class ClonagemRepository:
             'empresa_id', 'cod_item', 'periodo', 'reg', 'num_item', 'descr_compl',
             'ncm', 'qtd', 'unid', 'vl_item', 'vl_desc', 'cst', 'cfop', 'id_c100',
             'filial', 'ind_oper', 'cod_part', 'num_doc', 'chv_nfe',
-            'aliquota', 'resultado', 'is_active'
+            'aliquota', 'aliquota_token', 'resultado', 'is_active', 'geracao'
         ]
         df = df[colunas_ordenadas]
 
@@ -51,7 +54,7 @@ class ClonagemRepository:
                     con=self.db.bind,
                     if_exists="append",
                     index=False,
-                    method="multi"
+                    method=metodoInsercao(self.db.bind)
                 )
                 return len(df_lote)
             except Exception as e:
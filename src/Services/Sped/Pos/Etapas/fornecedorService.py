@@ -2,6 +2,7 @@ import asyncio
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from src.Config.Database.db import metodoInsercao
 from src.Utils.cnpj import processarCnpjs
 
 LOTE = 50
@@ -42,7 +43,7 @@ class FornecedorRepository:
             con=self.db.bind,
             if_exists="append",
             index=False,
-            method="multi",
+            method=metodoInsercao(self.db.bind),
             chunksize=1000
         )
         return len(df_insert)
@@ -2,6 +2,8 @@ import pandas as pd
 import traceback
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from src.Config.Database.db import metodoInsercao
+from src.Services.Sped.Leitor.periodoVersaoService import filtroVigente
 
 class TributacaoRepository:
     def __init__(self, db_session: Session):
@@ -10,7 +12,7 @@ class TributacaoRepository:
     def buscarProdutosValidos(self, empresa_id: int) -> pd.DataFrame:
         try:
             empresa_id = int(empresa_id)
-            query = text("""
+            query = text(f"""
                 SELECT DISTINCT
                     c170.empresa_id,
                     c170.cod_item AS codigo,
@@ -24,11 +26,11 @@ class TributacaoRepository:
                 LEFT JOIN `0200` r0200 
                     ON r0200.cod_item = c170.cod_item
                     AND r0200.empresa_id = c170.empresa_id
-                    AND r0200.is_active = 1
+                    AND {filtroVigente("r0200")}
                 WHERE 
                     c170.empresa_id = :empresa_id
-                    AND c170.is_active = 1
-                    AND c100.is_active = 1
+                    AND {filtroVigente("c170")}
+                    AND c100.geracao = c170.geracao
                     AND c170.cfop IN (
                         '1101', '1401', '1102', '1403', '1910', '1116',
                         '2101', '2102', '2401', '2403', '2910', '2116'
@@ -80,7 +82,7 @@ class TributacaoRepository:
                 con=self.db.bind,
                 if_exists="append",
                 index=False,
-                method="multi",
+                method=metodoInsercao(self.db.bind),
                 chunksize=10000
             )
 
@@ -10,6 +10,7 @@ from .Etapas.Calculo.atualizarAliquotaService import AtualizarAliquotaRepository
 from .Etapas.Calculo.aliquotaSimplesService import AliquotaSimplesService, AliquotaSimplesRepository
 from .Etapas.Calculo.calculoResultadoService import CalculoResultadoService, CalculoResultadoRepository
 
+from src.Services.Sped.Leitor.importacaoSpedService import ImportacaoSpedService
 from src.Utils.periodo import obterPeriodo
 from src.Config.Database.db import SessionLocal  
 
@@ -48,6 +49,9 @@ class PosProcessamentoService:
         for idx, etapa in enumerate(etapas, start=5):
             await etapa()
 
+        # Importações deste ciclo passam a poder ser reaproveitadas em reenvios do mesmo arquivo
+        ImportacaoSpedService(self.session).marcarConcluidas(self.empresa_id)
+
         print("[POS] Pós-processamento finalizado.")
         return {"status": "ok"}
 
@@ -0,0 +1,85 @@
+import os
+import tempfile
+from sqlalchemy import Numeric
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from src.Config.Database.db import Base, CARGA_LOCAL_INFILE, metodoInsercao
+from src.Services.Sped.Salvar.loteRegistros import LoteRegistros
+
+# Erros MySQL/PyMySQL que indicam LOAD DATA LOCAL desabilitado no cliente ou no servidor
+ERROS_LOCAL_INFILE_DESABILITADO = {1148, 2068, 3948}
+
+_ESCAPES_TSV = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+class CargaEmMassa:
+    """Salvamento de lotes via LOAD DATA LOCAL INFILE com fallback para DataFrame.to_sql"""
+    disponivel = CARGA_LOCAL_INFILE
+
+    @staticmethod
+    def campoTsv(valor) -> str:
+        if valor is None or (isinstance(valor, float) and valor != valor):
+            return "\\N"
+        if isinstance(valor, bool):
+            return "1" if valor else "0"
+        return str(valor).translate(_ESCAPES_TSV)
+
+    @classmethod
+    def salvar(cls, destino, tabela: str, registros: LoteRegistros, chunksize: int = 5000):
+        """`destino` é uma Connection (grava dentro da transação dela) ou uma sessão (transação própria no bind)"""
+        if not registros:
+            return
+
+        bind = destino if isinstance(destino, Connection) else destino.bind
+        if cls.disponivel and bind.dialect.name == "mysql":
+            try:
+                cls.carregarTsv(bind, tabela, registros)
+                return
+            except DBAPIError as e:
+                codigo = e.orig.args[0] if e.orig is not None and e.orig.args else None
+                if codigo not in ERROS_LOCAL_INFILE_DESABILITADO:
+                    raise
+                print(f"[WARNING] LOAD DATA LOCAL INFILE recusado pelo banco ({codigo}); usando INSERT em lote.")
+                cls.disponivel = False
+
+        df = registros.dataframe()
+        df.to_sql(tabela, bind, if_exists='append', index=False, method=metodoInsercao(bind), chunksize=chunksize,
+                  dtype=cls.tiposDecimais(tabela, df.columns))
+
+    @staticmethod
+    def tiposDecimais(tabela: str, colunas) -> dict | None:
+        """Tipos DECIMAL do modelo para o to_sql: sem eles o pandas manda Decimal cru ao driver (o sqlite3 recusa)"""
+        modelo = Base.metadata.tables.get(tabela)
+        if modelo is None:
+            return None
+        tipos = {c.name: c.type for c in modelo.c if c.name in colunas and isinstance(c.type, Numeric)}
+        return tipos or None
+
+    @classmethod
+    def carregarTsv(cls, bind, tabela: str, registros: LoteRegistros):
+        colunas = registros.colunas
+        campo = cls.campoTsv
+
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="\n", suffix=".tsv", delete=False) as arquivo:
+            caminho = arquivo.name
+            for linha in registros:
+                arquivo.write("\t".join(map(campo, linha)))
+                arquivo.write("\n")
+
+        try:
+            caminho_sql = caminho.replace("\\", "/").replace("'", "\\'")
+            lista_colunas = ", ".join(f"`{coluna}`" for coluna in colunas)
+            sql = (
+                f"LOAD DATA LOCAL INFILE '{caminho_sql}' INTO TABLE `{tabela}` "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                "LINES TERMINATED BY '\\n' "
+                f"({lista_colunas})"
+            )
+            if isinstance(bind, Connection):
+                bind.exec_driver_sql(sql)
+            else:
+                with bind.begin() as conn:
+                    conn.exec_driver_sql(sql)
+        finally:
+            os.remove(caminho)
@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+
+from src.Config.Database.db import ARQUIVOS_SIMULTANEOS, POOL_ESCRITORES, POOL_EXCEDENTE, POOL_TAMANHO
+
+# Um escritor recebe a conexão (já dentro da transação) e grava a sua tabela
+Escritor = Callable[[Connection], None]
+
+class VagasEscritores:
+    """Conexões de escrita do pool principal, divididas entre as importações simultâneas.
+
+    Cada escritor segura a sua conexão, com a transação aberta, até o commit
+    coordenado do flush. Um flush reserva as vagas de todos os seus escritores
+    de uma vez: sem isso, arquivos simultâneos ficavam cada um com parte das
+    conexões esperando pelo resto, até o POOL_TIMEOUT.
+    """
+
+    def __init__(self, total: int):
+        self.total = max(1, total)
+        self.livres = self.total
+        self._condicao = Condition()
+
+    def reservar(self, quantidade: int) -> int:
+        quantidade = min(max(1, quantidade), self.total)
+        with self._condicao:
+            self._condicao.wait_for(lambda: self.livres >= quantidade)
+            self.livres -= quantidade
+        return quantidade
+
+    def liberar(self, quantidade: int):
+        with self._condicao:
+            self.livres += quantidade
+            self._condicao.notify_all()
+
+# O pool inteiro menos a sessão do leitor de cada arquivo simultâneo e a do controller
+VAGAS_ESCRITORES = VagasEscritores(POOL_TAMANHO + POOL_EXCEDENTE - ARQUIVOS_SIMULTANEOS - 1)
+
+class EscritaCoordenada:
+    """Grava as tabelas de um flush em paralelo, cada uma com conexão e transação próprias do pool.
+
+    Commit coordenado: nada é confirmado antes de todos os escritores
+    terminarem, e a falha de qualquer um desfaz todas as transações. No MySQL
+    as transações são XA: todas passam por PREPARE antes do primeiro COMMIT.
+    No SQLite (um único escritor por banco) os escritores rodam em sequência
+    numa só transação.
+    """
+
+    def __init__(self, bind: Engine, max_escritores: int = POOL_ESCRITORES, vagas: VagasEscritores = VAGAS_ESCRITORES):
+        self.bind = bind
+        self.vagas = vagas
+        self.max_escritores = max(1, max_escritores)
+        self.duas_fases = bind.dialect.name == "mysql"
+        self.escritor_unico = bind.dialect.name == "sqlite"
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def gravar(self, escritores: Dict[str, Escritor]):
+        if not escritores:
+            return
+        if self.escritor_unico:
+            with self.bind.begin() as conexao:
+                for escritor in escritores.values():
+                    escritor(conexao)
+            return
+
+        reservadas = self.vagas.reservar(len(escritores))
+        try:
+            self._gravarEmParalelo(escritores)
+        finally:
+            self.vagas.liberar(reservadas)
+
+    def _gravarEmParalelo(self, escritores: Dict[str, Escritor]):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_escritores, thread_name_prefix="escritor")
+        futuros = {nome: self._executor.submit(self._escrever, escritor) for nome, escritor in escritores.items()}
+
+        abertas, erro = [], None
+        for nome, futuro in futuros.items():
+            try:
+                abertas.append((nome, *futuro.result()))
+            except Exception as e:
+                print(f"[ERROR] Escritor {nome} falhou: {e}")
+                erro = erro or e
+
+        if erro:
+            self._desfazer(abertas)
+            raise erro
+        self._confirmar(abertas)
+
+    def _escrever(self, escritor: Escritor) -> Tuple[Connection, object]:
+        conexao = self.bind.connect()
+        transacao = conexao.begin_twophase() if self.duas_fases else conexao.begin()
+        try:
+            escritor(conexao)
+        except Exception:
+            transacao.rollback()
+            conexao.close()
+            raise
+        return conexao, transacao
+
+    def _confirmar(self, abertas: List[tuple]):
+        if self.duas_fases:
+            try:
+                for _, _, transacao in abertas:
+                    transacao.prepare()
+            except Exception as e:
+                print(f"[ERROR] PREPARE do flush falhou; desfazendo todas as tabelas: {e}")
+                self._desfazer(abertas)
+                raise
+
+        confirmadas = 0
+        try:
+            for nome, conexao, transacao in abertas:
+                transacao.commit()
+                conexao.close()
+                confirmadas += 1
+        except Exception as e:
+            # Com XA, as transações restantes continuam preparadas até o rollback abaixo
+            ja_gravadas = ", ".join(nome for nome, _, _ in abertas[:confirmadas]) or "nenhuma"
+            print(f"[ERROR] COMMIT do flush interrompido em {abertas[confirmadas][0]} "
+                  f"(já confirmadas: {ja_gravadas}): {e}")
+            self._desfazer(abertas[confirmadas:])
+            raise
+
+    def _desfazer(self, abertas: List[tuple]):
+        for nome, conexao, transacao in abertas:
+            try:
+                transacao.rollback()
+            except Exception as e:
+                print(f"[WARN] Rollback de {nome} falhou: {e}")
+            finally:
+                conexao.close()
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,57 @@
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+import pandas as pd
+
+class LoteRegistros:
+    """Lote de linhas em tuplas com a ordem fixa de `colunas`, no lugar de uma lista de dicts.
+
+    Valores muito repetidos (período, filial, CFOP, CST, unidade...) passam por
+    `interno`, que devolve sempre o mesmo objeto para strings iguais dentro do
+    lote. O lote é entregue ao CargaEmMassa sem virar lista de dicts.
+
+    `sanitizar` aplica regras de coluna (ver sanitizacaoColunas) às linhas
+    ainda não sanitizadas, de uma vez por coluna em vez de campo a campo.
+    """
+    __slots__ = ("colunas", "linhas", "_internas", "_sanitizadas")
+
+    def __init__(self, colunas: Sequence[str]):
+        self.colunas = tuple(colunas)
+        self.linhas = []
+        self._internas = {}
+        self._sanitizadas = 0
+
+    def interno(self, valor: Optional[str]) -> Optional[str]:
+        if valor is None:
+            return None
+        return self._internas.setdefault(valor, valor)
+
+    def append(self, linha: tuple):
+        self.linhas.append(linha)
+
+    def extend(self, linhas: Iterable[tuple]):
+        self.linhas.extend(linhas)
+
+    def clear(self):
+        self.linhas.clear()
+        self._internas.clear()
+        self._sanitizadas = 0
+
+    def sanitizar(self, regras: Dict[str, Callable[[Sequence], list]]):
+        inicio = self._sanitizadas
+        if not regras or inicio >= len(self.linhas):
+            return
+        colunas = list(zip(*self.linhas[inicio:]))
+        for campo, regra in regras.items():
+            posicao = self.colunas.index(campo)
+            colunas[posicao] = regra(colunas[posicao])
+        self.linhas[inicio:] = zip(*colunas)
+        self._sanitizadas = len(self.linhas)
+
+    def dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame.from_records(self.linhas, columns=self.colunas)
+
+    def __len__(self) -> int:
+        return len(self.linhas)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self.linhas)
@@ -1,18 +1,27 @@
 from sqlalchemy import text
 import pandas as pd
+from src.Config.Database.db import metodoInsercao
 from src.Models._0000Model import Registro0000
 from src.Utils.sanitizacao import calcularPeriodo
+from src.Services.Sped.Salvar.loteRegistros import LoteRegistros
+from src.Services.Sped.Salvar.reservaIdsService import ReservaIdsService
+
+COLUNAS_0000 = (
+    "id", "reg", "cod_ver", "cod_fin", "dt_ini", "dt_fin", "nome", "cnpj", "cpf", "uf", "ie", "cod_num", "im",
+    "suframa", "ind_perfil", "ind_ativ", "filial", "periodo", "empresa_id", "is_active", "geracao",
+)
 
 class Registro0000Repository:
     def __init__(self, session):
         self.session = session
 
-    def salvamento(self, registros: list[dict]):
+    def salvamento(self, registros: LoteRegistros, conexao=None):
         if not registros:
             return
 
-        df = pd.DataFrame(registros)
-        df.to_sql('0000', self.session.bind, if_exists='append', index=False, method='multi', chunksize=5000)
+        df = registros.dataframe()
+        destino = conexao if conexao is not None else self.session.bind
+        df.to_sql('0000', destino, if_exists='append', index=False, method=metodoInsercao(destino), chunksize=5000)
         print(f"[0000] {len(registros)} registro(s) salvo(s) no banco de dados.")
 
 class Registro0000Service:
@@ -20,15 +29,22 @@ class Registro0000Service:
         self.session = session
         self.empresa_id = empresa_id
         self.repository = Registro0000Repository(session)
-        self.lote = []
+        self.lote = LoteRegistros(COLUNAS_0000)
         self.periodo = None
+        self.geracao = 0
         self.filial = None
+        self.ids = ReservaIdsService(session, "0000")
         self.tabela="0000"
 
-    def set_context(self, dt_ini, filial=None):
+    def set_context(self, dt_ini, filial=None, geracao=0):
         self.periodo = calcularPeriodo(dt_ini)
+        self.geracao = geracao
         self.filial = filial
 
+    def reservarIds(self, quantidade: int):
+        """Uma reserva por flush, antes de processar os registros dele"""
+        self.ids.preparar(quantidade)
+
     def processar(self, partes: list[str]):
         partes = (partes + [None] * 15)[:15]
 
@@ -37,39 +53,42 @@ class Registro0000Service:
         self.filial = cnpj[8:12] if cnpj and len(cnpj) >= 12 else "0000"
         self.periodo = calcularPeriodo(dt_ini)
 
-        registro_dict = {
-            "reg": partes[0],
-            "cod_ver": partes[1],
-            "cod_fin": partes[2],
-            "dt_ini": dt_ini,
-            "dt_fin": partes[4],
-            "nome": partes[5],
-            "cnpj": cnpj,
-            "cpf": partes[7],
-            "uf": partes[8],
-            "ie": partes[9],
-            "cod_num": partes[10],
-            "im": partes[11],
-            "suframa": partes[12],
-            "ind_perfil": partes[13],
-            "ind_ativ": partes[14],
-            "filial": self.filial,
-            "periodo": self.periodo,
-            "empresa_id": self.empresa_id,
-            "is_active": True
-        }
+        registro = (
+            self.ids.proximo(),
+            "0000",
+            partes[1],
+            partes[2],
+            dt_ini,
+            partes[4],
+            partes[5],
+            cnpj,
+            partes[7],
+            partes[8],
+            partes[9],
+            partes[10],
+            partes[11],
+            partes[12],
+            partes[13],
+            partes[14],
+            self.filial,
+            self.periodo,
+            self.empresa_id,
+            True,
+            self.geracao,
+        )
 
-        self.lote.append(registro_dict)
+        self.lote.append(registro)
 
-    def salvar(self):
+    def salvar(self, conexao=None):
         if self.lote:
             try:
-                self.repository.salvamento(self.lote)
+                self.repository.salvamento(self.lote, conexao)
                 print(f"[0000] {len(self.lote)} registro(s) inserido(s) com sucesso.")
             except Exception as e:
-                print(f"[ERRO] Falha ao salvar registros 0000: {e}") 
+                print(f"[ERRO] Falha ao salvar registros 0000: {e}")
+                raise
 
     def to_dataframe(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.lote)
+        df = self.lote.dataframe()
         #self.lote.clear()
         return df
\ No newline at end of file
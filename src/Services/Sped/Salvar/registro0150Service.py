@@ -3,32 +3,46 @@ from sqlalchemy import text
 from src.Models._0150Model import Registro0150
 from src.Utils.siglas import obterUF
 from src.Utils.sanitizacao import calcularPeriodo
+from src.Services.Sped.Salvar.cargaEmMassa import CargaEmMassa
+from src.Services.Sped.Salvar.loteRegistros import LoteRegistros
+from src.Services.Sped.Salvar.reservaIdsService import ReservaIdsService
+
+COLUNAS_0150 = (
+    "id", "reg", "cod_part", "nome", "cod_pais", "cnpj", "cpf", "ie", "cod_mun", "suframa", "ende", "num",
+    "compl", "bairro", "cod_uf", "uf", "pj_pf", "periodo", "empresa_id", "is_active", "geracao",
+)
 
 class Registro0150Repository:
     def __init__(self, session):
         self.session = session
 
-    def salvamento(self, registros: list[dict]):
+    def salvamento(self, registros: LoteRegistros, conexao=None):
         if not registros:
             return
 
-        df = pd.DataFrame(registros)
-        df.to_sql('0150', self.session.bind, if_exists='append', index=False, method='multi', chunksize=5000)
+        CargaEmMassa.salvar(conexao if conexao is not None else self.session, '0150', registros)
     
 class Registro0150Service:
     def __init__(self, session, empresa_id):
         self.session = session
         self.empresa_id = empresa_id
         self.repository = Registro0150Repository(session)
-        self.lote = []
+        self.lote = LoteRegistros(COLUNAS_0150)
         self.periodo = None
+        self.geracao = 0
         self.filial = None
+        self.ids = ReservaIdsService(session, "0150")
         self.tabela="0150"
 
-    def set_context(self, dt_ini, filial):
+    def set_context(self, dt_ini, filial, geracao=0):
         self.periodo = calcularPeriodo(dt_ini)
+        self.geracao = geracao
         self.filial = filial
 
+    def reservarIds(self, quantidade: int):
+        """Uma reserva por flush, antes de processar os registros dele"""
+        self.ids.preparar(quantidade)
+
     def processar(self, partes: list[str]):
         if not self.periodo:
             raise ValueError("Contexto do período não definido para registro 0150.")
@@ -41,39 +55,43 @@ class Registro0150Service:
         cnpj = partes[4]
         pj_pf = "PF" if not cnpj else "PJ"
 
-        registro = {
-            "reg": partes[0],
-            "cod_part": partes[1],
-            "nome": partes[2],
-            "cod_pais": partes[3],
-            "cnpj": cnpj,
-            "cpf": partes[5],
-            "ie": partes[6],
-            "cod_mun": cod_mun,
-            "suframa": partes[8],
-            "ende": partes[9],
-            "num": partes[10],
-            "compl": partes[11],
-            "bairro": partes[12],
-            "cod_uf": cod_uf,
-            "uf": uf,
-            "pj_pf": pj_pf,
-            "periodo": self.periodo,
-            "empresa_id": self.empresa_id,
-            "is_active": True
-        }
+        interno = self.lote.interno
+        registro = (
+            self.ids.proximo(),
+            "0150",
+            partes[1],
+            partes[2],
+            interno(partes[3]),
+            cnpj,
+            partes[5],
+            partes[6],
+            interno(cod_mun),
+            partes[8],
+            partes[9],
+            partes[10],
+            partes[11],
+            interno(partes[12]),
+            interno(cod_uf),
+            uf,
+            pj_pf,
+            self.periodo,
+            self.empresa_id,
+            True,
+            self.geracao,
+        )
 
         self.lote.append(registro)
 
-    def salvar(self):
+    def salvar(self, conexao=None):
         if self.lote:
             try:
-                self.repository.salvamento(self.lote)
+                self.repository.salvamento(self.lote, conexao)
                 print(f"[0150] {len(self.lote)} registro(s) inserido(s) com sucesso.")
             except Exception as e:
                 print(f"[ERRO] Falha ao salvar registros 0150: {e}")
+                raise
 
     def to_dataframe(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.lote)
+        df = self.lote.dataframe()
         #self.lote.clear()
         return df
\ No newline at end of file
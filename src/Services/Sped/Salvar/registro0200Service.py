@@ -1,30 +1,54 @@
 import pandas as pd
 from sqlalchemy import text
 from src.Models._0200Model import Registro0200
-from src.Utils.sanitizacao import calcularPeriodo, sanitizarCampo
+from src.Utils.sanitizacao import calcularPeriodo, corrigirUnidade, TAMANHOS_MAXIMOS
+from src.Utils.sanitizacaoColunas import TabelaDeConsulta, truncarColuna
+from src.Services.Sped.Salvar.cargaEmMassa import CargaEmMassa
+from src.Services.Sped.Salvar.loteRegistros import LoteRegistros
+from src.Services.Sped.Salvar.reservaIdsService import ReservaIdsService
+
+COLUNAS_0200 = (
+    "id", "reg", "cod_item", "descr_item", "cod_barra", "cod_ant_item", "unid_inv", "tipo_item", "cod_ncm",
+    "ex_ipi", "cod_gen", "cod_list", "aliq_icms", "cest", "periodo", "empresa_id", "is_active", "geracao",
+)
+
+def regras0200() -> dict:
+    """Mesmas regras de sanitizarCampo para cod_item, descr_item e unid_inv, aplicadas por coluna"""
+    return {
+        "cod_item": truncarColuna(TAMANHOS_MAXIMOS['cod_item']),
+        "descr_item": truncarColuna(TAMANHOS_MAXIMOS['descr_item']),
+        "unid_inv": TabelaDeConsulta(corrigirUnidade),
+    }
 
 class Registro0200Repository:
     def __init__(self, session):
         self.session = session
 
-    def salvamento(self, registros: list[dict]):
+    def salvamento(self, registros: LoteRegistros, conexao=None):
         if not registros:
             return
 
-        df = pd.DataFrame(registros)
-        df.to_sql('0200', self.session.bind, if_exists='append', index=False, method='multi', chunksize=5000)
+        CargaEmMassa.salvar(conexao if conexao is not None else self.session, '0200', registros)
 
 class Registro0200Service:
     def __init__(self, session, empresa_id):
         self.session = session
         self.empresa_id = empresa_id
         self.repository = Registro0200Repository(session)
-        self.lote = []
+        self.lote = LoteRegistros(COLUNAS_0200)
+        self.regras = regras0200()
         self.periodo = None
+        self.geracao = 0
+        self.ids = ReservaIdsService(session, "0200")
         self.tabela = "0200"
 
-    def set_context(self, dt_ini, filial=None):
+    def set_context(self, dt_ini, filial=None, geracao=0):
         self.periodo = calcularPeriodo(dt_ini)
+        self.geracao = geracao
+
+    def reservarIds(self, quantidade: int):
+        """Uma reserva por flush, antes de processar os registros dele"""
+        self.ids.preparar(quantidade)
 
     def processar(self, partes: list[str]):
         if not self.periodo:
@@ -37,37 +61,43 @@ class Registro0200Service:
         if cod_item is not None:
             cod_item = cod_item.lstrip("0") or "0"
 
-        registro = {
-            "reg": partes[0],
-            #"cod_item": sanitizarCampo("cod_item", partes[1]),
-            "cod_item": sanitizarCampo("cod_item", cod_item),
-            "descr_item": sanitizarCampo("descr_item", partes[2]),
-            "cod_barra": partes[3],
-            "cod_ant_item": partes[4],
-            "unid_inv": sanitizarCampo("unid_inv", partes[5]),
-            "tipo_item": partes[6],
-            "cod_ncm": partes[7],
-            "ex_ipi": partes[8],
-            "cod_gen": partes[9],
-            "cod_list": partes[10],
-            "aliq_icms": partes[11],
-            "cest": partes[12],
-            "periodo": self.periodo,
-            "empresa_id": self.empresa_id,
-            "is_active": True
-        }
+        interno = self.lote.interno
+        registro = (
+            self.ids.proximo(),
+            "0200",
+            #sanitizarCampo("cod_item", partes[1]),
+            cod_item,
+            partes[2],
+            partes[3],
+            partes[4],
+            partes[5],
+            interno(partes[6]),
+            interno(partes[7]),
+            interno(partes[8]),
+            interno(partes[9]),
+            interno(partes[10]),
+            interno(partes[11]),
+            interno(partes[12]),
+            self.periodo,
+            self.empresa_id,
+            True,
+            self.geracao,
+        )
 
         self.lote.append(registro)
 
-    def salvar(self):
+    def salvar(self, conexao=None):
         if self.lote:
             try:
-                self.repository.salvamento(self.lote)
+                self.lote.sanitizar(self.regras)
+                self.repository.salvamento(self.lote, conexao)
                 print(f"[0200] {len(self.lote)} registro(s) inserido(s) com sucesso.")
             except Exception as e:
                 print(f"[ERRO] Falha ao salvar registros 0200: {e}")
+                raise
 
     def to_dataframe(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.lote)
+        self.lote.sanitizar(self.regras)
+        df = self.lote.dataframe()
         #self.lote.clear()
         return df
@@ -2,107 +2,115 @@ import pandas as pd
 from src.Utils.sanitizacao import calcularPeriodo
 from src.Models.c100Model import C100
 from sqlalchemy import text
+from src.Services.Sped.Salvar.cargaEmMassa import CargaEmMassa
+from src.Services.Sped.Salvar.loteRegistros import LoteRegistros
+from src.Services.Sped.Salvar.reservaIdsService import BLOCO_RESERVA, ReservaIdsService
+
+COLUNAS_C100 = (
+    "id", "periodo", "reg", "ind_oper", "ind_emit", "cod_part", "cod_mod", "cod_sit", "ser", "num_doc",
+    "chv_nfe", "dt_doc", "dt_e_s", "vl_doc", "ind_pgto", "vl_desc", "vl_abat_nt", "vl_merc", "ind_frt",
+    "vl_frt", "vl_seg", "vl_out_da", "vl_bc_icms", "vl_icms", "vl_bc_icms_st", "vl_icms_st", "vl_ipi",
+    "vl_pis", "vl_cofins", "vl_pis_st", "vl_cofins_st", "filial", "empresa_id", "is_active", "geracao",
+)
 
 class RegistroC100Repository:
     def __init__(self, session):
         self.session = session
 
-    def salvamento(self, registros: list[dict]):
+    def salvamento(self, registros: LoteRegistros, conexao=None):
         if not registros:
             return
 
-        df = pd.DataFrame(registros)
-        df.to_sql('c100', self.session.bind, if_exists='append', index=False, method='multi', chunksize=5000)
+        CargaEmMassa.salvar(conexao if conexao is not None else self.session, 'c100', registros)
 
 class RegistroC100Service:
     def __init__(self, session, empresa_id):
         self.session = session
         self.empresa_id = empresa_id
         self.repository = RegistroC100Repository(session)
-        self.lote = []
+        self.lote = LoteRegistros(COLUNAS_C100)
         self.periodo = None
+        self.geracao = 0
         self.filial = None
         self.mapa_documentos = {}
+        # Ids atribuídos no cliente: o C170 do mesmo flush já sai com id_c100
+        self.ids = ReservaIdsService(session, "c100", BLOCO_RESERVA)
         self.tabela = "C100"
 
-    def set_context(self, dt_ini, filial):
+    def set_context(self, dt_ini, filial, geracao=0):
         self.periodo = calcularPeriodo(dt_ini)
+        self.geracao = geracao
         self.filial = filial
 
     def sanitizarPartes(self, partes: list[str]) -> list[str]:
         return (partes + [None] * (29 - len(partes)))[:29]
 
-    def processar(self, partes: list[str]):
-        partes = self.sanitizarPartes(partes)
+    def reservarIds(self, quantidade: int):
+        """Uma reserva por flush, antes de processar os C100 dele"""
+        self.ids.preparar(quantidade)
 
-        registro = {
-            "periodo": self.periodo,
-            "reg": partes[0],
-            "ind_oper": partes[1],
-            "ind_emit": partes[2],
-            "cod_part": partes[3],
-            "cod_mod": partes[4],
-            "cod_sit": partes[5],
-            "ser": partes[6],
-            "num_doc": partes[7],
-            "chv_nfe": partes[8],
-            "dt_doc": partes[9],
-            "dt_e_s": partes[10],
-            "vl_doc": partes[11],
-            "ind_pgto": partes[12],
-            "vl_desc": partes[13],
-            "vl_abat_nt": partes[14],
-            "vl_merc": partes[15],
-            "ind_frt": partes[16],
-            "vl_frt": partes[17],
-            "vl_seg": partes[18],
-            "vl_out_da": partes[19],
-            "vl_bc_icms": partes[20],
-            "vl_icms": partes[21],
-            "vl_bc_icms_st": partes[22],
-            "vl_icms_st": partes[23],
-            "vl_ipi": partes[24],
-            "vl_pis": partes[25],
-            "vl_cofins": partes[26],
-            "vl_pis_st": partes[27],
-            "vl_cofins_st": partes[28],
-            "filial": self.filial,
-            "empresa_id": self.empresa_id,
-            "is_active": True
-        }
+    def processar(self, partes: list[str], chave):
+        partes = self.sanitizarPartes(partes)
+        id_c100 = self.ids.proximo()
+
+        interno = self.lote.interno
+        registro = (
+            id_c100,
+            self.periodo,
+            "C100",
+            interno(partes[1]),
+            interno(partes[2]),
+            interno(partes[3]),
+            interno(partes[4]),
+            interno(partes[5]),
+            interno(partes[6]),
+            partes[7],
+            partes[8],
+            interno(partes[9]),
+            interno(partes[10]),
+            partes[11],
+            interno(partes[12]),
+            partes[13],
+            partes[14],
+            partes[15],
+            interno(partes[16]),
+            partes[17],
+            partes[18],
+            partes[19],
+            partes[20],
+            partes[21],
+            partes[22],
+            partes[23],
+            partes[24],
+            partes[25],
+            partes[26],
+            partes[27],
+            partes[28],
+            self.filial,
+            self.empresa_id,
+            True,
+            self.geracao,
+        )
 
         num_doc = str(partes[7]).zfill(9)
 
-        self.mapa_documentos[num_doc] = {
+        # A chave vem do leitor (arquivo, offset do C100) e é única por documento
+        self.mapa_documentos[chave] = {
+            "num_doc": num_doc,
             "ind_oper": partes[1],
             "cod_part": partes[3],
             "chv_nfe": partes[8],
+            "id_c100": id_c100,
         }
 
         self.lote.append(registro)
 
-    def salvar(self):
+    def salvar(self, conexao=None):
         if not self.lote:
             return
 
         try:
-            self.repository.salvamento(self.lote)
-
-            stmt = text("""
-                SELECT id, num_doc FROM c100
-                WHERE periodo = :periodo AND empresa_id = :empresa_id AND is_active = true
-            """)
-
-            result = self.session.execute(stmt, {
-                "periodo": self.periodo,
-                "empresa_id": self.empresa_id
-            })
-
-            for row in result:
-                num_doc = str(row.num_doc).zfill(9)
-                if num_doc in self.mapa_documentos:
-                    self.mapa_documentos[num_doc]["id_c100"] = row.id
-
+            self.repository.salvamento(self.lote, conexao)
             print(f"[C100] {len(self.lote)} registro(s) inserido(s) com sucesso.")
         except Exception as e:
             print(f"[ERRO] Falha ao salvar registros C100: {e}")
@@ -112,6 +120,6 @@ class RegistroC100Service:
         return self.mapa_documentos
 
     def to_dataframe(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.lote)
+        df = self.lote.dataframe()
         #self.lote.clear()
         return df
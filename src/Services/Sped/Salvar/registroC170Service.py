@@ -3,19 +3,53 @@ from sqlalchemy import text
 from src.Models.c170Model import C170
 from src.Utils.sanitizacao import (
     truncar, corrigirUnidade, corrigirIndMov, corrigirCstIcms,
-    calcularPeriodo, validarEstruturaC170, TAMANHOS_MAXIMOS
+    calcularPeriodo, validarEstruturaC170, decimalSped, TAMANHOS_MAXIMOS
 )
+from src.Utils.sanitizacaoColunas import TabelaDeConsulta, truncarColuna
+from src.Services.Sped.Salvar.cargaEmMassa import CargaEmMassa
+from src.Services.Sped.Salvar.loteRegistros import LoteRegistros
+from src.Services.Sped.Salvar.reservaIdsService import BLOCO_RESERVA, ReservaIdsService
+
+# id por último: validarEstruturaC170 confere a linha por posição
+COLUNAS_C170 = (
+    "periodo", "reg", "num_item", "cod_item", "descr_compl", "qtd", "unid", "vl_item", "vl_desc",
+    "ind_mov", "cst_icms", "cfop", "cod_nat", "vl_bc_icms", "aliq_icms", "vl_icms", "vl_bc_icms_st",
+    "aliq_st", "vl_icms_st", "ind_apur", "cst_ipi", "cod_enq", "vl_bc_ipi", "aliq_ipi", "vl_ipi",
+    "cst_pis", "vl_bc_pis", "aliq_pis", "quant_bc_pis", "aliq_pis_reais", "vl_pis", "cst_cofins",
+    "vl_bc_cofins", "aliq_cofins", "quant_bc_cofins", "aliq_cofins_reais", "vl_cofins", "cod_cta",
+    "vl_abat_nt", "id_c100", "filial", "ind_oper", "cod_part", "num_doc", "chv_nfe", "empresa_id",
+    "is_active", "geracao", "id",
+)
+
+def _unidadeC170(valor):
+    return truncar(corrigirUnidade(valor), TAMANHOS_MAXIMOS['unid'])
+
+def regrasC170() -> dict:
+    """Regras de coluna do C170; tabelas de consulta próprias de cada serviço (uma por thread)"""
+    return {
+        "cod_item": truncarColuna(TAMANHOS_MAXIMOS['cod_item']),
+        "descr_compl": truncarColuna(TAMANHOS_MAXIMOS['descr_compl']),
+        "unid": TabelaDeConsulta(_unidadeC170),
+        "ind_mov": TabelaDeConsulta(corrigirIndMov),
+        "cst_icms": TabelaDeConsulta(corrigirCstIcms),
+        "cod_nat": truncarColuna(TAMANHOS_MAXIMOS['cod_nat']),
+        "cod_cta": truncarColuna(TAMANHOS_MAXIMOS['cod_cta']),
+        # Colunas DECIMAL: convertidas aqui para o banco não depender da vírgula do SPED
+        "qtd": TabelaDeConsulta(decimalSped),
+        "vl_item": TabelaDeConsulta(decimalSped),
+        "vl_desc": TabelaDeConsulta(decimalSped),
+        "aliq_icms": TabelaDeConsulta(decimalSped),
+    }
 
 class RegistroC170Repository:
     def __init__(self, session):
         self.session = session
 
-    def salvamento(self, registros: list[dict]):
+    def salvamento(self, registros: LoteRegistros, conexao=None):
         if not registros:
             return
 
-        df = pd.DataFrame(registros)
-        df.to_sql('c170', self.session.bind, if_exists='append', index=False, method='multi', chunksize=5000)
+        CargaEmMassa.salvar(conexao if conexao is not None else self.session, 'c170', registros)
 
 class RegistroC170Service:
     def __init__(self, session, empresa_id):
@@ -23,14 +57,18 @@ class RegistroC170Service:
         self.empresa_id = empresa_id
         self.repository = RegistroC170Repository(session)
         self.periodo = None
+        self.geracao = 0
         self.filial = None
         self.mapa_documentos = {}
         self.raw_dados = []
-        self.lote = []
+        self.lote = LoteRegistros(COLUNAS_C170)
+        self.ids = ReservaIdsService(session, "c170", BLOCO_RESERVA)
+        self.regras = regrasC170()
         self.tabela = "C170"
 
-    def set_context(self, dt_ini, filial):
+    def set_context(self, dt_ini, filial, geracao=0):
         self.periodo = calcularPeriodo(dt_ini)
+        self.geracao = geracao
         self.filial = filial
 
     def setDocumentos(self, mapa_documentos: dict):
@@ -39,19 +77,24 @@ class RegistroC170Service:
     def sanitizarPartes(self, partes: list[str]) -> list[str]:
         return (partes + [None] * (39 - len(partes)))[:39]
 
-    def processar(self, partes: list[str], num_doc: str):
+    def reservarIds(self, quantidade: int):
+        """Uma reserva por flush, antes de processar os registros dele"""
+        self.ids.preparar(quantidade)
+
+    def processar(self, partes: list[str], chave_c100):
+        doc_info = self.mapa_documentos.get(chave_c100)
+        if not doc_info:
+            # Os C100 do flush já têm id; sem documento só sobra C170 antes de qualquer C100 do arquivo
+            print("[WARN] C170 sem C100 correspondente. Ignorado.")
+            return
+
         partes = self.sanitizarPartes(partes)
-        num_doc = str(num_doc).zfill(9)
+        num_doc = doc_info["num_doc"]
 
         if not num_doc or len(partes) < 10:
             print(f"[DEBUG] Linha C170 inválida. Ignorando.")
             return
 
-        doc_info = self.mapa_documentos.get(num_doc)
-        if not doc_info:
-            print(f"[WARN] Documento {num_doc} não encontrado. Ignorando C170.")
-            return
-
         try:
             num_item = str(int(partes[1])).zfill(3)[:3]
         except:
@@ -62,75 +105,84 @@ class RegistroC170Service:
         if cod_item is not None:
             cod_item = cod_item.lstrip("0") or "0"
 
-        dados = {
-            "periodo": self.periodo,
-            "reg": "C170",
-            "num_item": num_item,
-            "cod_item": truncar(cod_item, TAMANHOS_MAXIMOS['cod_item']),
-            #"cod_item": truncar(partes[2], TAMANHOS_MAXIMOS['cod_item']),
-            "descr_compl": truncar(partes[3], TAMANHOS_MAXIMOS['descr_compl']),
-            "qtd": partes[4],
-            "unid": truncar(corrigirUnidade(partes[5]), TAMANHOS_MAXIMOS['unid']),
-            "vl_item": partes[6],
-            "vl_desc": partes[7],
-            "ind_mov": corrigirIndMov(partes[8]),
-            "cst_icms": corrigirCstIcms(partes[9]),
-            "cfop": partes[10],
-            "cod_nat": truncar(partes[11], TAMANHOS_MAXIMOS['cod_nat']),
-            "vl_bc_icms": partes[12],
-            "aliq_icms": partes[13],
-            "vl_icms": partes[14],
-            "vl_bc_icms_st": partes[15],
-            "aliq_st": partes[16],
-            "vl_icms_st": partes[17],
-            "ind_apur": partes[18],
-            "cst_ipi": partes[19],
-            "cod_enq": partes[20],
-            "vl_bc_ipi": partes[21],
-            "aliq_ipi": partes[22],
-            "vl_ipi": partes[23],
-            "cst_pis": partes[24],
-            "vl_bc_pis": partes[25],
-            "aliq_pis": partes[26],
-            "quant_bc_pis": partes[27],
-            "aliq_pis_reais": partes[28],
-            "vl_pis": partes[29],
-            "cst_cofins": partes[30],
-            "vl_bc_cofins": partes[31],
-            "aliq_cofins": partes[32],
-            "quant_bc_cofins": partes[33],
-            "aliq_cofins_reais": partes[34],
-            "vl_cofins": partes[35],
-            "cod_cta": truncar(partes[36], TAMANHOS_MAXIMOS['cod_cta']),
-            "vl_abat_nt": partes[37],
-            "id_c100": doc_info.get("id_c100"),
-            "filial": self.filial,
-            "ind_oper": doc_info.get("ind_oper"),
-            "cod_part": doc_info.get("cod_part"),
-            "num_doc": num_doc,
-            "chv_nfe": doc_info.get("chv_nfe"),
-            "empresa_id": self.empresa_id,
-            "is_active": True
-        }
-
-        if not validarEstruturaC170(list(dados.values())):
+        lote = self.lote
+        interno = lote.interno
+        linha = (
+            self.periodo,
+            "C170",
+            num_item,
+            # cod_item, descr_compl, unid, ind_mov, cst_icms, cod_nat, cod_cta e os
+            # campos numéricos são sanitizados por coluna em salvar()
+            cod_item,
+            #truncar(partes[2], TAMANHOS_MAXIMOS['cod_item']),
+            partes[3],
+            partes[4],
+            partes[5],
+            partes[6],
+            partes[7],
+            partes[8],
+            partes[9],
+            interno(partes[10]),
+            interno(partes[11]),
+            partes[12],
+            interno(partes[13]),
+            partes[14],
+            partes[15],
+            interno(partes[16]),
+            partes[17],
+            interno(partes[18]),
+            interno(partes[19]),
+            interno(partes[20]),
+            partes[21],
+            interno(partes[22]),
+            partes[23],
+            interno(partes[24]),
+            partes[25],
+            interno(partes[26]),
+            partes[27],
+            partes[28],
+            partes[29],
+            interno(partes[30]),
+            partes[31],
+            interno(partes[32]),
+            partes[33],
+            partes[34],
+            partes[35],
+            interno(partes[36]),
+            partes[37],
+            doc_info.get("id_c100"),
+            self.filial,
+            doc_info.get("ind_oper"),
+            doc_info.get("cod_part"),
+            num_doc,
+            doc_info.get("chv_nfe"),
+            self.empresa_id,
+            True,
+            self.geracao,
+            self.ids.proximo(),
+        )
+
+        if not validarEstruturaC170(linha):
             print(f"[WARN] Estrutura inválida do C170 para num_doc={num_doc}. Ignorado.")
             return
 
-        self.lote.append(dados)
+        lote.append(linha)
 
-    def salvar(self):
+    def salvar(self, conexao=None):
         if not self.lote:
             print("[DEBUG] Nenhum registro C170 válido para salvar.")
             return
 
         try:
-            self.repository.salvamento(self.lote)
+            self.lote.sanitizar(self.regras)
+            self.repository.salvamento(self.lote, conexao)
             print(f"[C170] {len(self.lote)} registro(s) inserido(s) com sucesso.")
         except Exception as e:
             print(f"[ERRO] Falha ao salvar registros C170: {e}")
+            raise
 
     def to_dataframe(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.lote)
+        self.lote.sanitizar(self.regras)
+        df = self.lote.dataframe()
         #self.lote.clear()
         return df
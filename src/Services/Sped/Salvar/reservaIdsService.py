@@ -0,0 +1,94 @@
+from sqlalchemy import select, update, insert, func, table, column
+from sqlalchemy.exc import IntegrityError
+
+from src.Models.sequenciaIdModel import SequenciaId
+
+# Reserva mínima das tabelas de alto volume: a maior parte dos flushes usa ids já em mãos
+BLOCO_RESERVA = 10_000
+
+class ReservaIdsRepository:
+    _tabela_verificada = False
+
+    def __init__(self, bind):
+        self.bind = bind
+        self.garantirTabela()
+
+    def garantirTabela(self):
+        if not ReservaIdsRepository._tabela_verificada:
+            SequenciaId.__table__.create(bind=self.bind, checkfirst=True)
+            ReservaIdsRepository._tabela_verificada = True
+
+    def reservar(self, tabela: str, quantidade: int) -> int:
+        """Reserva `quantidade` ids consecutivos de `tabela` e devolve o primeiro.
+
+        Roda em transação própria e curta: o UPDATE vem antes da leitura para
+        travar a linha da sequência já no primeiro comando. Ids gravados fora da
+        reserva (auto incremento) são respeitados pelo MAX(id) da tabela.
+        """
+        sequencia = SequenciaId.__table__
+        filtro = sequencia.c.tabela == tabela
+        maximo_tabela = select(func.coalesce(func.max(column("id")), 0)).select_from(table(tabela))
+
+        while True:
+            try:
+                with self.bind.begin() as conn:
+                    alterou = conn.execute(
+                        update(sequencia).where(filtro).values(ultimo_id=sequencia.c.ultimo_id + quantidade)
+                    ).rowcount
+                    if not alterou:
+                        conn.execute(insert(sequencia).values(tabela=tabela, ultimo_id=maximo_tabela.scalar_subquery() + quantidade))
+
+                    ultimo = conn.execute(select(sequencia.c.ultimo_id).where(filtro)).scalar()
+                    maximo = conn.execute(maximo_tabela).scalar()
+                    if maximo > ultimo - quantidade:
+                        ultimo = maximo + quantidade
+                        conn.execute(update(sequencia).where(filtro).values(ultimo_id=ultimo))
+                    return ultimo - quantidade + 1
+            except IntegrityError:
+                # Outra importação criou a linha da sequência ao mesmo tempo: repetir com UPDATE
+                continue
+
+class ReservaIdsService:
+    """Distribui ids de uma tabela no cliente a partir de faixas reservadas no banco.
+
+    Com os ids conhecidos antes do INSERT, pai e filhos de um mesmo flush são
+    gravados sem reconsultar o banco, e o leitor sabe o último id que gravou
+    em cada tabela sem consultar MAX(id). Ids reservados e não usados (flush
+    com falha, sobra da faixa no fim da importação) viram lacunas, como no
+    auto incremento.
+    """
+
+    def __init__(self, session, tabela: str, bloco: int = 1):
+        self.tabela = tabela
+        self.repository = ReservaIdsRepository(session.bind)
+        self.bloco = bloco
+        self.inicio = 0
+        self.proximo_id = 0
+        self.limite = 0
+        # Último id entregue; depois do commit do flush, o último gravado
+        self.ultimo_id = None
+
+    @property
+    def disponiveis(self) -> int:
+        return self.limite - self.proximo_id
+
+    @property
+    def faixa(self) -> tuple[int, int] | None:
+        """Faixa reservada em uso, [inicio, limite); nenhum outro leitor recebe ids dela"""
+        return (self.inicio, self.limite) if self.limite else None
+
+    def preparar(self, quantidade: int):
+        """Garante `quantidade` ids em mãos com no máximo uma reserva no banco"""
+        if quantidade <= self.disponiveis:
+            return
+        # Sobra da faixa anterior vira lacuna: os ids de um flush ficam sempre em uma só faixa
+        reserva = max(quantidade, self.bloco)
+        self.inicio = self.proximo_id = self.repository.reservar(self.tabela, reserva)
+        self.limite = self.inicio + reserva
+
+    def proximo(self) -> int:
+        if not self.disponiveis:
+            self.preparar(1)
+        valor = self.ultimo_id = self.proximo_id
+        self.proximo_id += 1
+        return valor
@@ -1,5 +1,6 @@
 import re
-from typing import List, Dict
+from decimal import Decimal, InvalidOperation
+from typing import List, Dict, Optional, Tuple
 
 VALID_TOKENS = {"ST", "ISENTO", "PAUTA", "SUBSTITUICAO"}
 VALID_NUM_RE = re.compile(r"^(100([.,]0{1,2})?%?|[0-9]{1,2}([.,][0-9]{1,2})?%?)$")
@@ -85,6 +86,25 @@ def tratarAliquota(aliquota: str) -> str:
     except ValueError:
         return ""
     
+def separarAliquota(aliquota) -> Tuple[Optional[Decimal], Optional[str]]:
+    """Alíquota em texto ("12,00%", "ST") como (taxa em %, token); o que não for nenhum dos dois vira (None, None)"""
+    if aliquota is None:
+        return None, None
+    if isinstance(aliquota, (int, float, Decimal)):
+        s = str(aliquota)
+    else:
+        s = str(aliquota).strip().upper()
+        if s in VALID_TOKENS:
+            return None, s
+        s = s.replace('%', '').replace(',', '.')
+    if not s:
+        return None, None
+    try:
+        taxa = Decimal(s).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None, None
+    return (taxa, None) if taxa.is_finite() else (None, None)
+
 def categoriaAliquota(aliquota):
         if not aliquota:
             return 'regraGeral'
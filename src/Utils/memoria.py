@@ -0,0 +1,45 @@
+import ctypes
+import os
+import sys
+from typing import Optional
+
+def rssProcesso() -> Optional[int]:
+    """Memória residente (RSS) atual do processo em bytes, ou None se não for possível medir"""
+    if sys.platform == "win32":
+        return _rssWindows()
+    try:
+        with open("/proc/self/statm", "r") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Sem /proc (macOS): só há o pico, em bytes no macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, ValueError):
+        return None
+
+class _ContadoresMemoria(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+def _rssWindows() -> Optional[int]:
+    try:
+        contadores = _ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        processo = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+            return contadores.WorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return None
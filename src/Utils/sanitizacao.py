@@ -1,4 +1,5 @@
 import re
+from decimal import Decimal, InvalidOperation
 from typing import Optional
 
 TAMANHOS_MAXIMOS = {
@@ -31,15 +32,20 @@ def truncar(valor, limite):
     s = str(valor)
     return s[:limite]
 
+_RE_UNIDADE_DECIMAL = re.compile(r"^\d+[,\.]\d+$")
+_RE_UNIDADE_INTEIRA = re.compile(r"^\d+$")
+_RE_UNIDADE_COM_NUMERO = re.compile(r"^([A-Za-z]+)(\d+)")
+_RE_NAO_DIGITO = re.compile(r"\D")
+
 def corrigirUnidade(valor):
     if not valor:
         return "UN"
     s = str(valor)
 
-    if re.match(r"^\d+[,\.]\d+$", s) or re.match(r"^\d+$", s):
+    if _RE_UNIDADE_DECIMAL.match(s) or _RE_UNIDADE_INTEIRA.match(s):
         return "UN"
 
-    m = re.match(r"^([A-Za-z]+)(\d+)", s)
+    m = _RE_UNIDADE_COM_NUMERO.match(s)
     if m:
         return m.group(1)
 
@@ -60,7 +66,7 @@ def corrigirCfop(valor: Optional[str]) -> Optional[str]:
     if not valor:
         return None
     
-    s = re.sub(r"\D", "", str(valor))
+    s = _RE_NAO_DIGITO.sub("", str(valor))
     if len(s) > 4:
         s = s[:4]
     if len(s) < 4:
@@ -84,57 +90,74 @@ def validarEstruturaC170(dados: list) -> bool:
     except Exception:
         return False
 
-def sanitizarCampo(campo, valor):
-    def _trunc(tam):
-        return lambda v: truncar(v, tam)
-
-    def _zfill2(v):
-        return str(v).zfill(2)[:2] if v is not None else "00"
-
-    def _numero(v):
-        return str(v).replace(",", ".") if isinstance(v, str) else v
-
-    regras = {
-        "cod_item": _trunc(60),
-        "descr_item": _trunc(255),
-        "descr_compl": _trunc(255),
-        "cod_cta": _trunc(255),
-        "cod_nat": _trunc(11),
-        "cod_part": _trunc(60),
-        "nome": _trunc(100),
-        "reg": _trunc(4),
-
-        "unid": corrigirUnidade,
-        "unid_inv": corrigirUnidade,
-        "ind_mov": corrigirIndMov,
-        "cod_mod": _zfill2,
-        "cst_icms": corrigirCstIcms,
-        "cfop": corrigirCfop,
-
-        "vl_item": _numero,
-        "vl_desc": _numero,
-        "vl_merc": _numero,
-        "aliq_icms": _numero,
-        "aliq_ipi": _numero,
-        "aliq_pis": _numero,
-        "aliq_cofins": _numero,
-        "vl_bc_icms": _numero,
-        "vl_icms": _numero,
-        "vl_bc_ipi": _numero,
-        "vl_ipi": _numero,
-        "vl_bc_pis": _numero,
-        "vl_pis": _numero,
-        "vl_bc_cofins": _numero,
-        "vl_cofins": _numero,
-        "vl_abat_nt": _numero,
-        "quant_bc_pis": _numero,
-        "quant_bc_cofins": _numero,
-        "aliq_pis_reais": _numero,
-        "aliq_cofins_reais": _numero,
-    }
+def _truncador(tam):
+    return lambda v: truncar(v, tam)
+
+def _zfill2(v):
+    return str(v).zfill(2)[:2] if v is not None else "00"
+
+def _numero(v):
+    return str(v).replace(",", ".") if isinstance(v, str) else v
 
+def decimalSped(valor) -> Optional[Decimal]:
+    """Campo numérico do SPED ("1234,56") como Decimal; vazio ou inválido vira None"""
+    if valor is None or isinstance(valor, Decimal):
+        return valor
+    s = str(valor).strip().replace(",", ".")
+    if not s:
+        return None
+    try:
+        numero = Decimal(s)
+    except InvalidOperation:
+        return None
+    return numero if numero.is_finite() else None
+
+# Montado uma única vez (antes era recriado a cada chamada de sanitizarCampo)
+REGRAS_CAMPOS = {
+    "cod_item": _truncador(60),
+    "descr_item": _truncador(255),
+    "descr_compl": _truncador(255),
+    "cod_cta": _truncador(255),
+    "cod_nat": _truncador(11),
+    "cod_part": _truncador(60),
+    "nome": _truncador(100),
+    "reg": _truncador(4),
+
+    "unid": corrigirUnidade,
+    "unid_inv": corrigirUnidade,
+    "ind_mov": corrigirIndMov,
+    "cod_mod": _zfill2,
+    "cst_icms": corrigirCstIcms,
+    "cfop": corrigirCfop,
+
+    "vl_item": _numero,
+    "vl_desc": _numero,
+    "vl_merc": _numero,
+    "aliq_icms": _numero,
+    "aliq_ipi": _numero,
+    "aliq_pis": _numero,
+    "aliq_cofins": _numero,
+    "vl_bc_icms": _numero,
+    "vl_icms": _numero,
+    "vl_bc_ipi": _numero,
+    "vl_ipi": _numero,
+    "vl_bc_pis": _numero,
+    "vl_pis": _numero,
+    "vl_bc_cofins": _numero,
+    "vl_cofins": _numero,
+    "vl_abat_nt": _numero,
+    "quant_bc_pis": _numero,
+    "quant_bc_cofins": _numero,
+    "aliq_pis_reais": _numero,
+    "aliq_cofins_reais": _numero,
+}
+
+def _identidade(v):
+    return v
+
+def sanitizarCampo(campo, valor):
     try:
-        return regras.get(campo, lambda v: v)(valor)
+        return REGRAS_CAMPOS.get(campo, _identidade)(valor)
     except Exception:
         return valor
 
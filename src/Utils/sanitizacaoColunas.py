@@ -0,0 +1,109 @@
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.Utils.sanitizacao import (
+    REGRAS_CAMPOS, corrigirCfop, corrigirCstIcms, corrigirIndMov, corrigirUnidade, truncar, _numero, _zfill2,
+)
+
+# Regras por coluna: recebem os valores de uma coluna inteira e devolvem a coluna sanitizada
+RegraColuna = Callable[[Sequence], List]
+
+# Amostra do início de cada coluna usada para decidir entre tabela e caminho escalar
+AMOSTRA_CARDINALIDADE = 4096
+# Acima desta fração de valores ainda fora da tabela, a tabela custa mais do que economiza
+RAZAO_MAXIMA_NOVOS = 0.6
+
+class TabelaDeConsulta:
+    """Regra de coluna por tabela de consulta: a função escalar roda uma vez por valor distinto.
+
+    A tabela persiste entre lotes (até `limite` entradas), então em uma
+    importação cada CST/CFOP/unidade distinto é calculado uma única vez. A
+    saída é idêntica à função escalar por construção e valores iguais passam a
+    compartilhar o mesmo objeto. Mesmo fallback de sanitizarCampo: erro na
+    regra devolve o valor original.
+
+    Colunas de alta cardinalidade (a amostra inicial é em sua maioria de valores
+    fora da tabela) seguem pelo caminho escalar, sem montar nem consultar a
+    tabela. A tabela não tem trava: cada thread usa instâncias próprias (ver
+    regrasColunas).
+    """
+    __slots__ = ("funcao", "tabela", "limite")
+
+    def __init__(self, funcao: Callable, limite: int = 100_000):
+        self.funcao = funcao
+        self.tabela = {}
+        self.limite = limite
+
+    def _aplicar(self, valor):
+        try:
+            return self.funcao(valor)
+        except Exception:
+            return valor
+
+    def _escalar(self, valores: Sequence) -> List:
+        funcao = self.funcao
+        try:
+            return [funcao(valor) for valor in valores]
+        except Exception:
+            return [self._aplicar(valor) for valor in valores]
+
+    def __call__(self, valores: Sequence) -> List:
+        tabela = self.tabela
+        try:
+            amostra = list(islice(valores, AMOSTRA_CARDINALIDADE))
+            if len(set(amostra).difference(tabela)) > RAZAO_MAXIMA_NOVOS * len(amostra):
+                return self._escalar(valores)
+            novos = set(valores).difference(tabela)
+        except TypeError:
+            # Valor não hasheável: sem tabela para esta coluna
+            return self._escalar(valores)
+        if len(tabela) + len(novos) > self.limite:
+            tabela.clear()
+            novos = set(valores)
+        for valor in novos:
+            tabela[valor] = self._aplicar(valor)
+        return list(map(tabela.__getitem__, valores))
+
+def truncarColuna(limite: int) -> RegraColuna:
+    """Equivalente por coluna de truncar(v, limite); strings dentro do limite não são copiadas"""
+    def regra(valores: Sequence) -> List:
+        return [
+            valor if valor.__class__ is str and len(valor) <= limite else truncar(valor, limite)
+            for valor in valores
+        ]
+    return regra
+
+def regrasColunas() -> Dict[str, RegraColuna]:
+    """Espelho por coluna de REGRAS_CAMPOS (sanitizarCampo), com tabelas de consulta novas a cada chamada"""
+    regras: Dict[str, RegraColuna] = {
+        "cod_item": truncarColuna(60),
+        "descr_item": truncarColuna(255),
+        "descr_compl": truncarColuna(255),
+        "cod_cta": truncarColuna(255),
+        "cod_nat": truncarColuna(11),
+        "cod_part": truncarColuna(60),
+        "nome": truncarColuna(100),
+        "reg": truncarColuna(4),
+
+        "unid": TabelaDeConsulta(corrigirUnidade),
+        "unid_inv": TabelaDeConsulta(corrigirUnidade),
+        "ind_mov": TabelaDeConsulta(corrigirIndMov),
+        "cod_mod": TabelaDeConsulta(_zfill2),
+        "cst_icms": TabelaDeConsulta(corrigirCstIcms),
+        "cfop": TabelaDeConsulta(corrigirCfop),
+    }
+    # Valores numéricos (vírgula -> ponto) se repetem muito ("0", "0,00", alíquotas)
+    regras.update({campo: TabelaDeConsulta(_numero) for campo in REGRAS_CAMPOS if campo not in regras})
+    return regras
+
+def sanitizarColunas(colunas: Dict[str, Sequence], regras: Optional[Dict[str, RegraColuna]] = None) -> Dict[str, List]:
+    """Sanitiza um bloco de colunas de um registro (nome -> valores); colunas sem regra são copiadas.
+
+    Sem `regras`, usa tabelas de consulta só desta chamada; quem sanitiza vários
+    lotes passa as suas (uma instância de regrasColunas por thread).
+    """
+    regras = regrasColunas() if regras is None else regras
+    return {
+        campo: regras[campo](valores) if campo in regras else list(valores)
+        for campo, valores in colunas.items()
+    }